@@ -1,3 +1,17 @@
 #!/bin/bash
 
-echo "cron tasks may be implemented here..."
+# Schedule the daily removal of expired sessions
+# Usage: deploy/pythonanywhere/setup_cron.sh
+
+PROJECT_DIR="$(cd "$(dirname "$0")/../.." && pwd)"
+COMMAND="cd $PROJECT_DIR && .venv/bin/python manage.py clearsessions"
+
+if command -v crontab > /dev/null; then
+  (crontab -l 2> /dev/null | grep -v 'manage.py clearsessions'
+   echo "30 3 * * * $COMMAND") | crontab -
+  echo "✅ Daily session cleanup added to crontab"
+else
+  # PythonAnywhere has no crontab; use a scheduled task instead
+  echo "Add a daily task on the Tasks tab with the command:"
+  echo "$COMMAND"
+fi
@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+# Route the read-heavy pages to their async views. Every request runs its
+# sync parts in a thread of its own, so persistent connections would pile
+# up one per thread; keep them off unless configured.
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
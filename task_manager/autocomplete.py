@@ -0,0 +1,127 @@
+"""Prefix-search JSON endpoints and the select widgets that use them.
+
+Instead of rendering every user or label as an ``<option>``, the widgets
+render only the selected ones; ``partials/autocomplete.html`` fetches
+matches from the endpoint while the user types. Validation stays with
+the model choice fields, which only look up the submitted ids.
+"""
+from functools import reduce
+from operator import or_
+
+from django import forms
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views import View
+
+DEFAULT_LIMIT = 20
+
+
+class AutocompleteView(LoginRequiredMixin, View):
+    """``?q=`` prefix search over ``search_fields``, case-insensitive;
+    answers ``{"results": [{"id": ..., "text": ...}]}``."""
+    model = None
+    search_fields = ()
+    limit = DEFAULT_LIMIT
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        query = request.GET.get('q', '').strip()
+        if query:
+            queryset = queryset.filter(prefix_filter(self.search_fields, query))
+        return JsonResponse({'results': [
+            {'id': obj.pk, 'text': str(obj)}
+            for obj in queryset[:self.limit]
+        ]})
+
+    def get_queryset(self):
+        return self.model._default_manager.order_by(self.search_fields[0])
+
+
+def prefix_filter(fields, query):
+    return reduce(or_, (Q(**{f'{field}__istartswith': query})
+                        for field in fields))
+
+
+def create_prefix_indexes(schema_editor, model, fields):
+    """Indexes that serve ``__istartswith`` lookups on ``fields``.
+
+    PostgreSQL compares ``UPPER(column::text)`` with LIKE, which needs
+    a pattern-ops expression index; SQLite only uses an index for LIKE
+    if it has the same NOCASE collation as the comparison.
+    """
+    vendor = schema_editor.connection.vendor
+    for field, name, column in _prefix_indexes(model, fields):
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name} ON '
+                f'{model._meta.db_table} '
+                f'(UPPER(({column})::text) text_pattern_ops)')
+        elif vendor == 'sqlite':
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name} ON '
+                f'{model._meta.db_table} ({column} COLLATE NOCASE)')
+
+
+def drop_prefix_indexes(schema_editor, model, fields):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        for _field, name, _column in _prefix_indexes(model, fields):
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+def _prefix_indexes(model, fields):
+    table = model._meta.db_table
+    for field in fields:
+        column = model._meta.get_field(field).column
+        yield field, f'{table}_{column}_prefix_idx', column
+
+
+class AutocompleteMixin:
+    """Select widget that renders only the selected options of a model
+    choice field and points the script at ``url_name``."""
+    template_name = 'widgets/autocomplete_select.html'
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = \
+            reverse(self.url_name)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = [pk for pk in value if pk]
+        try:
+            objects = list(field.queryset.filter(pk__in=selected)) \
+                if selected else []
+        except (ValueError, TypeError, ValidationError):
+            # Invalid submitted ids; the field reports them
+            objects = []
+
+        options = []
+        if not self.allow_multiple_selected and \
+                field.empty_label is not None:
+            options.append(('', field.empty_label, not objects))
+        options += [(obj.pk, field.label_from_instance(obj), True)
+                    for obj in objects]
+        return [
+            (None, [self.create_option(
+                name, option_value, label, is_selected, index,
+                attrs=attrs)], index)
+            for index, (option_value, label, is_selected)
+            in enumerate(options)
+        ]
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
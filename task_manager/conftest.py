@@ -1,6 +1,9 @@
 import pytest
+from django.core.cache import cache
 from django.utils import translation
 
+from task_manager.utils.log import flush_dedup_filters
+
 
 @pytest.fixture
 def authenticated_client(client, django_user_model):
@@ -17,3 +20,17 @@ def activate_ru_locale():
     translation.activate('ru')
     yield
     translation.deactivate()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True, scope='session')
+def flush_log_summaries():
+    yield
+    # While the streams pytest captures are still open
+    flush_dedup_filters()
@@ -1,6 +1,12 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.views import View
+from django.views.generic import TemplateView
 
+from task_manager import metrics, profiling
+from task_manager.mixins import StaffRequiredMixin
 from task_manager.utils.debug import get_debug_info
 
 
@@ -8,3 +14,50 @@ class DebugInfoView(View):
     def get(self, request):
         debug_info = get_debug_info(request)
         return JsonResponse(debug_info)
+
+
+class MetricsView(View):
+    """Metrics in the Prometheus text format."""
+
+    def get(self, request):
+        token = settings.METRICS['TOKEN']
+        if token and not constant_time_compare(
+                request.headers.get('Authorization', ''), f'Bearer {token}'):
+            raise PermissionDenied
+        return HttpResponse(metrics.render(),
+                            content_type=metrics.CONTENT_TYPE)
+
+
+class ProfileListView(StaffRequiredMixin, TemplateView):
+    template_name = 'profiling/list.html'
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            profiles=profiling.recent(),
+            enabled=bool(settings.PROFILING['DIR']),
+            token=profiling.make_token(self.request.user),
+            param=profiling.PARAM,
+            mode_param=profiling.MODE_PARAM,
+            **kwargs,
+        )
+
+
+class ProfileDetailView(StaffRequiredMixin, TemplateView):
+    template_name = 'profiling/detail.html'
+
+    def get(self, request, *args, **kwargs):
+        self.profile = profiling.load(kwargs['profile_id'])
+        if self.profile is None:
+            raise Http404
+        if 'download' in request.GET:
+            try:
+                file = open(profiling.file_path(self.profile), 'rb')
+            except FileNotFoundError:
+                # Rotated out since load()
+                raise Http404 from None
+            return FileResponse(file, as_attachment=True,
+                                filename=self.profile['file'])
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(profile=self.profile, **kwargs)
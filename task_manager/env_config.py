@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 import dj_database_url
 from dotenv import load_dotenv
@@ -16,20 +17,132 @@ def load_env(base_dir):
     if DEFAULT_HOST not in allowed_hosts:
         allowed_hosts.append(DEFAULT_HOST)
 
+    cache_config = _build_cache_config()
+    cache_shared = _is_cache_shared(cache_config)
+
     return {
         'DEBUG': os.getenv('DEBUG', 'False') == "True",
         'SECRET_KEY': os.getenv('SECRET_KEY'),
         'ALLOWED_HOSTS': allowed_hosts,
         'DATABASES': {
             'default': _build_db_config()
-        }
+        },
+        'CACHES': {
+            'default': cache_config
+        },
+        'CACHE_SHARED': cache_shared,
+        'AUTH_USER_CACHE': _build_auth_user_cache(cache_shared),
+        'SESSION_ENGINE': _build_session_engine(),
+        'QUERY_BUDGET': _build_query_budget_config(),
+        'LOG_OUTPUT': _build_log_output_config(),
+        'METRICS': _build_metrics_config(),
+        'PROFILING': _build_profiling_config(),
+        'TRACING': _build_tracing_config(),
+        # Serve the read-only pages with async views; asgi.py turns this on
+        'ASYNC_VIEWS': os.getenv('ASYNC_VIEWS', 'False') == 'True',
     }
 
 
 def _build_db_config():
     db_url = os.getenv('DATABASE_URL')
-    config = dj_database_url.parse(db_url, conn_max_age=600)
+    config = dj_database_url.parse(
+        db_url, conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '600')))
     if not config['ENGINE'].endswith('sqlite3') and \
             not os.getenv('DEBUG', 'False') == 'True':
         config['OPTIONS'] = {'sslmode': 'require'}
     return config
+
+
+def _build_cache_config():
+    # A shared backend (e.g. Redis or Memcached) keeps cache versions
+    # consistent across worker processes
+    return {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+
+
+def _is_cache_shared(cache_config):
+    # Cached data is dropped or versioned when it changes, which a
+    # per-process cache only sees in the worker that made the change;
+    # CACHE_SHARED=True vouches for one anyway, e.g. for a single process
+    per_process = cache_config['BACKEND'] in (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.dummy.DummyCache',
+    )
+    return os.getenv('CACHE_SHARED', str(not per_process)) == 'True'
+
+
+def _build_auth_user_cache(cache_shared):
+    # Off with a per-process cache: the other workers would keep the old
+    # sessions of a changed password valid until the entry expires
+    return os.getenv('AUTH_USER_CACHE', str(cache_shared)) == 'True'
+
+
+def _build_session_engine():
+    # Short names ("cached_db", "signed_cookies") refer to Django's backends
+    engine = os.getenv('SESSION_ENGINE', 'db')
+    if '.' not in engine:
+        engine = f'django.contrib.sessions.backends.{engine}'
+    return engine
+
+
+def _build_query_budget_config():
+    return {
+        'MAX_QUERIES': int(os.getenv('QUERY_BUDGET_MAX_QUERIES', '30')),
+        'MAX_DURATION_MS': float(os.getenv('QUERY_BUDGET_MAX_MS', '200')),
+        # Query counts are useful in development but should not leak
+        # to clients in production
+        'HEADERS': os.getenv(
+            'QUERY_BUDGET_HEADERS', os.getenv('DEBUG', 'False')) == 'True',
+    }
+
+
+def _build_log_output_config():
+    return {
+        # "text" or "json" (one object per line)
+        'FORMAT': os.getenv('LOG_FORMAT', 'text'),
+        # Write from a background thread through a bounded queue
+        'QUEUE': os.getenv('LOG_QUEUE', 'False') == 'True',
+        'QUEUE_SIZE': int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+        # Collapse repeated warnings per client and path into a record and
+        # a summary per window (seconds, 0 turns it off), keeping at most
+        # DEDUP_KEYS
+        'DEDUP_WINDOW': int(os.getenv('LOG_DEDUP_WINDOW', '60')),
+        'DEDUP_KEYS': int(os.getenv('LOG_DEDUP_KEYS', '1024')),
+    }
+
+
+def _build_metrics_config():
+    return {
+        # Shared by the worker processes of one server; empty keeps the
+        # metrics per process
+        'DIR': os.getenv('METRICS_DIR', ''),
+        # When set, /metrics requires "Authorization: Bearer <token>"
+        'TOKEN': os.getenv('METRICS_TOKEN', ''),
+    }
+
+
+def _build_profiling_config():
+    return {
+        # Where profiles of single requests go; empty turns profiling off
+        'DIR': os.getenv('PROFILING_DIR', os.path.join(
+            tempfile.gettempdir(), 'task_manager_profiles')),
+        # Older profiles are removed
+        'KEEP': int(os.getenv('PROFILING_KEEP', '50')),
+        'SAMPLE_INTERVAL_MS': float(
+            os.getenv('PROFILING_SAMPLE_INTERVAL_MS', '5')),
+    }
+
+
+def _build_tracing_config():
+    return {
+        # A file for OTLP JSON lines or an OTLP/HTTP traces URL such as
+        # http://127.0.0.1:4318/v1/traces; empty turns tracing off
+        'EXPORT': os.getenv('TRACING_EXPORT', ''),
+        # Share of requests traced unless the caller's traceparent decides
+        'SAMPLE_RATE': float(os.getenv('TRACING_SAMPLE_RATE', '1')),
+        'SERVICE_NAME': os.getenv('TRACING_SERVICE_NAME', 'task_manager'),
+    }
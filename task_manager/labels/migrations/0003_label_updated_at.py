@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0002_label_tasks_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='label',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
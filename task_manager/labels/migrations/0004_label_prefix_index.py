@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from task_manager.autocomplete import (
+    create_prefix_indexes,
+    drop_prefix_indexes,
+)
+
+
+def create_index(apps, schema_editor):
+    create_prefix_indexes(
+        schema_editor, apps.get_model('labels', 'Label'), ('name',))
+
+
+def drop_index(apps, schema_editor):
+    drop_prefix_indexes(
+        schema_editor, apps.get_model('labels', 'Label'), ('name',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0003_label_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
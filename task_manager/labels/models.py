@@ -1,9 +1,20 @@
 from django.db import models
 
+from task_manager.utils.models import CounterFieldsMixin
 
-class Label(models.Model):
+
+class Label(CounterFieldsMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by task_manager.tasks.counters
+    tasks_count = models.IntegerField(default=0, editable=False)
+
+    counter_fields = ('tasks_count',)
 
     def __str__(self):
         return self.name
+
+    def is_in_use(self):
+        # Answered by the (label_id, task_id) index, without joining tasks
+        return self.task_set.through.objects.filter(label=self).exists()
@@ -1,6 +1,8 @@
 import random
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from task_manager.labels.models import Label
@@ -8,6 +10,7 @@ from task_manager.tests.builders import build_label, build_task
 from task_manager.tests.utils import (
     assert_redirected_with_message,
     get_random_record,
+    query_budget,
 )
 
 
@@ -50,6 +53,27 @@ def test_labels_list_view(authenticated_client, sample_labels):
     assert 'в работе' in names
 
 
+@pytest.mark.django_db
+def test_labels_list_shows_task_counts(authenticated_client):
+    used = build_label('used')
+    unused = build_label('unused')
+    task = build_task(labels=[used])
+    build_task(name='Other', labels=[used], status=task.status,
+               author=task.author, executor=task.executor)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = authenticated_client.get(reverse('labels:list'))
+    content = response.content.decode()
+
+    counts = {item.name: item.tasks_count
+              for item in response.context['labels']}
+    assert counts['used'] == 2
+    assert counts['unused'] == 0
+    assert not any('tasks_task' in query['sql'] for query in queries)
+    assert reverse('labels:delete', args=[unused.pk]) in content
+    assert reverse('labels:delete', args=[used.pk]) not in content
+
+
 # ----- Delete view ----------------------------------------------------
 # TODO: (optional) Add edge-case tests:
 # - Attempt to delete a label with a non-existent ID (e.g., pk=99999)
@@ -110,6 +134,22 @@ def test_label_delete_linked_to_tasks(authenticated_client):
     assert Label.objects.filter(pk=linked_to_tasks_label.pk).exists()
 
 
+@pytest.mark.django_db
+def test_label_delete_in_use_is_checked_on_through_table(
+        authenticated_client):
+    label = build_label()
+    build_task(labels=[label])
+    url = reverse('labels:delete', kwargs={'pk': label.pk})
+
+    with CaptureQueriesContext(connection) as queries:
+        authenticated_client.post(url)
+
+    task_queries = [query['sql'] for query in queries
+                    if 'tasks_task' in query['sql']]
+    assert len(task_queries) == 1
+    assert 'FROM "tasks_task_labels"' in task_queries[0]
+
+
 # ----- Update view ----------------------------------------------------
 # TODO: (optional) Add edge-case tests:
 # - Attempt to update a label with a name exceeding the maximum allowed length
@@ -259,3 +299,22 @@ def test_label_create_empty_name(authenticated_client):
     assert 'name' in form.errors
     assert any('обязательное' in e.lower() for e in form.errors['name'])
     assert Label.objects.count() == 0
+
+
+# ----- Query budgets -------------------------------------------------
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, max_queries', [
+    ('labels:list', 4),
+    ('labels:create', 2),
+    ('labels:update', 3),
+    ('labels:delete', 3),
+])
+def test_label_views_query_budget(
+        authenticated_client, url_name, max_queries):
+    label = build_label()
+    args = [] if url_name.endswith(('list', 'create')) else [label.pk]
+
+    with query_budget(max_queries):
+        response = authenticated_client.get(reverse(url_name, args=args))
+
+    assert response.status_code == 200
@@ -1,11 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
 app_name = 'labels'
 
+list_view = views.AsyncLabelListView if settings.ASYNC_VIEWS \
+    else views.LabelListView
+
 urlpatterns = [
-    path('', views.LabelListView.as_view(), name='list'),
+    path('', list_view.as_view(), name='list'),
+    path('autocomplete/', views.LabelAutocompleteView.as_view(),
+         name='autocomplete'),
     path('create/', views.LabelCreateView.as_view(), name='create'),
     path('<int:pk>/update/', views.LabelUpdateView.as_view(), name='update'),
     path('<int:pk>/delete/', views.LabelDeleteView.as_view(), name='delete'),
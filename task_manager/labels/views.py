@@ -12,8 +12,13 @@ from django.views.generic import (
     UpdateView,
 )
 
-from task_manager.mixins import StrictLoginRequiredMessageMixin
-from task_manager.utils.request import format_ip_log
+from task_manager.autocomplete import AutocompleteView
+from task_manager.mixins import (
+    AsyncListMixin,
+    ConditionalGetMixin,
+    StrictLoginRequiredMessageMixin,
+)
+from task_manager.utils.log import log_context
 
 from .forms import LabelForm
 from .models import Label
@@ -21,10 +26,22 @@ from .models import Label
 logger = logging.getLogger(__name__)
 
 
-class LabelListView(StrictLoginRequiredMessageMixin, ListView):
+class LabelListView(StrictLoginRequiredMessageMixin, ConditionalGetMixin,
+                     ListView):
     model = Label
+    conditional_models = (Label,)
     context_object_name = 'labels'
     template_name = 'labels/list.html'
+    ordering = ('pk',)
+
+
+class AsyncLabelListView(AsyncListMixin, LabelListView):
+    pass
+
+
+class LabelAutocompleteView(AutocompleteView):
+    model = Label
+    search_fields = ('name',)
 
 
 class LabelUpdateView(LoginRequiredMixin, UpdateView):
@@ -37,8 +54,8 @@ class LabelUpdateView(LoginRequiredMixin, UpdateView):
         response = super().form_valid(form)
         label = form.instance
         messages.success(self.request, _('Label successfully updated'))
-        logger.info(f'✏️ Label successfully updated: {label} '
-                    f'{format_ip_log(self.request)}')
+        logger.info('✏️ Label successfully updated: %s', label,
+                    extra=log_context(self.request, 'label_updated', label.pk))
         return response
 
 
@@ -52,8 +69,8 @@ class LabelCreateView(LoginRequiredMixin, CreateView):
         response = super().form_valid(form)
         label = form.instance
         messages.success(self.request, _('Label successfully created'))
-        logger.info(f'✅ New label created: {label} '
-                    f'{format_ip_log(self.request)}')
+        logger.info('✅ New label created: %s', label,
+                    extra=log_context(self.request, 'label_created', label.pk))
         return response
 
 
@@ -65,24 +82,19 @@ class LabelDeleteView(LoginRequiredMixin, DeleteView):
 
     def post(self, request, *args, **kwargs):
         label = self.get_object()
-        if self._is_in_use(label):
+        if label.is_in_use():
             messages.error(
                 request,
                 _('Cannot delete label because '
                   'it is in use by one or more tasks.')
             )
             logger.warning(
-                f'⚠️ Attempted to delete label in use: '
-                f'{label} {format_ip_log(request)}'
+                '⚠️ Attempted to delete label in use: %s', label,
+                extra=log_context(request, 'label_delete_protected', label.pk),
             )
         else:
+            context = log_context(request, 'label_deleted', label.pk)
             label.delete()
             messages.success(request, _('Label successfully deleted'))
-            logger.info(
-                f'❌ Label deleted: {label} {format_ip_log(request)}'
-            )
+            logger.info('❌ Label deleted: %s', label, extra=context)
         return redirect(self.success_url)
-
-    @staticmethod
-    def _is_in_use(label):
-        return label.task_set.exists()
@@ -0,0 +1,337 @@
+"""In-process metrics in the Prometheus text format.
+
+Every thread adds to its own dict of samples, so recording takes no
+lock; a scrape sums the dicts. With ``METRICS['DIR']`` set, each process
+also writes its totals to ``<DIR>/<pid>.json`` about once per
+``FLUSH_INTERVAL``, and a scrape adds up the files of all processes, so
+a forking server reports the totals of every worker. Counters of exited
+workers keep counting; gauges only count for running ones. Clear the
+directory when the server starts.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FLUSH_INTERVAL = 1.0
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class _Samples:
+    """(metric, suffix, label values) -> value, sharded per thread."""
+
+    def __init__(self):
+        self.reset()
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def add(self, key, amount=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        shard[key] = shard.get(key, 0) + amount
+        self.dirty = True
+
+    def totals(self):
+        with self._lock:
+            shards = list(self._shards)
+        totals = defaultdict(int)
+        for shard in shards:
+            for key, value in shard.copy().items():
+                totals[key] += value
+        return totals
+
+
+_samples = _Samples()
+
+
+def _escape(value):
+    return (value.replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def _sample(name, names, values, value):
+    labels = ','.join(f'{label}="{_escape(label_value)}"'
+                      for label, label_value in zip(names, values))
+    if labels:
+        name = f'{name}{{{labels}}}'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return f'{name} {value}'
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _label_values(self, values):
+        if len(values) != len(self.labels):
+            raise ValueError(f'{self.name} takes labels {self.labels}')
+        return tuple(map(str, values))
+
+    def _add(self, suffix, values, amount=1):
+        _samples.add((self.name, suffix, values), amount)
+
+    def render(self, samples):
+        """Exposition lines, given the ``collect()`` of all metrics."""
+        return [f'# HELP {self.name} {self.documentation}',
+                f'# TYPE {self.name} {self.type}',
+                *self._lines(samples)]
+
+    def _lines(self, samples):
+        for (_suffix, values), value in sorted(samples[self.name].items()):
+            yield _sample(self.name, self.labels, values, value)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *values, amount=1):
+        self._add('', self._label_values(values), amount)
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def inc(self, *values, amount=1):
+        self._add('', self._label_values(values), amount)
+
+    def dec(self, *values, amount=1):
+        self._add('', self._label_values(values), -amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._bounds = [_format_bound(bound) for bound in self.buckets]
+
+    def observe(self, amount, *values):
+        # Buckets are stored non-cumulative; render() adds them up
+        values = self._label_values(values)
+        bound = self._bounds[bisect_left(self.buckets, amount)]
+        self._add('_bucket', (*values, bound))
+        self._add('_sum', values, amount)
+        self._add('_count', values)
+
+    def _lines(self, samples):
+        series = defaultdict(dict)
+        for (suffix, values), value in samples[self.name].items():
+            if suffix == '_bucket':
+                series[values[:-1]][values[-1]] = value
+            else:
+                series[values][suffix] = value
+        bucket_labels = (*self.labels, 'le')
+        for values, data in sorted(series.items()):
+            total = 0
+            for bound in self._bounds:
+                total += data.get(bound, 0)
+                yield _sample(f'{self.name}_bucket', bucket_labels,
+                              (*values, bound), total)
+            for suffix in ('_sum', '_count'):
+                yield _sample(f'{self.name}{suffix}', self.labels, values,
+                              data.get(suffix, 0))
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+class HitRatio(Metric):
+    """Gauge of ``hit / (hit + miss)`` per cache, computed on render from
+    a counter labelled ``(cache, result)``."""
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, counter):
+        super().__init__(name, documentation, ('cache',))
+        self.counter = counter
+
+    def _lines(self, samples):
+        counts = defaultdict(dict)
+        for (_suffix, (name, result)), value in \
+                samples[self.counter.name].items():
+            counts[name][result] = value
+        for name, results in sorted(counts.items()):
+            total = results.get('hit', 0) + results.get('miss', 0)
+            if total:
+                yield _sample(self.name, self.labels, (name,),
+                              round(results.get('hit', 0) / total, 4))
+
+
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests being handled.')
+REQUESTS = Counter(
+    'http_requests_total', 'Handled requests.', ('view', 'method', 'status'))
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request handling time.',
+    ('view', 'method'),
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size, streaming excluded.',
+    ('view',), (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304))
+DB_QUERIES = Histogram(
+    'db_queries_per_request', 'SQL queries run by a request.',
+    ('view',), (0, 1, 2, 5, 10, 20, 30, 50, 100))
+DB_DURATION = Histogram(
+    'db_query_duration_seconds', 'Time a request spent in SQL queries.',
+    ('view',), (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by outcome.', ('cache', 'result'))
+CACHE_HIT_RATIO = HitRatio(
+    'cache_hit_ratio', 'Share of cache lookups that hit.', CACHE_REQUESTS)
+
+METRICS = (IN_FLIGHT, REQUESTS, REQUEST_DURATION, RESPONSE_SIZE, DB_QUERIES,
+           DB_DURATION, CACHE_REQUESTS, CACHE_HIT_RATIO)
+
+
+def cache_lookup(name, hits=0, misses=0):
+    if hits:
+        CACHE_REQUESTS.inc(name, 'hit', amount=hits)
+    if misses:
+        CACHE_REQUESTS.inc(name, 'miss', amount=misses)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        # Not the path: unknown URLs would add a series each
+        return 'unmatched'
+    return match.view_name or match._func_path
+
+
+def observe_request(request, response, duration):
+    view = view_label(request)
+    method = request.method if request.method in METHODS else 'other'
+    REQUEST_DURATION.observe(duration, view, method)
+    REQUESTS.inc(view, method, response.status_code)
+    if not response.streaming:
+        RESPONSE_SIZE.observe(len(response.content), view)
+    counter = getattr(request, 'query_counter', None)
+    if counter is not None:
+        DB_QUERIES.observe(counter.count, view)
+        DB_DURATION.observe(counter.duration, view)
+    if settings.METRICS['DIR']:
+        _flusher.ensure_started()
+
+
+def _directory():
+    return settings.METRICS['DIR']
+
+
+def _path(directory, pid):
+    return os.path.join(directory, f'{pid}.json')
+
+
+def write_samples(directory):
+    """Write this process's totals for the scrapes of other processes."""
+    os.makedirs(directory, exist_ok=True)
+    _samples.dirty = False
+    path = _path(directory, os.getpid())
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump([[name, suffix, values, value] for
+                   (name, suffix, values), value in _samples.totals().items()],
+                  file)
+    os.replace(f'{path}.tmp', path)
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_samples(directory, totals):
+    gauges = {metric.name for metric in METRICS if metric.type == 'gauge'}
+    for entry in os.scandir(directory):
+        pid, ext = os.path.splitext(entry.name)
+        if ext != '.json' or not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            with open(entry.path) as file:
+                samples = json.load(file)
+        except (OSError, ValueError):
+            continue  # written or removed meanwhile
+        running = _is_running(int(pid))
+        for name, suffix, values, value in samples:
+            if running or name not in gauges:
+                totals[name, suffix, tuple(values)] += value
+
+
+def collect():
+    """{metric: {(suffix, label values): value}} over all processes."""
+    totals = _samples.totals()
+    directory = _directory()
+    if directory and os.path.isdir(directory):
+        _read_samples(directory, totals)
+    samples = defaultdict(dict)
+    for (name, suffix, values), value in totals.items():
+        samples[name][suffix, values] = value
+    return samples
+
+
+def render(metrics=METRICS):
+    samples = collect()
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render(samples))
+    return '\n'.join(lines) + '\n'
+
+
+class _Flusher:
+    """Writes the totals every ``FLUSH_INTERVAL`` while they change."""
+
+    def __init__(self):
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # Threads don't survive fork(), so a forked worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                threading.Thread(target=self._run, daemon=True,
+                                 name='metrics-flusher').start()
+                self._pid = os.getpid()
+                atexit.register(self.flush)
+
+    def flush(self):
+        directory = _directory()
+        if directory and _samples.dirty:
+            write_samples(directory)
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+
+_flusher = _Flusher()
@@ -0,0 +1,363 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from task_manager import metrics, profiling, tracing
+from task_manager.utils.log import log_context
+from task_manager.utils.request import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Number and total time of the queries of a ``count_queries()``
+    block. The statements and their durations are only kept with
+    ``collect_sql``, for tests and profiles."""
+
+    def __init__(self, collect_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.collect_sql = collect_sql
+        self.queries = []
+        self.durations = []
+
+    def add(self, sql, duration):
+        self.duration += duration
+        self.count += 1
+        if self.collect_sql:
+            self.queries.append(sql)
+            self.durations.append(duration)
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+
+# The counters of the enclosing count_queries() blocks. A context
+# variable, so queries that async code runs in sync_to_async() threads
+# count as well.
+_counters = ContextVar('task_manager_query_counters', default=())
+
+
+def _count_query(execute, sql, params, many, context):
+    counters = _counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for counter in counters:
+            counter.add(sql, duration)
+
+
+def _instrument_connection(connection, **kwargs):
+    # First in the list: execute_wrapper() blocks pop the last one
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+connection_created.connect(
+    _instrument_connection, dispatch_uid='task_manager.count_queries')
+
+
+@contextmanager
+def count_queries(collect_sql=False):
+    """Count the queries run in the block, on every database connection
+    and in the threads that ``sync_to_async()`` hands them to."""
+    # Connections opened before this module was imported
+    for connection in connections.all(initialized_only=True):
+        _instrument_connection(connection)
+    counter = QueryCounter(collect_sql)
+    token = _counters.set((*_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+class QueryBudgetMiddleware:
+    """Count SQL queries per request and warn about requests over budget.
+
+    Queries run while a streaming response is consumed happen after the
+    middleware returns and are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with count_queries() as counter:
+            # For MetricsMiddleware
+            request.query_counter = counter
+            response = self.get_response(request)
+        return self._check_budget(request, response, counter)
+
+    async def __acall__(self, request):
+        with count_queries() as counter:
+            request.query_counter = counter
+            response = await self.get_response(request)
+        return self._check_budget(request, response, counter)
+
+    def _check_budget(self, request, response, counter):
+        budget = settings.QUERY_BUDGET
+        if counter.count > budget['MAX_QUERIES'] or \
+                counter.duration_ms > budget['MAX_DURATION_MS']:
+            logger.warning(
+                '🐢 Query budget exceeded by %s: %d queries in %.1f ms '
+                '(budget %d queries, %s ms)',
+                self._view_name(request), counter.count,
+                counter.duration_ms, budget['MAX_QUERIES'],
+                budget['MAX_DURATION_MS'],
+                extra=log_context(request, 'query_budget_exceeded'),
+            )
+        if budget['HEADERS']:
+            response['X-DB-Queries'] = str(counter.count)
+            timing = (f'db;dur={counter.duration_ms:.1f};'
+                      f'desc="{counter.count} queries"')
+            if response.has_header('Server-Timing'):
+                timing = f'{response["Server-Timing"]}, {timing}'
+            response['Server-Timing'] = timing
+        return response
+
+    @staticmethod
+    def _view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return request.path
+        return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    """Record request metrics, see ``task_manager.metrics``.
+
+    Goes first, so the timings cover the other middleware; query counts
+    come from ``QueryBudgetMiddleware``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics.IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.IN_FLIGHT.dec()
+        metrics.observe_request(
+            request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        metrics.IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.IN_FLIGHT.dec()
+        metrics.observe_request(
+            request, response, time.perf_counter() - started)
+        return response
+
+
+class ProfilingMiddleware:
+    """Profile the requests staff users ask for, see
+    ``task_manager.profiling``. Needs ``request.user``, so it goes after
+    AuthenticationMiddleware; without ``PROFILING['DIR']`` it drops out
+    of the middleware chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING['DIR']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = profiling.requested_token(request)
+        if token is None or not self._is_allowed(request, token):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        with count_queries(collect_sql=True) as counter, \
+                profiling.make_profiler(request) as profiler:
+            response = self.get_response(request)
+        timings = self._timings(counter, started, cpu_started)
+        return self._save(request, response, profiler, counter, timings)
+
+    async def __acall__(self, request):
+        token = profiling.requested_token(request)
+        # Checking the user loads it, which async code can't do directly
+        if token is None or \
+                not await sync_to_async(self._is_allowed)(request, token):
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        with count_queries(collect_sql=True) as counter, \
+                profiling.make_profiler(request) as profiler:
+            response = await self.get_response(request)
+        timings = self._timings(counter, started, cpu_started)
+        return await sync_to_async(self._save)(
+            request, response, profiler, counter, timings)
+
+    @staticmethod
+    def _is_allowed(request, token):
+        if profiling.is_allowed(request, token):
+            return True
+        logger.warning(
+            '🚫 Profiling denied for %s', request.path,
+            extra=log_context(request, 'profile_denied'),
+        )
+        return False
+
+    @staticmethod
+    def _timings(counter, started, cpu_started):
+        total_ms = (time.perf_counter() - started) * 1000
+        return {
+            'total_ms': round(total_ms, 1),
+            'cpu_ms': round((time.thread_time() - cpu_started) * 1000, 1),
+            'sql_ms': round(counter.duration_ms, 1),
+            'other_ms': round(total_ms - counter.duration_ms, 1),
+            'queries': counter.count,
+        }
+
+    @staticmethod
+    def _save(request, response, profiler, counter, timings):
+        profile_id = profiling.save(
+            request, response, profiler, counter, timings)
+        response['X-Profile-Id'] = profile_id
+        logger.info(
+            '🔬 Profiled %s %s as %s (%.1f ms)', request.method,
+            request.path, profile_id, timings['total_ms'],
+            extra=log_context(request, 'request_profiled', profile_id),
+        )
+        return response
+
+
+class TracingMiddleware:
+    """Trace sampled requests, see ``task_manager.tracing``. Goes first,
+    so the request span covers the other middleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.TRACING['EXPORT']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        parent = tracing.parse_traceparent(request.headers.get('traceparent'))
+        if not tracing.should_sample(parent):
+            return self.get_response(request)
+
+        with self._trace(request, parent) as root:
+            response = self.get_response(request)
+            self._finish(root, request, response,
+                         getattr(request, 'user', None))
+        response['traceresponse'] = root.traceparent()
+        return response
+
+    async def __acall__(self, request):
+        parent = tracing.parse_traceparent(request.headers.get('traceparent'))
+        if not tracing.should_sample(parent):
+            return await self.get_response(request)
+
+        with self._trace(request, parent) as root:
+            response = await self.get_response(request)
+            user = await request.auser() if hasattr(request, 'auser') \
+                else None
+            self._finish(root, request, response, user)
+        response['traceresponse'] = root.traceparent()
+        return response
+
+    @staticmethod
+    def _trace(request, parent):
+        # Connections of other threads are instrumented as they open
+        tracing.instrument_connections(connections)
+        return tracing.trace(request.method, parent, **{
+            'http.request.method': request.method,
+            'url.path': request.path,
+            'client.address': get_client_ip(request),
+        })
+
+    @staticmethod
+    def _finish(root, request, response, user):
+        view = metrics.view_label(request)
+        root.name = f'{request.method} {view}'
+        root.set_attribute('http.route', view)
+        root.set_attribute('http.response.status_code', response.status_code)
+        root.set_attribute('enduser.id', getattr(user, 'pk', None))
+
+
+class TracingViewMiddleware:
+    """Span for the view and its template rendering. Goes last; the
+    rest of the request span is the time spent in other middleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.TRACING['EXPORT']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with tracing.span('view') as view_span:
+            response = self.get_response(request)
+            self._name(view_span, request)
+            return response
+
+    async def __acall__(self, request):
+        with tracing.span('view') as view_span:
+            response = await self.get_response(request)
+            self._name(view_span, request)
+            return response
+
+    @staticmethod
+    def _name(view_span, request):
+        if view_span is not tracing.NOOP_SPAN:
+            view_span.name = f'view {metrics.view_label(request)}'
@@ -1,12 +1,20 @@
+import hashlib
 import logging
+from inspect import isawaitable
 
 from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.timezone import get_current_timezone_name
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
-from task_manager.utils.request import format_ip_log
+from task_manager import versions
+from task_manager.utils.log import log_context
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +25,115 @@ class StrictLoginRequiredMessageMixin(LoginRequiredMixin):
     def handle_no_permission(self):
         request = self.request
         if not request.user.is_authenticated:
+            # Small enough for the messages cookie, so anonymous visitors
+            # and bots get no server-side session
             messages.error(request, self.login_message)
-            full_path = request.get_full_path()
             logger.warning(
-                f'🚫 Unauthorized attempt to access '
-                f'{full_path} {format_ip_log(request)}'
+                '🚫 Unauthorized attempt to access %s', request.get_full_path(),
+                extra=log_context(request, 'login_required'),
             )
             return redirect(settings.LOGIN_URL)
         return super().handle_no_permission()
+
+
+class StaffRequiredMixin(StrictLoginRequiredMessageMixin, UserPassesTestMixin):
+    """Logged in staff only; other users get 403 Forbidden."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+
+class ConditionalGetMixin:
+    """Answer GET and HEAD with 304 Not Modified while none of the
+    ``conditional_models`` tables changed, without running the view.
+
+    Besides the table versions, the ETag covers what differs between
+    visitors of one URL: the user, language, time zone and the CSRF
+    secret that the page's forms are rendered with.
+    """
+    conditional_models = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        # Pending messages are only shown by a full render
+        if request.method not in ('GET', 'HEAD') or \
+                messages.get_messages(request):
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(
+            versions.get_versions(self.conditional_models))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self._add_validators(response, etag, last_modified)
+
+    async def _adispatch(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(
+            await versions.aget_versions(self.conditional_models))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return self._add_validators(response, etag, last_modified)
+
+    def get_validators(self, found):
+        """ETag and Last-Modified timestamp of the page from the table
+        versions ``found`` by ``versions.get_versions()``."""
+        request = self.request
+        tables = sorted(versions.table_of(model)
+                        for model in self.conditional_models)
+        parts = [f'{table}={found.get(table, (0, None))[0]}'
+                 for table in tables]
+        # Sets up the CSRF secret before the first render, so it is stable
+        get_token(request)
+        parts += [
+            f'user={request.user.pk}',
+            f'lang={get_language()}',
+            f'tz={get_current_timezone_name()}',
+            f'csrf={request.META["CSRF_COOKIE"]}',
+        ]
+        etag = hashlib.md5(
+            ';'.join(parts).encode(), usedforsecurity=False).hexdigest()
+        changed = [changed_at for _version, changed_at in found.values()
+                   if changed_at is not None]
+        last_modified = int(max(changed).timestamp()) if changed else None
+        return quote_etag(etag), last_modified
+
+    @staticmethod
+    def _add_validators(response, etag, last_modified):
+        if response.status_code not in (200, 304):
+            return response
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified',
+                                        http_date(last_modified))
+        response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class AsyncViewMixin:
+    """Coroutine ``dispatch()`` for views with async handlers.
+
+    The user is loaded with the async auth API before the sync mixins
+    further down run their checks, so those never touch the database
+    from the event loop. Handlers load their rows with the async ORM;
+    the template is rendered by Django in a worker thread afterwards.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        response = super().dispatch(request, *args, **kwargs)
+        if isawaitable(response):
+            response = await response
+        return response
+
+
+class AsyncListMixin(AsyncViewMixin):
+    """Async ``get()`` for unpaginated list views."""
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [
+            obj async for obj in self.get_queryset().aiterator()]
+        return self.render_to_response(self.get_context_data())
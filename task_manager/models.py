@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class TableVersion(models.Model):
+    """Change counter of one model's table, see task_manager.versions."""
+    table = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f'{self.table} v{self.version}'
@@ -0,0 +1,262 @@
+"""On-demand profiles of single requests.
+
+A staff user adds ``?__profile=<token>`` to a URL, or sends the token in
+an ``X-Profile`` header, and ``ProfilingMiddleware`` runs the request
+under cProfile. With ``__profile_mode=sample`` (or ``X-Profile-Mode``) a
+thread samples the request's stack instead, which stays cheap for long
+requests. The profile, the SQL queries and a timing breakdown go to
+``PROFILING['DIR']``, which keeps the newest ``PROFILING['KEEP']``.
+
+cProfile is process-wide from Python 3.12 on: it also records what
+other threads run meanwhile, and only one profile can be active. So one
+request at a time is run under cProfile; a request asking for it while
+another one is profiled is sampled instead. The stack sampler only
+samples the thread handling the request; under ASGI that is the event
+loop, so the ``sync_to_async()`` work of an async view shows up as time
+spent waiting for it.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import suppress
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+
+PARAM = '__profile'
+MODE_PARAM = '__profile_mode'
+HEADER = 'HTTP_X_PROFILE'
+MODE_HEADER = 'HTTP_X_PROFILE_MODE'
+TOKEN_SALT = 'task_manager.profiling'
+TOKEN_MAX_AGE = 60 * 60 * 12
+REPORT_LINES = 40
+PROFILE_ID = re.compile(r'\d{8}-\d{6}-[0-9a-f]{8}')
+
+# Held while cProfile runs, see the module docstring
+_cprofile_lock = threading.Lock()
+
+
+def make_token(user):
+    return signing.dumps(user.pk, salt=TOKEN_SALT)
+
+
+def requested_token(request):
+    """The profiling token sent with ``request``, usually None."""
+    # Checked on every request, so without parsing the query string
+    if f'{PARAM}=' in request.META.get('QUERY_STRING', ''):
+        return request.GET.get(PARAM)
+    return request.META.get(HEADER)
+
+
+def is_allowed(request, token):
+    user = request.user
+    if not user.is_staff:
+        return False
+    try:
+        user_id = signing.loads(token, salt=TOKEN_SALT, max_age=TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return user_id == user.pk
+
+
+def make_profiler(request):
+    """A profiler to enter right away: it may hold the cProfile lock."""
+    mode = request.GET.get(MODE_PARAM) or request.META.get(MODE_HEADER)
+    if mode != StackSampler.mode and _cprofile_lock.acquire(blocking=False):
+        return FunctionProfiler()
+    return StackSampler(settings.PROFILING['SAMPLE_INTERVAL_MS'] / 1000)
+
+
+class FunctionProfiler:
+    """cProfile run; ``make_profiler()`` acquires ``_cprofile_lock`` for
+    it and ``__exit__`` releases it."""
+
+    mode = 'cprofile'
+    extension = 'prof'
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def __enter__(self):
+        try:
+            self._profile.enable()
+        except BaseException:
+            _cprofile_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self._profile.disable()
+        finally:
+            _cprofile_lock.release()
+
+    def report(self):
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(REPORT_LINES)
+        return stream.getvalue()
+
+    def dump(self, path):
+        # Opens in pstats, snakeviz and the like
+        self._profile.dump_stats(path)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return (f'{code.co_qualname} '
+            f'({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+
+
+def _stack(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+class StackSampler:
+    """Counts the stacks of the entering thread every ``interval``
+    seconds from a background thread."""
+
+    mode = 'sample'
+    extension = 'folded'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name='profiling-sampler')
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[_stack(frame)] += 1
+
+    def report(self):
+        total = sum(self.stacks.values())
+        if not total:
+            return 'No samples, the request was too short\n'
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+        lines = [f'{total} samples, every {self.interval * 1000:g} ms',
+                 '', '  own  total  function']
+        for label, count in inclusive.most_common(REPORT_LINES):
+            lines.append(f'{own[label] / total:5.1%} {count / total:6.1%}  '
+                         f'{label}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        # "frame;frame;frame count" lines, as flame graph tools read them
+        with open(path, 'w') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{";".join(stack)} {count}\n')
+
+
+def _request_path(request):
+    query = request.GET.copy()
+    for param in (PARAM, MODE_PARAM):
+        query.pop(param, None)
+    return f'{request.path}?{query.urlencode()}' if query else request.path
+
+
+def _paths(directory, profile_id):
+    return [os.path.join(directory, f'{profile_id}.{extension}')
+            for extension in ('json', FunctionProfiler.extension,
+                              StackSampler.extension)]
+
+
+def save(request, response, profiler, queries, timings):
+    """Write a profile and return its id."""
+    directory = settings.PROFILING['DIR']
+    os.makedirs(directory, exist_ok=True)
+    created = datetime.now(UTC)
+    profile_id = f'{created:%Y%m%d-%H%M%S}-{uuid4().hex[:8]}'
+    file_name = f'{profile_id}.{profiler.extension}'
+    profiler.dump(os.path.join(directory, file_name))
+    record = {
+        'id': profile_id,
+        'created': created.isoformat(),
+        'method': request.method,
+        'path': _request_path(request),
+        'user': request.user.get_username(),
+        'status': response.status_code,
+        'mode': profiler.mode,
+        'file': file_name,
+        'timings': timings,
+        'queries': [{'sql': sql, 'ms': round(duration * 1000, 2)}
+                    for sql, duration in zip(queries.queries,
+                                             queries.durations)],
+        'report': profiler.report(),
+    }
+    # Written last: the listing only looks at complete profiles
+    path = os.path.join(directory, f'{profile_id}.json')
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(record, file)
+    os.replace(f'{path}.tmp', path)
+    _rotate(directory, settings.PROFILING['KEEP'])
+    return profile_id
+
+
+def _profile_ids(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted((name.removesuffix('.json')
+                   for name in os.listdir(directory)
+                   if name.endswith('.json')
+                   and PROFILE_ID.fullmatch(name.removesuffix('.json'))),
+                  reverse=True)
+
+
+def _rotate(directory, keep):
+    for profile_id in _profile_ids(directory)[keep:]:
+        for path in _paths(directory, profile_id):
+            with suppress(FileNotFoundError):
+                os.remove(path)
+
+
+def load(profile_id):
+    """The saved record of ``profile_id``, or None."""
+    if not PROFILE_ID.fullmatch(profile_id):
+        return None
+    path = os.path.join(settings.PROFILING['DIR'], f'{profile_id}.json')
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def recent():
+    """Saved records, newest first."""
+    profiles = (load(profile_id)
+                for profile_id in _profile_ids(settings.PROFILING['DIR']))
+    return [profile for profile in profiles if profile is not None]
+
+
+def file_path(profile):
+    """Path of the cProfile or stack sample file of a loaded record."""
+    return os.path.join(settings.PROFILING['DIR'], profile['file'])
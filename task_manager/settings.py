@@ -24,9 +24,32 @@ DEBUG = env['DEBUG']
 SECRET_KEY = env['SECRET_KEY']
 ALLOWED_HOSTS = env['ALLOWED_HOSTS']
 DATABASES = env['DATABASES']
+CACHES = env['CACHES']
+# Whether every worker process sees the same cache; task list rows and
+# form choices are only cached then
+CACHE_SHARED = env['CACHE_SHARED']
+SESSION_ENGINE = env['SESSION_ENGINE']
+# Per-request SQL budget, see task_manager.middleware.QueryBudgetMiddleware
+QUERY_BUDGET = env['QUERY_BUDGET']
+# /metrics, see task_manager.metrics
+METRICS = env['METRICS']
+# Profiles of single requests, see task_manager.profiling
+PROFILING = env['PROFILING']
+# Request traces, see task_manager.tracing
+TRACING = env['TRACING']
+# Async list/detail views, see task_manager.mixins.AsyncViewMixin
+ASYNC_VIEWS = env['ASYNC_VIEWS']
 
 # User model
 AUTH_USER_MODEL = 'users.CustomUser'
+# ModelBackend that caches the user looked up for every request, when
+# AUTH_USER_CACHE is on. ModelBackend stays for the sessions logged in
+# through it.
+AUTH_USER_CACHE = env['AUTH_USER_CACHE']
+AUTHENTICATION_BACKENDS = [
+    'task_manager.users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
 
 LOGIN_URL = reverse_lazy('login')
 LOGIN_REDIRECT_URL = '/'
@@ -54,6 +77,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'task_manager.middleware.TracingMiddleware',
+    'task_manager.middleware.MetricsMiddleware',
+    'task_manager.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,6 +88,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
+    'task_manager.middleware.ProfilingMiddleware',
+    'task_manager.middleware.TracingViewMiddleware',
 ]
 
 ROOT_URLCONF = 'task_manager.urls'
@@ -81,6 +109,14 @@ TEMPLATES = [
         },
     },
 ]
+if TRACING['EXPORT']:
+    # Spans for template rendering and cache operations
+    TEMPLATES[0]['BACKEND'] = 'task_manager.tracing.TracedDjangoTemplates'
+    CACHES['default'] = {
+        **CACHES['default'],
+        'BACKEND': 'task_manager.tracing.TracedCache',
+        'TRACED_BACKEND': CACHES['default']['BACKEND'],
+    }
 
 WSGI_APPLICATION = 'task_manager.wsgi.application'
 
@@ -135,11 +171,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CRISPY_ALLOWED_TEMPLATE_PACKS = 'bootstrap5'
 CRISPY_TEMPLATE_PACK = 'bootstrap5'
 
+# Console output, see task_manager.utils.log
+LOG_OUTPUT = env['LOG_OUTPUT']
+console_handler = {
+    'class': 'logging.StreamHandler',
+    'formatter': 'json' if LOG_OUTPUT['FORMAT'] == 'json' else 'verbose',
+}
+if LOG_OUTPUT['QUEUE']:
+    console_handler |= {
+        'class': 'task_manager.utils.log.QueueLogHandler',
+        'maxsize': LOG_OUTPUT['QUEUE_SIZE'],
+    }
+log_filters = {}
+if LOG_OUTPUT['DEDUP_WINDOW']:
+    log_filters['dedup'] = {
+        '()': 'task_manager.utils.log.DedupFilter',
+        'window': LOG_OUTPUT['DEDUP_WINDOW'],
+        'max_keys': LOG_OUTPUT['DEDUP_KEYS'],
+    }
+    console_handler['filters'] = ['dedup']
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
         'verbose': {
+            '()': 'task_manager.utils.log.TextFormatter',
             'format': '[{asctime}] {levelname} [{name}:{lineno}] {message}',
             'style': '{',
         },
@@ -147,12 +204,13 @@ LOGGING = {
             'format': '{levelname}: {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'task_manager.utils.log.JSONFormatter',
+        },
     },
+    'filters': log_filters,
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
-        },
+        'console': console_handler,
     },
     'loggers': {
         # default logger
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statuses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='status',
+            name='tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,9 +1,19 @@
 from django.db import models
 
+from task_manager.utils.models import CounterFieldsMixin
 
-class Status(models.Model):
+
+class Status(CounterFieldsMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by task_manager.tasks.counters
+    tasks_count = models.IntegerField(default=0, editable=False)
+
+    counter_fields = ('tasks_count',)
 
     def __str__(self):
         return self.name
+
+    def is_in_use(self):
+        return self.tasks.exists()
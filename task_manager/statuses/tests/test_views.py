@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from task_manager.statuses.models import Status
@@ -6,6 +8,7 @@ from task_manager.tests.builders import build_status, build_task
 from task_manager.tests.utils import (
     assert_redirected_with_message,
     get_random_record,
+    query_budget,
 )
 
 
@@ -47,6 +50,27 @@ def test_statuses_list_view(authenticated_client, sample_statuses):
     assert 'in progress' in names
 
 
+@pytest.mark.django_db
+def test_statuses_list_shows_task_counts(authenticated_client):
+    used = build_status('used')
+    unused = build_status('unused')
+    task = build_task(status=used)
+    build_task(name='Other', status=used,
+               author=task.author, executor=task.executor)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = authenticated_client.get(reverse('statuses:list'))
+    content = response.content.decode()
+
+    counts = {item.name: item.tasks_count
+              for item in response.context['statuses']}
+    assert counts['used'] == 2
+    assert counts['unused'] == 0
+    assert not any('tasks_task' in query['sql'] for query in queries)
+    assert reverse('statuses:delete', args=[unused.pk]) in content
+    assert reverse('statuses:delete', args=[used.pk]) not in content
+
+
 # ----- Delete view ---------------------------------------------------
 # TODO: (optional) Add edge-case tests:
 # - Attempt to delete a status with a non-existent ID (e.g., pk=99999)
@@ -103,6 +127,21 @@ def test_status_delete_linked_to_tasks(authenticated_client):
     )
     assert Status.objects.filter(pk=linked_to_tasks_status.pk).exists()
 
+
+@pytest.mark.django_db
+def test_status_delete_in_use_skips_deletion_collector(authenticated_client):
+    status = build_status()
+    build_task(status=status)
+    url = reverse('statuses:delete', kwargs={'pk': status.pk})
+
+    with CaptureQueriesContext(connection) as queries:
+        authenticated_client.post(url)
+
+    task_queries = [query['sql'] for query in queries
+                    if 'tasks_task' in query['sql']]
+    assert len(task_queries) == 1
+    assert task_queries[0].startswith('SELECT 1 AS')
+
 # ----- Update view ----------------------------------------------------
 # TODO: (optional) Add edge-case tests:
 # - Attempt to update a status with a name exceeding the maximum allowed length
@@ -252,3 +291,22 @@ def test_status_create_empty_name(authenticated_client):
     assert 'name' in form.errors
     assert any('обязательное' in e.lower() for e in form.errors['name'])
     assert Status.objects.count() == 0
+
+
+# ----- Query budgets -------------------------------------------------
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, max_queries', [
+    ('statuses:list', 4),
+    ('statuses:create', 2),
+    ('statuses:update', 3),
+    ('statuses:delete', 3),
+])
+def test_status_views_query_budget(
+        authenticated_client, url_name, max_queries):
+    status = build_status()
+    args = [] if url_name.endswith(('list', 'create')) else [status.pk]
+
+    with query_budget(max_queries):
+        response = authenticated_client.get(reverse(url_name, args=args))
+
+    assert response.status_code == 200
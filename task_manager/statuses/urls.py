@@ -1,11 +1,15 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
 app_name = 'statuses'
 
+list_view = views.AsyncStatusListView if settings.ASYNC_VIEWS \
+    else views.StatusListView
+
 urlpatterns = [
-    path('', views.StatusListView.as_view(), name='list'),
+    path('', list_view.as_view(), name='list'),
     path('create/', views.StatusCreateView.as_view(), name='create'),
     path('<int:pk>/update/', views.StatusUpdateView.as_view(), name='update'),
     path('<int:pk>/delete/', views.StatusDeleteView.as_view(), name='delete'),
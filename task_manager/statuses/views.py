@@ -13,8 +13,12 @@ from django.views.generic import (
     UpdateView,
 )
 
-from task_manager.mixins import StrictLoginRequiredMessageMixin
-from task_manager.utils.request import format_ip_log
+from task_manager.mixins import (
+    AsyncListMixin,
+    ConditionalGetMixin,
+    StrictLoginRequiredMessageMixin,
+)
+from task_manager.utils.log import log_context
 
 from .forms import StatusForm
 from .models import Status
@@ -22,10 +26,17 @@ from .models import Status
 logger = logging.getLogger(__name__)
 
 
-class StatusListView(StrictLoginRequiredMessageMixin, ListView):
+class StatusListView(StrictLoginRequiredMessageMixin, ConditionalGetMixin,
+                     ListView):
     model = Status
+    conditional_models = (Status,)
     context_object_name = 'statuses'
     template_name = 'statuses/list.html'
+    ordering = ('pk',)
+
+
+class AsyncStatusListView(AsyncListMixin, StatusListView):
+    pass
 
 
 class StatusUpdateView(LoginRequiredMixin, UpdateView):
@@ -38,8 +49,9 @@ class StatusUpdateView(LoginRequiredMixin, UpdateView):
         response = super().form_valid(form)
         status = form.instance
         messages.success(self.request, _('Status successfully updated'))
-        logger.info(f'✏️ Status successfully updated: {status} '
-                    f'{format_ip_log(self.request)}')
+        logger.info('✏️ Status successfully updated: %s', status,
+                    extra=log_context(
+                        self.request, 'status_updated', status.pk))
         return response
 
 
@@ -53,8 +65,9 @@ class StatusCreateView(LoginRequiredMixin, CreateView):
         response = super().form_valid(form)
         status = form.instance
         messages.success(self.request, _('Status successfully created'))
-        logger.info(f'✅ New status created: {status} '
-                    f'{format_ip_log(self.request)}')
+        logger.info('✅ New status created: %s', status,
+                    extra=log_context(
+                        self.request, 'status_created', status.pk))
         return response
 
 
@@ -66,20 +79,25 @@ class StatusDeleteView(LoginRequiredMixin, DeleteView):
 
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
+        pk = self.object.pk
+        # The indexed existence check spares the deletion collector;
+        # ProtectedError still covers a task added in between
         try:
-            self.object.delete()
-            messages.success(request, _('Status successfully deleted'))
-            logger.info(
-                f'❌ Status deleted: {self.object} {format_ip_log(request)}'
-            )
+            if not self.object.is_in_use():
+                self.object.delete()
+                messages.success(request, _('Status successfully deleted'))
+                logger.info('❌ Status deleted: %s', self.object,
+                            extra=log_context(request, 'status_deleted', pk))
+                return redirect(self.success_url)
         except ProtectedError:
-            messages.error(
-                request,
-                _('Cannot delete status because '
-                  'it is in use by one or more tasks.')
-            )
-            logger.warning(
-                f'⚠️ Attempted to delete status in use: '
-                f'{self.object} {format_ip_log(request)}'
-            )
+            pass
+        messages.error(
+            request,
+            _('Cannot delete status because '
+              'it is in use by one or more tasks.')
+        )
+        logger.warning(
+            '⚠️ Attempted to delete status in use: %s', self.object,
+            extra=log_context(request, 'status_delete_protected', pk),
+        )
         return redirect(self.success_url)
@@ -0,0 +1,93 @@
+from uuid import uuid4
+
+import django_filters
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.forms.models import ModelChoiceIterator, ModelChoiceIteratorValue
+from django_filters import fields as filter_fields
+
+from task_manager import metrics
+
+# model label -> (version, [(pk, label), ...]), local to the process
+_choices = {}
+
+
+def _version_key(model):
+    return f'choices:version:{model._meta.label_lower}'
+
+
+def get_version(model):
+    """Current choices version, kept in the cache: the processes that
+    share it see each other's changes."""
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(model):
+    cache.set(_version_key(model), uuid4().hex, timeout=None)
+
+
+def get_choices(model):
+    """``(pk, label)`` pairs of ``model``, kept by the process while the
+    version is current; without ``settings.CACHE_SHARED`` a version bump
+    would not reach the other workers, so the list is read every time."""
+    if not settings.CACHE_SHARED:
+        return _read_choices(model)
+    version = get_version(model)
+    cached = _choices.get(model._meta.label_lower)
+    if cached is not None and cached[0] == version:
+        metrics.cache_lookup('choices', hits=1)
+        return cached[1]
+    metrics.cache_lookup('choices', misses=1)
+    choices = _read_choices(model)
+    _choices[model._meta.label_lower] = (version, choices)
+    return choices
+
+
+def _read_choices(model):
+    return [(obj.pk, str(obj))
+            for obj in model._default_manager.order_by('pk')]
+
+
+class CachedChoiceIterator(ModelChoiceIterator):
+    """Yields choices from the versioned cache instead of the queryset."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for pk, label in get_choices(self.queryset.model):
+            yield ModelChoiceIteratorValue(pk, None), label
+
+    def __len__(self):
+        empty = 1 if self.field.empty_label is not None else 0
+        return len(get_choices(self.queryset.model)) + empty
+
+    def __bool__(self):
+        return self.field.empty_label is not None or \
+            bool(get_choices(self.queryset.model))
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    iterator = CachedChoiceIterator
+
+
+class CachedModelMultipleChoiceField(forms.ModelMultipleChoiceField):
+    iterator = CachedChoiceIterator
+
+
+class _CachedFilterChoiceIterator(filter_fields.ModelChoiceIterator,
+                                  CachedChoiceIterator):
+    pass
+
+
+class _CachedFilterChoiceField(filter_fields.ModelChoiceField):
+    iterator = _CachedFilterChoiceIterator
+
+
+class CachedModelChoiceFilter(django_filters.ModelChoiceFilter):
+    field_class = _CachedFilterChoiceField
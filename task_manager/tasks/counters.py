@@ -0,0 +1,126 @@
+"""Denormalized task counters on statuses, labels and users.
+
+Counters are only changed with ``F()`` updates inside the transaction
+that changes the tasks, so reading them never scans the task table.
+``recount()`` (the ``recount_tasks`` command) rebuilds them from scratch.
+Counter updates bump the table versions of the counted models, whose
+list pages show the counts.
+"""
+from collections import Counter
+
+from django.apps import apps
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from task_manager import versions
+
+# Task relation -> (counted model, counter column)
+COUNTERS = {
+    'status': ('statuses.Status', 'tasks_count'),
+    'author': ('users.CustomUser', 'authored_tasks_count'),
+    'executor': ('users.CustomUser', 'executed_tasks_count'),
+    'labels': ('labels.Label', 'tasks_count'),
+}
+FOREIGN_KEYS = ('status', 'author', 'executor')
+
+
+def update_counts(relation, deltas):
+    """Add ``deltas`` ({pk: delta}) to the counters with one UPDATE."""
+    deltas = {pk: delta for pk, delta in deltas.items()
+              if delta and pk is not None}
+    if not deltas:
+        return
+    model_label, column = COUNTERS[relation]
+    model = apps.get_model(model_label)
+    model._base_manager.filter(pk__in=deltas).update(**{
+        column: F(column) + Case(
+            *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+            default=Value(0),
+        ),
+    })
+    versions.bump(model)
+
+
+def count_tasks(tasks, relations=FOREIGN_KEYS):
+    """Number of ``tasks`` per related object, one grouped query each."""
+    counts = {
+        relation: Counter(dict(
+            tasks.order_by().values_list(f'{relation}_id')
+            .annotate(Count('pk'))
+        ))
+        for relation in relations if relation != 'labels'
+    }
+    if 'labels' in relations:
+        counts['labels'] = count_links(
+            tasks.model.labels.through.objects.filter(task__in=tasks))
+    return counts
+
+
+def shift_tasks(tasks, sign):
+    """Add (``sign=1``) or remove (``sign=-1``) tasks from every counter."""
+    for relation, counts in count_tasks(tasks, COUNTERS).items():
+        update_counts(relation, {pk: sign * n for pk, n in counts.items()})
+
+
+def shift_instances(tasks, sign):
+    """Like ``shift_tasks`` for unsaved or just inserted task objects,
+    without their labels."""
+    for relation in FOREIGN_KEYS:
+        counts = Counter(getattr(task, f'{relation}_id') for task in tasks)
+        update_counts(relation, {pk: sign * n for pk, n in counts.items()})
+
+
+def task_saved(task, previous, update_fields=None):
+    """Move a saved task between counters; ``previous`` holds the foreign
+    keys stored before the save, or is None for a new task."""
+    for relation in FOREIGN_KEYS:
+        attname = f'{relation}_id'
+        if update_fields is not None and \
+                not {relation, attname} & set(update_fields):
+            continue
+        old = previous[attname] if previous else None
+        new = getattr(task, attname)
+        if old != new:
+            update_counts(relation, {old: -1, new: 1})
+
+
+def count_links(links):
+    """Number of label links per label in a through-table queryset."""
+    return Counter(dict(
+        links.order_by().values_list('label_id').annotate(Count('pk'))))
+
+
+def link_labels(through, task_ids, label_ids):
+    """Add label links that do not exist yet and count them."""
+    existing = count_links(through.objects.filter(
+        task_id__in=task_ids, label_id__in=label_ids))
+    through.objects.bulk_create([
+        through(task_id=task_id, label_id=label_id)
+        for task_id in task_ids for label_id in label_ids
+    ], ignore_conflicts=True)
+    versions.bump(apps.get_model('tasks.Task'))
+    update_counts('labels', {label_id: len(task_ids) - existing[label_id]
+                             for label_id in label_ids})
+
+
+def unlink_labels(links):
+    """Delete the label links in the ``links`` queryset and count them."""
+    removed = count_links(links)
+    links.delete()
+    versions.bump(apps.get_model('tasks.Task'))
+    update_counts('labels', {pk: -n for pk, n in removed.items()})
+
+
+def recount(get_model=apps.get_model):
+    """Rebuild every counter with one UPDATE per counter column."""
+    task_model = get_model('tasks.Task')
+    for relation, (model_label, column) in COUNTERS.items():
+        if relation == 'labels':
+            rows = task_model.labels.through.objects.filter(
+                label_id=OuterRef('pk')).values('label_id')
+        else:
+            rows = task_model.objects.filter(
+                **{relation: OuterRef('pk')}).values(relation)
+        counts = rows.order_by().annotate(n=Count('pk')).values('n')
+        get_model(model_label)._base_manager.update(
+            **{column: Coalesce(Subquery(counts), 0)})
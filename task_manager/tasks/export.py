@@ -0,0 +1,73 @@
+import csv
+import json
+
+EXPORT_FIELDS = (
+    'id', 'name', 'description', 'status',
+    'author', 'executor', 'labels', 'created_at',
+)
+LABELS_SEPARATOR = ', '
+CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+
+
+def task_row(task):
+    return {
+        'id': task.id,
+        'name': task.name,
+        'description': task.description,
+        'status': task.status.name,
+        'author': task.author.username,
+        'executor': task.executor.username,
+        'labels': [label.name for label in task.labels.all()],
+        'created_at': task.created_at.isoformat(),
+    }
+
+
+def iter_rows(queryset):
+    """Task rows fetched in chunks; labels are prefetched per chunk."""
+    for task in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield task_row(task)
+
+
+def _batched(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= ROWS_PER_WRITE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+class _Echo:
+    """File-like object for csv.writer that returns the line written."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    yield from _batched(
+        writer.writerow([
+            LABELS_SEPARATOR.join(row[field]) if field == 'labels'
+            else row[field]
+            for field in EXPORT_FIELDS
+        ])
+        for row in iter_rows(queryset)
+    )
+
+
+def stream_ndjson(queryset):
+    yield from _batched(
+        json.dumps(row, ensure_ascii=False) + '\n'
+        for row in iter_rows(queryset)
+    )
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson; charset=utf-8'),
+}
@@ -2,29 +2,39 @@ import django_filters
 from django import forms
 from django.utils.translation import gettext_lazy as _
 
+from task_manager import tracing
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
 from task_manager.users.models import CustomUser
 
+from .choices import CachedModelChoiceFilter
 from .models import Task
+from .search import search_tasks
 
 
 class TaskFilter(django_filters.FilterSet):
-    status = django_filters.ModelChoiceFilter(
+    q = django_filters.CharFilter(
+        method='filter_search',
+        label=_('Search'),
+        widget=forms.TextInput(
+            attrs={"class": "form-control mr-3 ml-2", "id": "id_q"})
+    )
+
+    status = CachedModelChoiceFilter(
         queryset=Status.objects.all(),
         label=_('Status'),
         widget=forms.Select(
             attrs={"class": "form-select mr-3 ml-2", "id": "id_status"})
     )
 
-    executor = django_filters.ModelChoiceFilter(
+    executor = CachedModelChoiceFilter(
         queryset=CustomUser.objects.all(),
         label=_('Executor'),
         widget=forms.Select(
             attrs={"class": "form-select mr-3 ml-2", "id": "id_executor"})
     )
 
-    label = django_filters.ModelChoiceFilter(
+    label = CachedModelChoiceFilter(
         field_name='labels',
         queryset=Label.objects.all(),
         label=_('Label'),
@@ -39,6 +49,24 @@ class TaskFilter(django_filters.FilterSet):
             attrs={"class": "form-check-input mr-3", "id": "id_self_tasks"})
     )
 
+    @property
+    def qs(self):
+        # Validates the form and builds the filtered queryset
+        with tracing.span('TaskFilter.qs', **{
+                'filter.params': ','.join(sorted(self.data or ()))}):
+            return super().qs
+
+    @property
+    def search_query(self):
+        if self.is_bound and self.is_valid():
+            return self.form.cleaned_data.get('q')
+        return None
+
+    def filter_search(self, queryset, name, value):
+        if value:
+            return search_tasks(queryset, value)
+        return queryset
+
     def filter_only_my_tasks(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
             return queryset.filter(author=self.request.user)
@@ -46,4 +74,4 @@ class TaskFilter(django_filters.FilterSet):
 
     class Meta:
         model = Task
-        fields = ['status', 'executor', 'label', 'self_tasks']
+        fields = ['q', 'status', 'executor', 'label', 'self_tasks']
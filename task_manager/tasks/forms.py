@@ -1,6 +1,18 @@
+from django import forms
+from django.db import transaction
 from django.forms import ModelForm
 from django.utils.translation import gettext_lazy as _
 
+from task_manager.autocomplete import (
+    AutocompleteSelect,
+    AutocompleteSelectMultiple,
+)
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import CustomUser
+
+from . import counters
+from .choices import CachedModelChoiceField, CachedModelMultipleChoiceField
 from .models import Task
 
 
@@ -16,3 +28,95 @@ class TaskForm(ModelForm):
             'executor':   _('Executor'),
             'labels':   _('Labels'),
         }
+
+        field_classes = {
+            'status': CachedModelChoiceField,
+        }
+        # Users and labels can be many; only the selected ones are
+        # rendered and only the submitted ids are looked up
+        widgets = {
+            'executor': AutocompleteSelect('users:autocomplete'),
+            'labels': AutocompleteSelectMultiple('labels:autocomplete'),
+        }
+
+
+class TaskBulkActionForm(forms.Form):
+    SET_STATUS = 'set_status'
+    SET_EXECUTOR = 'set_executor'
+    ADD_LABELS = 'add_labels'
+    REMOVE_LABELS = 'remove_labels'
+    DELETE = 'delete'
+
+    # action -> form field holding its argument
+    ACTION_FIELDS = {
+        SET_STATUS: 'status',
+        SET_EXECUTOR: 'executor',
+        ADD_LABELS: 'labels',
+        REMOVE_LABELS: 'labels',
+    }
+
+    tasks = forms.Field(
+        widget=forms.MultipleHiddenInput,
+        error_messages={'required': _('Select at least one task.')},
+    )
+    action = forms.ChoiceField(label=_('Action'), choices=(
+        (SET_STATUS, _('Change status')),
+        (SET_EXECUTOR, _('Reassign executor')),
+        (ADD_LABELS, _('Add labels')),
+        (REMOVE_LABELS, _('Remove labels')),
+        (DELETE, _('Delete')),
+    ))
+    status = CachedModelChoiceField(
+        Status.objects.all(), label=_('Status'), required=False)
+    executor = CachedModelChoiceField(
+        CustomUser.objects.all(), label=_('Executor'), required=False)
+    labels = CachedModelMultipleChoiceField(
+        Label.objects.all(), label=_('Labels'), required=False)
+    next = forms.CharField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        # Rendered next to the filter form, which uses the same field names
+        kwargs.setdefault('auto_id', 'id_bulk_%s')
+        super().__init__(*args, **kwargs)
+
+    def clean_tasks(self):
+        try:
+            return sorted({int(pk) for pk in self.cleaned_data['tasks']})
+        except (TypeError, ValueError):
+            raise forms.ValidationError(_('Invalid task selection.'))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        field = self.ACTION_FIELDS.get(cleaned_data.get('action'))
+        if field and not cleaned_data.get(field):
+            self.add_error(field, self.fields[field].error_messages['required'])
+        return cleaned_data
+
+    @property
+    def selected_tasks(self):
+        return Task.objects.filter(pk__in=self.cleaned_data['tasks'])
+
+    def save(self, user):
+        """Apply the action with one statement per table; returns the
+        number of affected tasks. Only the tasks ``user`` is the author
+        of are deleted."""
+        action = self.cleaned_data['action']
+        tasks = self.selected_tasks
+        with transaction.atomic():
+            if action == self.SET_STATUS:
+                return tasks.update(status=self.cleaned_data['status'])
+            if action == self.SET_EXECUTOR:
+                return tasks.update(executor=self.cleaned_data['executor'])
+            if action == self.DELETE:
+                deleted = tasks.filter(author=user).delete()[1]
+                return deleted.get(Task._meta.label, 0)
+
+            through = Task.labels.through
+            task_ids = list(tasks.values_list('pk', flat=True))
+            label_ids = [label.pk for label in self.cleaned_data['labels']]
+            if action == self.ADD_LABELS:
+                counters.link_labels(through, task_ids, label_ids)
+            else:
+                counters.unlink_labels(through.objects.filter(
+                    task_id__in=task_ids, label_id__in=label_ids))
+            return len(task_ids)
@@ -0,0 +1,100 @@
+"""Cached HTML of task list rows.
+
+Row keys combine the task id and version (its ``updated_at``), a
+generation token and the active language; rows show times in the
+default time zone, whichever one the request activated. A saved task
+gets a new key, so a request that read it before the write can only
+cache the old row under the old key. Changes that can touch many rows
+(status or user renames, queryset updates) replace the generation once
+they commit. Rows are only cached with ``settings.CACHE_SHARED``: other
+workers can't see the changes made to a per-process cache.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from task_manager import metrics
+
+ROW_TEMPLATE = 'tasks/partials/row.html'
+ROW_TIMEOUT = 60 * 60 * 24
+GENERATION_KEY = 'task_rows:generation'
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid4().hex, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def _ageneration():
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, uuid4().hex, timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def _row_key(generation, language, task):
+    version = int(task.updated_at.timestamp() * 1_000_000)
+    return f'task_rows:{generation}:{language}:{task.pk}:{version}'
+
+
+def invalidate_all():
+    """Drop every row when the transaction commits."""
+    transaction.on_commit(
+        lambda: cache.set(GENERATION_KEY, uuid4().hex, timeout=None))
+
+
+def _render(template, task):
+    # Keys leave out the time zone: every request shares the rows
+    with timezone.override(None):
+        return template.render({'task': task})
+
+
+def render_rows(tasks, use_cache=True):
+    """HTML of each task's list row, rendering only uncached rows."""
+    template = get_template(ROW_TEMPLATE)
+    if not use_cache or not settings.CACHE_SHARED:
+        return [_render(template, task) for task in tasks]
+
+    generation = _generation()
+    keys = [_row_key(generation, get_language(), task) for task in tasks]
+    rows, missing = _fill_rows(template, tasks, keys, cache.get_many(keys))
+    if missing:
+        cache.set_many(missing, ROW_TIMEOUT)
+    return rows
+
+
+async def arender_rows(tasks, use_cache=True):
+    """``render_rows()`` with the async cache API, for async views."""
+    template = get_template(ROW_TEMPLATE)
+    if not use_cache or not settings.CACHE_SHARED:
+        return [_render(template, task) for task in tasks]
+
+    generation = await _ageneration()
+    keys = [_row_key(generation, get_language(), task) for task in tasks]
+    rows, missing = _fill_rows(
+        template, tasks, keys, await cache.aget_many(keys))
+    if missing:
+        await cache.aset_many(missing, ROW_TIMEOUT)
+    return rows
+
+
+def _fill_rows(template, tasks, keys, cached):
+    missing = {}
+    rows = []
+    for key, task in zip(keys, tasks):
+        row = cached.get(key)
+        if row is None:
+            row = missing[key] = _render(template, task)
+        rows.append(mark_safe(row))
+    metrics.cache_lookup('task_rows', len(rows) - len(missing), len(missing))
+    return rows, missing
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from importlib.util import find_spec
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils.timezone import now
+
+from task_manager.tasks.models import Task
+from task_manager.users.models import CustomUser
+
+HOST = '127.0.0.1'
+# Server kind -> (module, command line arguments)
+SERVERS = {
+    'wsgi': ('gunicorn', [
+        'task_manager.wsgi:application', '--bind', '{host}:{port}',
+        '--workers', '{workers}', '--worker-class', 'gthread',
+        '--threads', '{threads}', '--log-level', 'warning',
+    ]),
+    'asgi': ('uvicorn', [
+        'task_manager.asgi:application', '--host', '{host}',
+        '--port', '{port}', '--workers', '{workers}', '--lifespan', 'off',
+        '--no-access-log', '--log-level', 'warning',
+    ]),
+}
+STARTUP_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the app under gunicorn (WSGI) and uvicorn (ASGI) in turn and '
+        'load the task, status, label and user pages with many concurrent '
+        'keep-alive connections. Reports throughput and latency '
+        'percentiles per server; seed the configured database first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--servers', nargs='+', choices=SERVERS, default=list(SERVERS),
+            help='Servers to benchmark (default: %(default)s)')
+        parser.add_argument(
+            '--concurrency', type=int, default=200,
+            help='Concurrent connections (default: %(default)s)')
+        parser.add_argument(
+            '--duration', type=float, default=20,
+            help='Seconds of load per server (default: %(default)s)')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Server worker processes (default: %(default)s)')
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Threads per gunicorn worker (default: %(default)s)')
+        parser.add_argument(
+            '--output', default='benchmark-servers.json',
+            help='Report file (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('--concurrency and --duration must be positive')
+        for kind in options['servers']:
+            module = SERVERS[kind][0]
+            if find_spec(module) is None:
+                raise CommandError(
+                    f'{module} is not installed; run "uv sync --group server"')
+
+        paths, cookie = self._prepare()
+        results = []
+        for kind in options['servers']:
+            self.stdout.write(f'Starting {kind} server...')
+            with self._server(kind, options) as port:
+                stats = asyncio.run(run_load(
+                    HOST, port, paths, options['concurrency'],
+                    options['duration'], headers={'Cookie': cookie}))
+            results.append({'server': kind, **stats})
+            self.stdout.write(
+                f'{kind:<5} {stats["throughput"]:>9.1f} req/s '
+                f'p50 {stats["p50_ms"]:>8.2f} ms '
+                f'p99 {stats["p99_ms"]:>8.2f} ms '
+                f'{stats["errors"]} errors'
+            )
+
+        report = {
+            'generated_at': now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'tasks': Task.objects.count(),
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'workers': options['workers'],
+            'threads': options['threads'],
+            'paths': paths,
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+            report_file.write('\n')
+        self.stdout.write(self.style.SUCCESS(
+            f'Report written to {options["output"]}'))
+
+    def _prepare(self):
+        """Paths to load and the session cookie of the busiest executor."""
+        busiest = Task.objects.values('executor').annotate(
+            tasks_total=Count('id')).order_by('-tasks_total').first()
+        task = Task.objects.order_by('pk').first()
+        if busiest is None:
+            raise CommandError('No tasks to load; run seed_data first')
+
+        client = Client()
+        client.force_login(CustomUser.objects.get(pk=busiest['executor']))
+        session = client.cookies[settings.SESSION_COOKIE_NAME].value
+        paths = [
+            reverse('tasks:list'),
+            reverse('tasks:detail', args=[task.pk]),
+            reverse('statuses:list'),
+            reverse('labels:list'),
+            reverse('users:list'),
+        ]
+        return paths, f'{settings.SESSION_COOKIE_NAME}={session}'
+
+    def _server(self, kind, options):
+        module, arguments = SERVERS[kind]
+        port = _free_port()
+        command = [sys.executable, '-m', module, *(
+            argument.format(host=HOST, port=port, workers=options['workers'],
+                            threads=options['threads'])
+            for argument in arguments
+        )]
+        return _ServerProcess(command, port)
+
+
+class _ServerProcess:
+    def __init__(self, command, port):
+        self.command = command
+        self.port = port
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, env=os.environ.copy())
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f'{self.command[2]} exited with code '
+                                   f'{self.process.returncode}')
+            try:
+                socket.create_connection((HOST, self.port), timeout=1).close()
+                return self.port
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError(f'{self.command[2]} did not start in '
+                           f'{STARTUP_TIMEOUT}s')
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def run_load(host, port, paths, concurrency, duration, headers=None):
+    """Request ``paths`` round robin over ``concurrency`` keep-alive
+    connections for ``duration`` seconds; returns throughput and latency
+    percentiles of the successful requests."""
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _connection_loop(host, port, paths, offset, headers or {}, deadline,
+                         latencies, errors)
+        for offset in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+async def _connection_loop(host, port, paths, index, headers, deadline,
+                           latencies, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            status, keep_alive = await _get(
+                reader, writer, host, path, headers)
+            elapsed = time.perf_counter() - started
+        except (OSError, asyncio.IncompleteReadError, ValueError) as error:
+            errors.append(repr(error))
+            writer = _close(writer)
+            continue
+        if status == 200:
+            latencies.append(elapsed)
+        else:
+            errors.append(f'{path}: HTTP {status}')
+        if not keep_alive:
+            writer = _close(writer)
+    _close(writer)
+
+
+async def _get(reader, writer, host, path, headers):
+    lines = [f'GET {path} HTTP/1.1', f'Host: {host}',
+             *(f'{name}: {value}' for name, value in headers.items())]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    await writer.drain()
+
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    status = int(status_line.split()[1])
+    response_headers = {}
+    for line in header_lines:
+        if line:
+            name, _, value = line.partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in response_headers:
+        await reader.readexactly(int(response_headers['content-length']))
+    elif response_headers.get('transfer-encoding') == 'chunked':
+        while size := int((await reader.readline()).split(b';')[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.read()
+        return status, False
+    return status, response_headers.get('connection') != 'close'
+
+
+def _close(writer):
+    if writer is not None:
+        writer.close()
+    return None
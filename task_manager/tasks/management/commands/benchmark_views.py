@@ -0,0 +1,156 @@
+import json
+import platform
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils.timezone import now
+
+from task_manager.labels.models import Label
+from task_manager.middleware import count_queries
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.users.models import CustomUser
+
+DEFAULT_SCALES = (1_000, 100_000, 1_000_000)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed growing datasets with seed_data and time the task, user, '
+        'label and status views at each size. Runs in a throwaway test '
+        'database and writes a JSON report that can be diffed between '
+        'releases.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+            help='Task counts to benchmark at (default: %(default)s)')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Timed requests per view (default: %(default)s)')
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Report file (default: %(default)s)')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Keep the test database, so the next run reuses the '
+                 'seeded data')
+        parser.add_argument(
+            '--use-current-db', action='store_true',
+            help='Run against the configured database instead of a test '
+                 'database; seeded data is left in it')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive')
+        with self._database(options):
+            results = self._run(sorted(options['scales']), options['repeat'])
+
+        report = {
+            'generated_at': now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+            report_file.write('\n')
+        self.stdout.write(self.style.SUCCESS(
+            f'Report written to {options["output"]}'))
+
+    @contextmanager
+    def _database(self, options):
+        if options['use_current_db']:
+            yield
+            return
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+    def _run(self, scales, repeat):
+        client = Client()
+        results = []
+        for scale in scales:
+            missing = scale - Task.objects.count()
+            if missing > 0:
+                self.stdout.write(f'Seeding {missing} tasks...')
+                call_command('seed_data', scale=missing, stdout=self.stdout)
+            for view, params, url in self._cases(client):
+                timings, queries = self._time(client, url, params, repeat)
+                result = {
+                    'scale': scale,
+                    'view': view,
+                    'params': params,
+                    'queries': queries,
+                    'min_ms': round(min(timings), 2),
+                    'median_ms': round(statistics.median(timings), 2),
+                    'max_ms': round(max(timings), 2),
+                }
+                results.append(result)
+                self.stdout.write(
+                    f'{scale:>9} {view:<14} {json.dumps(params):<40} '
+                    f'{result["median_ms"]:>9.2f} ms {queries:>4} queries'
+                )
+        return results
+
+    def _cases(self, client):
+        status = Status.objects.order_by('pk').first()
+        label = Label.objects.annotate(
+            tasks_total=Count('task')).order_by('-tasks_total').first()
+        executor = Task.objects.values('executor').annotate(
+            tasks_total=Count('id')).order_by('-tasks_total').first()
+        task = Task.objects.order_by('pk').first()
+        # The busiest executor makes "self tasks" a meaningful filter
+        client.force_login(CustomUser.objects.get(pk=executor['executor']))
+
+        filters = [
+            {},
+            {'status': status.pk},
+            {'executor': executor['executor']},
+            {'label': label.pk},
+            {'self_tasks': 'on'},
+            {'q': 'login'},
+            {'status': status.pk, 'executor': executor['executor'],
+             'label': label.pk},
+        ]
+        for params in filters:
+            yield 'tasks:list', params, reverse('tasks:list')
+        yield 'tasks:detail', {}, reverse('tasks:detail', args=[task.pk])
+        yield 'users:list', {}, reverse('users:list')
+        yield 'labels:list', {}, reverse('labels:list')
+        yield 'statuses:list', {}, reverse('statuses:list')
+
+    @staticmethod
+    def _time(client, url, params, repeat):
+        response = client.get(url, params)  # warm up caches
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned {response.status_code}')
+        timings = []
+        for _ in range(repeat):
+            with count_queries() as counter:
+                started = time.perf_counter()
+                client.get(url, params)
+                timings.append((time.perf_counter() - started) * 1000)
+        return timings, counter.count
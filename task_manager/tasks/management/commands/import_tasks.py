@@ -0,0 +1,228 @@
+import csv
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import counters
+from task_manager.tasks.export import LABELS_SEPARATOR
+from task_manager.tasks.models import Task
+from task_manager.users.models import CustomUser
+
+NAME_MAX_LENGTH = Task._meta.get_field('name').max_length
+
+
+class RowError(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Import tasks from a CSV or JSON Lines file (the format produced '
+        'by the task export). Status, user and label names are resolved '
+        'in memory and tasks are inserted with batched bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='File to import, or "-" to read standard input')
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'),
+            help='Input format (default: guessed from the file extension)')
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Tasks per transaction (default: %(default)s)')
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Create unknown statuses and labels instead of '
+                 'rejecting the rows that use them')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        input_format = options['format'] or self._guess_format(
+            options['path'])
+        self.create_missing = options['create_missing']
+        self._load_lookups()
+
+        total_created = total_errors = 0
+        started = time.monotonic()
+        with self._open(options['path']) as stream:
+            rows = enumerate(self._read(stream, input_format), start=1)
+            batch_number = 0
+            while batch := list(islice(rows, options['batch_size'])):
+                batch_number += 1
+                batch_started = time.monotonic()
+                created, errors = self._import_batch(batch)
+                total_created += created
+                total_errors += len(errors)
+                self._report_batch(batch_number, created, errors,
+                                   time.monotonic() - batch_started)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {total_created} tasks with {total_errors} errors '
+            f'in {elapsed:.1f}s ({_rate(total_created, elapsed)} tasks/min)'
+        ))
+
+    @staticmethod
+    def _guess_format(path):
+        suffix = Path(path).suffix.lower()
+        if suffix == '.csv':
+            return 'csv'
+        if suffix in ('.jsonl', '.ndjson'):
+            return 'jsonl'
+        raise CommandError(f'Cannot guess the format of {path}, '
+                           f'use --format')
+
+    @staticmethod
+    def _open(path):
+        if path == '-':
+            return nullcontext(sys.stdin)
+        try:
+            return open(path, encoding='utf-8', newline='')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+
+    @staticmethod
+    def _read(stream, input_format):
+        if input_format == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield RowError(f'invalid JSON: {e}')
+
+    def _load_lookups(self):
+        self.statuses = dict(Status.objects.values_list('name', 'id'))
+        self.labels = dict(Label.objects.values_list('name', 'id'))
+        self.users = dict(CustomUser.objects.values_list('username', 'id'))
+        self.seen_names = set()
+
+    def _import_batch(self, batch):
+        errors = []
+        parsed = []
+        for line_number, row in batch:
+            try:
+                parsed.append(self._parse_row(row) | {'line': line_number})
+            except RowError as e:
+                errors.append((line_number, str(e)))
+
+        existing = set(Task.objects.filter(
+            name__in=[row['name'] for row in parsed],
+        ).values_list('name', flat=True))
+        tasks, task_labels = [], []
+        for row in parsed:
+            if row['name'] in existing or row['name'] in self.seen_names:
+                errors.append(
+                    (row['line'], f'task "{row["name"]}" already exists'))
+                continue
+            self.seen_names.add(row['name'])
+            tasks.append(Task(
+                name=row['name'],
+                description=row['description'],
+                status_id=row['status_id'],
+                author_id=row['author_id'],
+                executor_id=row['executor_id'],
+            ))
+            task_labels.append(row['label_ids'])
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            links = Task.labels.through.objects.bulk_create([
+                Task.labels.through(task_id=task.pk, label_id=label_id)
+                for task, label_ids in zip(tasks, task_labels)
+                for label_id in label_ids
+            ])
+            counters.update_counts(
+                'labels', Counter(link.label_id for link in links))
+        return len(tasks), errors
+
+    def _parse_row(self, row):
+        if isinstance(row, RowError):
+            raise row
+        if not isinstance(row, dict):
+            raise RowError('expected an object')
+
+        name = _text(row, 'name').strip()
+        if not name:
+            raise RowError('name is required')
+        if len(name) > NAME_MAX_LENGTH:
+            raise RowError(
+                f'name is longer than {NAME_MAX_LENGTH} characters')
+
+        labels = row.get('labels') or []
+        if isinstance(labels, str):
+            labels = labels.split(LABELS_SEPARATOR.strip())
+        elif not isinstance(labels, list) or \
+                not all(isinstance(label, str) for label in labels):
+            raise RowError('labels must be a list of strings')
+        label_names = {label.strip() for label in labels if label.strip()}
+
+        return {
+            'name': name,
+            'description': _text(row, 'description'),
+            'status_id': self._resolve_status(_text(row, 'status')),
+            'author_id': self._resolve_user(_text(row, 'author'), 'author'),
+            'executor_id': self._resolve_user(
+                _text(row, 'executor'), 'executor'),
+            'label_ids': [self._resolve_label(label)
+                          for label in sorted(label_names)],
+        }
+
+    def _resolve_status(self, name):
+        name = name.strip()
+        if not name:
+            raise RowError('status is required')
+        if name not in self.statuses:
+            if not self.create_missing:
+                raise RowError(f'unknown status "{name}"')
+            self.statuses[name] = Status.objects.create(name=name).id
+        return self.statuses[name]
+
+    def _resolve_label(self, name):
+        if name not in self.labels:
+            if not self.create_missing:
+                raise RowError(f'unknown label "{name}"')
+            self.labels[name] = Label.objects.create(name=name).id
+        return self.labels[name]
+
+    def _resolve_user(self, username, role):
+        username = username.strip()
+        if not username:
+            raise RowError(f'{role} is required')
+        if username not in self.users:
+            raise RowError(f'unknown {role} "{username}"')
+        return self.users[username]
+
+    def _report_batch(self, number, created, errors, elapsed):
+        self.stdout.write(
+            f'Batch {number}: {created} created, {len(errors)} errors, '
+            f'{elapsed:.2f}s ({_rate(created, elapsed)} tasks/min)'
+        )
+        for line_number, message in errors:
+            self.stderr.write(f'  row {line_number}: {message}')
+
+
+def _text(row, field):
+    """String value of ``field``; JSON rows may hold any type."""
+    value = row.get(field) or ''
+    if not isinstance(value, str):
+        raise RowError(f'{field} must be a string')
+    return value
+
+
+def _rate(count, elapsed):
+    return round(count / elapsed * 60) if elapsed else count
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from task_manager import versions
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import counters
+from task_manager.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the task counters on statuses, labels and users from the '
+        'task table, e.g. after raw SQL changes.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            counters.recount()
+            versions.bump(Status, Label, CustomUser)
+        self.stdout.write(self.style.SUCCESS(
+            f'Task counters rebuilt in {time.monotonic() - started:.1f}s'))
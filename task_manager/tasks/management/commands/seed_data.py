@@ -0,0 +1,184 @@
+import random
+import time
+from collections import Counter
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from task_manager import versions
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import counters
+from task_manager.tasks.models import Task
+from task_manager.users.models import CustomUser
+
+STATUSES = ('new', 'in progress', 'on review', 'testing', 'done', 'closed')
+# Most tasks sit in a few workflow states
+STATUS_WEIGHTS = (20, 15, 8, 5, 30, 22)
+
+LABELS = (
+    'bug', 'feature', 'enhancement', 'documentation', 'refactoring',
+    'performance', 'security', 'ui', 'backend', 'frontend', 'api',
+    'database', 'tests', 'ci', 'deploy', 'design', 'ux', 'research',
+    'support', 'urgent', 'blocked', 'duplicate', 'wontfix', 'question',
+    'good first issue', 'help wanted', 'tech debt', 'i18n', 'mobile',
+    'analytics',
+)
+# Share of tasks with 0, 1, 2, ... labels
+LABELS_PER_TASK_WEIGHTS = (25, 35, 22, 12, 6)
+
+FIRST_NAMES = ('Anna', 'Boris', 'Clara', 'Dmitry', 'Elena', 'Fedor',
+               'Galina', 'Igor', 'Julia', 'Kirill', 'Lena', 'Maxim',
+               'Nina', 'Oleg', 'Polina', 'Roman', 'Sofia', 'Timur')
+LAST_NAMES = ('Ivanova', 'Petrov', 'Smirnova', 'Kuznetsov', 'Popova',
+              'Sokolov', 'Lebedeva', 'Kozlov', 'Novikova', 'Morozov')
+VERBS = ('Fix', 'Add', 'Update', 'Remove', 'Refactor', 'Document',
+         'Investigate', 'Optimize', 'Test', 'Review')
+NOUNS = ('login form', 'task filter', 'label list', 'status page',
+         'user profile', 'search index', 'export', 'import', 'migration',
+         'pagination', 'translations', 'settings page', 'API endpoint',
+         'error handling', 'logging')
+WORDS = ('the', 'page', 'fails', 'when', 'user', 'opens', 'list', 'with',
+         'many', 'tasks', 'slow', 'query', 'label', 'status', 'after',
+         'update', 'deploy', 'missing', 'translation', 'button', 'error',
+         'timeout', 'request', 'cache', 'report')
+
+SEED_PASSWORD = 'seed-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic dataset: users, statuses, labels and tasks '
+        'with skewed label and executor distributions, inserted with '
+        'bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=int, required=True,
+            help='Number of tasks to add')
+        parser.add_argument(
+            '--users', type=int,
+            help='Number of users to add (default: scale / 100, '
+                 'at least 10)')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Random seed, for reproducible datasets '
+                 '(default: %(default)s)')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows per bulk insert (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        if options['scale'] < 0:
+            raise CommandError('--scale must not be negative')
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.monotonic()
+
+        statuses = self._ensure_named(Status, STATUSES)
+        labels = self._ensure_named(Label, LABELS)
+        user_count = options['users']
+        if user_count is None:
+            user_count = max(10, options['scale'] // 100)
+        users = self._create_users(user_count)
+        # bulk_create sends no signals
+        versions.bump(Status, Label, CustomUser)
+
+        created = self._create_tasks(
+            options['scale'], statuses, labels, users)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(users)} users and {created} tasks '
+            f'in {time.monotonic() - started:.1f}s'
+        ))
+
+    def _ensure_named(self, model, names):
+        model.objects.bulk_create(
+            [model(name=name) for name in names], ignore_conflicts=True)
+        by_name = dict(model.objects.filter(
+            name__in=names).values_list('name', 'id'))
+        return [by_name[name] for name in names]
+
+    def _create_users(self, count):
+        # After the highest number taken: earlier seed users may be deleted
+        start = 0
+        for username in CustomUser.objects.filter(
+                username__startswith='seed_user_',
+        ).values_list('username', flat=True):
+            suffix = username.removeprefix('seed_user_')
+            if suffix.isdigit():
+                start = max(start, int(suffix))
+        password = make_password(SEED_PASSWORD)
+        users = [
+            CustomUser(
+                username=f'seed_user_{number}',
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                password=password,
+            )
+            for number in range(start + 1, start + count + 1)
+        ]
+        CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+        return [user.pk for user in users]
+
+    def _create_tasks(self, count, statuses, labels, users):
+        if not users:
+            users = list(CustomUser.objects.values_list('id', flat=True))
+        if count and not users:
+            raise CommandError('No users to assign tasks to')
+
+        # Zipf-like popularity: a few labels and executors get most tasks
+        label_weights = list(accumulate(
+            1 / rank for rank in range(1, len(labels) + 1)))
+        user_weights = list(accumulate(
+            1 / rank ** 0.8 for rank in range(1, len(users) + 1)))
+        users = self.random.sample(users, len(users))
+        label_counts = range(len(LABELS_PER_TASK_WEIGHTS))
+
+        first_number = (Task.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        created = 0
+        for batch_start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - batch_start)
+            tasks, task_labels = [], []
+            for offset in range(size):
+                number = first_number + batch_start + offset
+                tasks.append(self._build_task(
+                    number, statuses, users, user_weights))
+                label_count = self.random.choices(
+                    label_counts, weights=LABELS_PER_TASK_WEIGHTS)[0]
+                task_labels.append({
+                    labels[index] for index in self.random.choices(
+                        range(len(labels)), cum_weights=label_weights,
+                        k=label_count)
+                })
+
+            with transaction.atomic():
+                Task.objects.bulk_create(tasks)
+                links = Task.labels.through.objects.bulk_create([
+                    Task.labels.through(task_id=task.pk, label_id=label_id)
+                    for task, label_ids in zip(tasks, task_labels)
+                    for label_id in label_ids
+                ], batch_size=self.batch_size)
+                counters.update_counts(
+                    'labels', Counter(link.label_id for link in links))
+            created += size
+            self.stdout.write(f'{created}/{count} tasks')
+        return created
+
+    def _build_task(self, number, statuses, users, user_weights):
+        choice = self.random.choice
+        author, executor = self.random.choices(
+            users, cum_weights=user_weights, k=2)
+        return Task(
+            name=f'{choice(VERBS)} {choice(NOUNS)} #{number}',
+            description=' '.join(self.random.choices(
+                WORDS, k=self.random.randint(0, 40))).capitalize(),
+            status_id=self.random.choices(
+                statuses, weights=STATUS_WEIGHTS)[0],
+            author_id=author,
+            executor_id=executor,
+        )
@@ -0,0 +1,91 @@
+import json
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+
+from django.core.management.base import BaseCommand
+
+HOST = '127.0.0.1'
+TRACES_PATH = '/v1/traces'
+
+
+def summarize(payload):
+    """One line per trace: its root span, duration and span count."""
+    spans = [span
+             for resource in payload.get('resourceSpans', ())
+             for scope in resource.get('scopeSpans', ())
+             for span in scope.get('spans', ())]
+    traces = {}
+    for span in spans:
+        traces.setdefault(span['traceId'], []).append(span)
+    lines = []
+    for trace_id, trace_spans in traces.items():
+        ids = {span['spanId'] for span in trace_spans}
+        root = next((span for span in trace_spans
+                     if span.get('parentSpanId') not in ids), trace_spans[0])
+        duration_ms = (int(root['endTimeUnixNano'])
+                       - int(root['startTimeUnixNano'])) / 1e6
+        lines.append(f'{trace_id} {root["name"]} {duration_ms:.1f} ms, '
+                     f'{len(trace_spans)} spans')
+    return lines
+
+
+def make_server(port, output, stdout):
+    """HTTP server taking OTLP/HTTP JSON trace exports."""
+    lock = Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != TRACES_PATH:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            body = self.rfile.read(int(self.headers['Content-Length'] or 0))
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_error(HTTPStatus.BAD_REQUEST)
+                return
+            with lock:
+                with open(output, 'a') as file:
+                    file.write(json.dumps(payload) + '\n')
+                for line in summarize(payload):
+                    stdout.write(line)
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((HOST, port), Handler)
+
+
+class Command(BaseCommand):
+    help = (
+        'Receive traces in the OTLP/HTTP JSON format, as a local stand-in '
+        'for an OpenTelemetry collector: append each export to a file and '
+        'print a line per trace. Point TRACING_EXPORT at '
+        f'http://{HOST}:<port>{TRACES_PATH}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--port', type=int, default=4318,
+            help='Port to listen on (default: %(default)s)')
+        parser.add_argument(
+            '--output', default='traces.jsonl',
+            help='File the exports are appended to (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        server = make_server(options['port'], options['output'], self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Collecting traces on http://{HOST}:{server.server_port}'
+            f'{TRACES_PATH} into {options["output"]}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
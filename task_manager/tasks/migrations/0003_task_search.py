@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from task_manager.tasks.search import create_search_index, drop_search_index
+
+
+def forwards(apps, schema_editor):
+    create_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+def backwards(apps, schema_editor):
+    drop_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
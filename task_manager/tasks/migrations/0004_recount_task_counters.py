@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from task_manager.tasks.counters import recount
+
+
+def forwards(apps, schema_editor):
+    recount(get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_search'),
+        ('labels', '0002_label_tasks_count'),
+        ('statuses', '0002_status_tasks_count'),
+        ('users', '0002_customuser_task_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
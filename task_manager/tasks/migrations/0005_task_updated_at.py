@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+from task_manager.tasks.search import create_search_index
+
+
+def restore_search_index(apps, schema_editor):
+    # Adding the column rebuilds tasks_task on SQLite, dropping the
+    # full-text triggers
+    if schema_editor.connection.vendor == 'sqlite':
+        create_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_recount_task_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(restore_search_index, migrations.RunPython.noop),
+    ]
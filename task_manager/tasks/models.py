@@ -1,21 +1,144 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
 
+from task_manager import versions
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
 from task_manager.users.models import CustomUser
 
+from . import counters, fragments
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_related(self):
+        """Join status/author/executor and prefetch labels in one query."""
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).prefetch_related(
+            Prefetch('labels', queryset=Label.objects.only('id', 'name'))
+        )
+
+    def for_listing(self):
+        """Related data plus only the columns rendered by the task list."""
+        return self.with_related().only(
+            'id', 'name', 'created_at', 'updated_at',
+            'status', 'author', 'executor',
+            'status__name',
+            'author__full_name', 'executor__full_name',
+        )
+
+    def for_export(self):
+        """Related data for task exports, oldest first."""
+        return self.with_related().only(
+            'id', 'name', 'description', 'created_at',
+            'status', 'author', 'executor',
+            'status__name', 'author__username', 'executor__username',
+        ).order_by('created_at', 'id')
+
+    # Writes that bypass Task.save()/delete() keep the counters in step too
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts') or \
+                    kwargs.get('update_conflicts'):
+                # Inserted rows are unknown
+                counters.recount()
+                if kwargs.get('update_conflicts'):
+                    fragments.invalidate_all()
+            else:
+                counters.shift_instances(objs, 1)
+            versions.bump(self.model)
+        return objs
+
+    def update(self, **kwargs):
+        # A new updated_at gives the cached list rows new keys
+        keep_versions = 'updated_at' in kwargs
+        kwargs.setdefault('updated_at', timezone.now())
+        relations = [relation for relation in counters.FOREIGN_KEYS
+                     if {relation, f'{relation}_id'} & kwargs.keys()]
+        with transaction.atomic(using=self.db):
+            if keep_versions:
+                # Updated rows are unknown, so every cached list row goes
+                fragments.invalidate_all()
+            versions.bump(self.model)
+            if not relations:
+                return super().update(**kwargs)
+            before = counters.count_tasks(self, relations)
+            rows = super().update(**kwargs)
+            for relation in relations:
+                value = kwargs.get(relation, kwargs.get(f'{relation}_id'))
+                new = getattr(value, 'pk', value)
+                if not isinstance(new, int):
+                    # Expressions: the new targets are unknown
+                    counters.recount()
+                    break
+                deltas = {pk: -n for pk, n in before[relation].items()}
+                deltas[new] = deltas.get(new, 0) + rows
+                counters.update_counts(relation, deltas)
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            counters.shift_tasks(self, -1)
+            versions.bump(self.model)
+            return super().delete()
+
+    delete.alters_data = True
+
 
 class Task(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    # FK columns are indexed by the composite indexes in Meta instead
     status = models.ForeignKey(Status, on_delete=models.PROTECT,
-                               related_name='tasks')
+                               related_name='tasks', db_index=False)
     labels = models.ManyToManyField(Label, blank=True)
     author = models.ForeignKey(CustomUser, on_delete=models.PROTECT,
-                               related_name='authored_tasks')
+                               related_name='authored_tasks', db_index=False)
     executor = models.ForeignKey(CustomUser, on_delete=models.PROTECT,
-                                 related_name='executed_tasks')
+                                 related_name='executed_tasks', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        # Every TaskFilter field leads an index that ends with the list
+        # ordering, so a filtered page is one index range scan.
+        indexes = [
+            models.Index(fields=['created_at', 'id'],
+                         name='task_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'],
+                         name='task_status_created_idx'),
+            models.Index(fields=['executor', 'created_at', 'id'],
+                         name='task_executor_created_idx'),
+            models.Index(fields=['author', 'created_at', 'id'],
+                         name='task_author_created_idx'),
+            models.Index(fields=['status', 'executor', 'created_at', 'id'],
+                         name='task_status_executor_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = type(self)._base_manager.filter(
+                    pk=self.pk,
+                ).select_for_update().values(
+                    *(f'{relation}_id' for relation in counters.FOREIGN_KEYS)
+                ).first()
+            super().save(*args, **kwargs)
+            counters.task_saved(self, previous, kwargs.get('update_fields'))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            counters.shift_tasks(
+                type(self)._base_manager.filter(pk=self.pk), -1)
+            return super().delete(*args, **kwargs)
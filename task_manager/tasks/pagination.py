@@ -0,0 +1,147 @@
+from datetime import datetime
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Cursor pagination over an ordering of unique ``keys``, descending
+    unless ``descending`` is false.
+
+    Instead of OFFSET, every page is fetched with a range condition on the
+    last seen key values, so deep pages cost the same as the first one
+    as long as an index covers ``keys``. Cursors are signed, so clients
+    can't forge positions.
+    """
+    salt = 'task_manager.tasks.pagination'
+
+    def __init__(self, queryset, per_page, keys=('created_at', 'id'),
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+        self.descending = descending
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor)
+        rows = list(self._page_queryset(direction, values))
+        return self._build_page(rows, direction, values)
+
+    async def apage(self, cursor=None):
+        """``page()`` for async views, fetching rows with ``aiterator()``."""
+        direction, values = self.decode_cursor(cursor)
+        rows = [row async for row in self._page_queryset(
+            direction, values).aiterator(chunk_size=self.per_page + 1)]
+        return self._build_page(rows, direction, values)
+
+    def _page_queryset(self, direction, values):
+        queryset = self.queryset
+        forward, backward = ('lt', 'gt') if self.descending else ('gt', 'lt')
+        if direction == FORWARD:
+            if values is not None:
+                queryset = queryset.filter(self._seek(values, forward))
+            ordering = self._ordering(self.descending)
+        else:
+            queryset = queryset.filter(self._seek(values, backward))
+            ordering = self._ordering(not self.descending)
+        return queryset.order_by(*ordering)[:self.per_page + 1]
+
+    def _ordering(self, descending):
+        prefix = '-' if descending else ''
+        return [f'{prefix}{key}' for key in self.keys]
+
+    def _build_page(self, rows, direction, values):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == BACKWARD:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        has_next = has_more if direction == FORWARD else True
+        has_previous = values is not None if direction == FORWARD \
+            else has_more
+        return KeysetPage(
+            rows,
+            next_cursor=(self.encode_cursor(FORWARD, rows[-1])
+                         if has_next else None),
+            previous_cursor=(self.encode_cursor(BACKWARD, rows[0])
+                             if has_previous else None),
+        )
+
+    def encode_cursor(self, direction, obj):
+        values = [_to_json(getattr(obj, key)) for key in self.keys]
+        return signing.dumps(
+            {'d': direction, 'v': values}, salt=self.salt, compress=True)
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return FORWARD, None
+        try:
+            payload = signing.loads(cursor, salt=self.salt)
+            direction, values = payload['d'], payload['v']
+            if direction not in (FORWARD, BACKWARD) or \
+                    len(values) != len(self.keys):
+                raise ValueError
+            values = [self._to_python(key, value)
+                      for key, value in zip(self.keys, values)]
+        except (signing.BadSignature, KeyError, TypeError, ValueError,
+                ValidationError):
+            raise Http404(_('Invalid page.'))
+        return direction, values
+
+    def _seek(self, values, lookup):
+        """Rows strictly after ``values`` in lexicographic key order.
+
+        The leading ``<=``/``>=`` term lets the planner turn the condition
+        into a single index range scan.
+        """
+        first_key, first_value = self.keys[0], values[0]
+        condition = Q()
+        for i, (key, value) in enumerate(zip(self.keys, values)):
+            equal = dict(zip(self.keys[:i], values[:i]))
+            condition |= Q(**equal, **{f'{key}__{lookup}': value})
+        return Q(**{f'{first_key}__{lookup}e': first_value}) & condition
+
+    def _to_python(self, key, value):
+        try:
+            field = self.queryset.model._meta.get_field(key)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+
+def _to_json(value):
+    # Keep full microsecond precision, unlike DjangoJSONEncoder
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
@@ -0,0 +1,161 @@
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+
+RANK = 'search_rank'
+SNIPPET = 'search_snippet'
+
+# Control characters mark highlighted words inside snippets, so the
+# snippet can be HTML-escaped before the marks become <mark> tags.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+SEARCH_INDEX_NAME = 'task_search_idx'
+SQLITE_FTS_TABLE = 'tasks_task_fts'
+SQLITE_FTS_SETUP = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    f"name, description, content='tasks_task', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai "
+    f"AFTER INSERT ON tasks_task BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad "
+    f"AFTER DELETE ON tasks_task BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}"
+    f"({SQLITE_FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au "
+    f"AFTER UPDATE OF name, description ON tasks_task BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}"
+    f"({SQLITE_FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); END",
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_FTS_TEARDOWN = [
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+]
+
+
+def search_document():
+    """Weighted tsvector of a task; the GIN index is built on it."""
+    from django.contrib.postgres.search import SearchVector
+
+    return (SearchVector('name', weight='A', config='simple')
+            + SearchVector('description', weight='B', config='simple'))
+
+
+def create_search_index(schema_editor, task_model):
+    """Create the full-text index; SQLite table remakes drop its triggers,
+    so migrations that rebuild ``tasks_task`` must call this again."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+
+        schema_editor.add_index(
+            task_model, GinIndex(search_document(), name=SEARCH_INDEX_NAME))
+    elif vendor == 'sqlite':
+        for statement in SQLITE_FTS_SETUP:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(schema_editor, task_model):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}')
+    elif vendor == 'sqlite':
+        for statement in SQLITE_FTS_TEARDOWN:
+            schema_editor.execute(statement)
+
+
+def search_tasks(queryset, query):
+    """Filter tasks by words in name/description.
+
+    Matching tasks are annotated with ``search_rank`` (higher is better)
+    and ``search_snippet`` (text with highlight marks, see
+    ``HIGHLIGHT_START``/``HIGHLIGHT_END``).
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _search_postgresql(queryset, query)
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, query)
+    return _search_fallback(queryset, query)
+
+
+def _search_postgresql(queryset, query):
+    from django.contrib.postgres.search import (
+        SearchHeadline,
+        SearchQuery,
+        SearchRank,
+    )
+    from django.db.models.functions import Concat
+
+    search_query = SearchQuery(query, config='simple', search_type='websearch')
+    return queryset.alias(
+        search_document=search_document(),
+    ).filter(
+        search_document=search_query,
+    ).annotate(**{
+        RANK: SearchRank(F('search_document'), search_query),
+        SNIPPET: SearchHeadline(
+            Concat('name', Value(' '), 'description',
+                   output_field=TextField()),
+            search_query,
+            config='simple',
+            start_sel=HIGHLIGHT_START,
+            stop_sel=HIGHLIGHT_END,
+            max_words=20,
+            min_words=8,
+        ),
+    })
+
+
+def _search_sqlite(queryset, query):
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        # Still annotated: the list orders search results by rank
+        return queryset.none().annotate(**{
+            RANK: Value(0.0, output_field=FloatField()),
+            SNIPPET: Value(None, output_field=TextField()),
+        })
+    # Quoted prefix terms: user input can't inject FTS5 query syntax
+    match = ' '.join(f'"{term}"*' for term in terms)
+    matching = (f'FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} '
+                f'MATCH %s AND rowid = tasks_task.id')
+    return queryset.filter(
+        pk__in=RawSQL(
+            f'SELECT rowid FROM {SQLITE_FTS_TABLE} '
+            f'WHERE {SQLITE_FTS_TABLE} MATCH %s',
+            [match],
+        ),
+    ).annotate(**{
+        # bm25() is lower-is-better; name hits weigh more than description
+        RANK: RawSQL(
+            f'(SELECT -bm25({SQLITE_FTS_TABLE}, 10.0, 1.0) {matching})',
+            [match],
+            output_field=FloatField(),
+        ),
+        SNIPPET: RawSQL(
+            f"(SELECT snippet({SQLITE_FTS_TABLE}, -1, %s, %s, '…', 16) "
+            f'{matching})',
+            [HIGHLIGHT_START, HIGHLIGHT_END, match],
+            output_field=TextField(),
+        ),
+    })
+
+
+def _search_fallback(queryset, query):
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).annotate(**{
+        RANK: Value(0.0, output_field=FloatField()),
+        SNIPPET: Value(None, output_field=TextField()),
+    })
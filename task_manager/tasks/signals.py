@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from task_manager import versions
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.users.models import CustomUser
+
+from . import choices, counters, fragments
+from .models import Task
+
+
+def is_login_update(kwargs):
+    """True for the last_login bump Django makes on every login."""
+    return kwargs.get('update_fields') == frozenset({'last_login'})
+
+
+@receiver([post_save, post_delete], sender=Status)
+@receiver([post_save, post_delete], sender=Label)
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_choices(sender, **kwargs):
+    # Once committed: a request reading the old rows meanwhile would keep
+    # them under the new version
+    if not is_login_update(kwargs):
+        transaction.on_commit(lambda: choices.invalidate(sender))
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def count_label_links(sender, instance, action, reverse, pk_set, **kwargs):
+    """Label counters for ``labels`` changes made through the ORM; raw
+    through-table writes use ``counters.link_labels``/``unlink_labels``."""
+    if action == 'post_add':
+        if reverse:
+            deltas = {instance.pk: len(pk_set)}
+        else:
+            deltas = dict.fromkeys(pk_set, 1)
+        counters.update_counts('labels', deltas)
+    elif action in ('pre_remove', 'pre_clear'):
+        source, target = ('label_id', 'task_id') if reverse else \
+            ('task_id', 'label_id')
+        links = sender.objects.filter(**{source: instance.pk})
+        if pk_set is not None:
+            links = links.filter(**{f'{target}__in': pk_set})
+        counters.update_counts('labels', {
+            pk: -n for pk, n in counters.count_links(links).items()})
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_save, sender=CustomUser)
+def invalidate_all_rows(sender, **kwargs):
+    """Status and user names appear in many rows."""
+    if not is_login_update(kwargs):
+        fragments.invalidate_all()
+
+
+@receiver([post_save, post_delete], sender=Task)
+@receiver([post_save, post_delete], sender=Status)
+@receiver([post_save, post_delete], sender=Label)
+@receiver([post_save, post_delete], sender=CustomUser)
+def bump_table_version(sender, **kwargs):
+    if not is_login_update(kwargs):
+        versions.bump(sender)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def bump_labelled_tasks_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        versions.bump(Task)
@@ -0,0 +1,18 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from task_manager.tasks.search import HIGHLIGHT_END, HIGHLIGHT_START
+
+register = template.Library()
+
+
+@register.filter
+def highlight(snippet):
+    """Escape a search snippet and turn its highlight marks into <mark>."""
+    if not snippet:
+        return ''
+    html = escape(snippet) \
+        .replace(HIGHLIGHT_START, '<mark>') \
+        .replace(HIGHLIGHT_END, '</mark>')
+    return mark_safe(html)
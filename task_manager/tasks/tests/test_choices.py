@@ -0,0 +1,122 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager.statuses.models import Status
+from task_manager.tasks.forms import TaskBulkActionForm, TaskForm
+from task_manager.tests.builders import build_label, build_status, build_user
+from task_manager.users.models import CustomUser
+
+CHOICE_TABLES = ('statuses_status', 'labels_label', 'users_customuser')
+
+
+def choice_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT')
+        and any(f'FROM "{table}"' in query['sql'] for table in CHOICE_TABLES)
+        and 'WHERE' not in query['sql']
+    ]
+
+
+def option_labels(field):
+    return [str(label) for value, label in field.field.choices if value]
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings):
+    settings.CACHE_SHARED = True
+
+
+@pytest.fixture
+def reference_data():
+    build_status('new')
+    build_label('bug')
+    build_user('exec', first_name='Ann', last_name='Lee')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, option', [
+    ('tasks:list', 'Ann Lee'),
+    # The task form loads executors and labels through autocomplete
+    ('tasks:create', 'new'),
+])
+def test_choice_lists_are_served_from_cache(
+        authenticated_client, reference_data, url_name, option):
+    url = reverse(url_name)
+    authenticated_client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = authenticated_client.get(url)
+
+    assert response.status_code == 200
+    assert choice_queries(queries) == []
+    assert f'>{option}</option>' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_choice_lists_need_a_shared_cache(
+        authenticated_client, reference_data, settings):
+    settings.CACHE_SHARED = False
+    url = reverse('tasks:list')
+    authenticated_client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        authenticated_client.get(url)
+
+    assert choice_queries(queries) != []
+
+
+@pytest.mark.django_db
+def test_choice_lists_follow_changes(
+        reference_data, django_capture_on_commit_callbacks):
+    form = TaskForm()
+    assert option_labels(form['status']) == ['new']
+
+    status = Status.objects.get(name='new')
+    status.name = 'open'
+    with django_capture_on_commit_callbacks(execute=True):
+        status.save()
+        build_status('closed')
+
+    assert option_labels(TaskForm()['status']) == ['open', 'closed']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        status.delete()
+
+    assert option_labels(TaskForm()['status']) == ['closed']
+
+
+@pytest.mark.django_db
+def test_choice_lists_change_when_the_write_commits(
+        reference_data, django_capture_on_commit_callbacks):
+    option_labels(TaskForm()['status'])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        build_status('closed')
+        # Not yet committed: other requests can only rebuild the old list
+        assert option_labels(TaskForm()['status']) == ['new']
+
+    assert option_labels(TaskForm()['status']) == ['new', 'closed']
+
+
+@pytest.mark.django_db
+def test_login_does_not_invalidate_user_choices(client, reference_data):
+    assert option_labels(TaskBulkActionForm()['executor']) == ['Ann Lee']
+    user = CustomUser.objects.get(username='exec')
+
+    with CaptureQueriesContext(connection) as queries:
+        client.force_login(user)
+        TaskBulkActionForm()['executor'].as_widget()
+
+    assert choice_queries(queries) == []
+
+
+@pytest.mark.django_db
+def test_cached_choices_still_validate_submitted_ids(task_data):
+    data = task_data | {'status': 0}
+    form = TaskForm(data=data)
+
+    assert not form.is_valid()
+    assert 'status' in form.errors
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.management.commands.benchmark_servers import (
+    percentile,
+    run_load,
+)
+from task_manager.tasks.management.commands.seed_data import LABELS, STATUSES
+from task_manager.tasks.models import Task
+from task_manager.tests.builders import build_label, build_status, build_user
+from task_manager.users.models import CustomUser
+
+
+@pytest.fixture
+def references():
+    build_status('new')
+    build_label('bug')
+    build_label('feature')
+    build_user('alice')
+    build_user('bob')
+
+
+def import_file(path, *args):
+    call_command('import_tasks', str(path), *args)
+
+
+@pytest.mark.django_db
+def test_import_tasks_from_csv(tmp_path, references, capsys):
+    path = tmp_path / 'tasks.csv'
+    path.write_text(
+        'name,description,status,author,executor,labels\n'
+        'First,Some text,new,alice,bob,"bug, feature"\n'
+        'Second,,new,bob,bob,\n'
+        'Broken,,closed,alice,bob,\n',
+        encoding='utf-8',
+    )
+
+    import_file(path, '--batch-size', '2')
+    out, err = capsys.readouterr()
+
+    first = Task.objects.get(name='First')
+    assert first.description == 'Some text'
+    assert first.author.username == 'alice'
+    assert first.executor.username == 'bob'
+    assert {label.name for label in first.labels.all()} == {'bug', 'feature'}
+    assert not Task.objects.get(name='Second').labels.exists()
+    assert not Task.objects.filter(name='Broken').exists()
+
+    assert 'Batch 1: 2 created, 0 errors' in out
+    assert 'Batch 2: 0 created, 1 errors' in out
+    assert 'Imported 2 tasks with 1 errors' in out
+    assert 'row 3: unknown status "closed"' in err
+
+
+@pytest.mark.django_db
+def test_import_tasks_from_jsonl(tmp_path, references, capsys):
+    rows = [
+        {'name': 'One', 'status': 'new', 'author': 'alice',
+         'executor': 'alice', 'labels': ['bug']},
+        {'name': 'One', 'status': 'new', 'author': 'alice',
+         'executor': 'alice'},
+        {'name': 'Two', 'status': 'new', 'author': 'carol',
+         'executor': 'alice'},
+    ]
+    path = tmp_path / 'tasks.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n',
+        encoding='utf-8',
+    )
+
+    import_file(path)
+    err = capsys.readouterr().err
+
+    assert list(Task.objects.values_list('name', flat=True)) == ['One']
+    assert 'row 2: task "One" already exists' in err
+    assert 'row 3: unknown author "carol"' in err
+    assert 'row 4: invalid JSON' in err
+
+
+@pytest.mark.django_db
+def test_import_tasks_rejects_rows_of_wrong_types(tmp_path, references, capsys):
+    row = {'name': 'Fine', 'status': 'new', 'author': 'alice',
+           'executor': 'bob'}
+    rows = [row | {'name': 123}, row | {'labels': 5},
+            row | {'labels': ['bug', 7]}, row | {'executor': ['bob']}, row]
+    path = tmp_path / 'tasks.jsonl'
+    path.write_text('\n'.join(json.dumps(row) for row in rows),
+                    encoding='utf-8')
+
+    import_file(path)
+    err = capsys.readouterr().err
+
+    assert list(Task.objects.values_list('name', flat=True)) == ['Fine']
+    assert 'row 1: name must be a string' in err
+    assert 'row 2: labels must be a list of strings' in err
+    assert 'row 3: labels must be a list of strings' in err
+    assert 'row 4: executor must be a string' in err
+
+
+@pytest.mark.django_db
+def test_import_tasks_skips_existing_names(tmp_path, references):
+    path = tmp_path / 'tasks.csv'
+    path.write_text(
+        'name,status,author,executor\nDup,new,alice,bob\n', encoding='utf-8')
+
+    import_file(path)
+    import_file(path)
+
+    assert Task.objects.filter(name='Dup').count() == 1
+
+
+@pytest.mark.django_db
+def test_import_tasks_can_create_missing_references(tmp_path, references):
+    path = tmp_path / 'tasks.csv'
+    path.write_text(
+        'name,status,author,executor,labels\n'
+        'A,review,alice,bob,urgent\n'
+        'B,review,alice,bob,urgent\n',
+        encoding='utf-8',
+    )
+
+    import_file(path, '--create-missing')
+
+    assert Status.objects.filter(name='review').count() == 1
+    assert Label.objects.get(name='urgent').task_set.count() == 2
+
+
+@pytest.mark.django_db
+def test_import_tasks_requires_known_format(tmp_path):
+    path = tmp_path / 'tasks.txt'
+    path.write_text('', encoding='utf-8')
+
+    with pytest.raises(CommandError):
+        import_file(path)
+
+
+@pytest.mark.django_db
+def test_seed_data_generates_dataset(capsys):
+    call_command('seed_data', '--scale', '300', '--batch-size', '128')
+
+    assert Task.objects.count() == 300
+    assert CustomUser.objects.filter(
+        username__startswith='seed_user_').count() == 10
+    assert Status.objects.count() == len(STATUSES)
+    labelled = Task.objects.filter(labels__isnull=False).distinct().count()
+    assert 0 < labelled < 300
+    # The label distribution is skewed towards the first labels
+    counts = dict(Label.objects.annotate(
+        total=Count('task')).values_list('name', 'total'))
+    assert counts['bug'] > counts['analytics']
+    assert 'Created 10 users and 300 tasks' in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_seed_data_can_run_repeatedly():
+    call_command('seed_data', '--scale', '20', '--users', '3')
+    call_command('seed_data', '--scale', '20', '--users', '3', '--seed', '1')
+
+    assert Task.objects.count() == 40
+    assert CustomUser.objects.count() == 6
+    assert Label.objects.count() == len(LABELS)
+
+
+@pytest.mark.django_db
+def test_seed_data_numbers_users_after_the_highest_one():
+    call_command('seed_data', '--scale', '0', '--users', '3')
+    CustomUser.objects.get(username='seed_user_2').delete()
+
+    call_command('seed_data', '--scale', '0', '--users', '2')
+
+    assert sorted(CustomUser.objects.values_list('username', flat=True)) == [
+        'seed_user_1', 'seed_user_3', 'seed_user_4', 'seed_user_5']
+
+
+@pytest.mark.django_db
+def test_benchmark_views_writes_report(tmp_path):
+    report_path = tmp_path / 'report.json'
+
+    call_command('benchmark_views', '--scales', '20', '40', '--repeat', '1',
+                 '--use-current-db', '--output', str(report_path))
+
+    report = json.loads(report_path.read_text(encoding='utf-8'))
+    results = report['results']
+    assert Task.objects.count() == 40
+    assert {result['scale'] for result in results} == {20, 40}
+    assert {result['view'] for result in results} == {
+        'tasks:list', 'tasks:detail', 'users:list', 'labels:list',
+        'statuses:list',
+    }
+    assert all(result['queries'] > 0 and result['median_ms'] > 0
+               for result in results)
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.headers['Cookie'] != 'session=1':
+            status = 403
+        else:
+            status = 404 if self.path == '/missing/' else 200
+        body = b'page'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def page_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_load_measures_requests(page_server):
+    stats = asyncio.run(run_load(
+        '127.0.0.1', page_server, ['/', '/missing/'], concurrency=4,
+        duration=0.3, headers={'Cookie': 'session=1'}))
+
+    assert stats['requests'] > 0
+    # Every second request of a connection hits the 404 page
+    assert abs(stats['errors'] - stats['requests']) <= 4
+    assert 0 < stats['p50_ms'] <= stats['p99_ms'] <= stats['max_ms']
+    assert stats['throughput'] > 0
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 99) == 7
+    assert percentile([], 99) == 0.0
@@ -0,0 +1,185 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.tests.builders import build_label, build_status, build_user
+from task_manager.users.models import CustomUser
+
+
+def stored_counts():
+    return {
+        'status': dict(Status.objects.values_list('pk', 'tasks_count')),
+        'label': dict(Label.objects.values_list('pk', 'tasks_count')),
+        'author': dict(CustomUser.objects.values_list(
+            'pk', 'authored_tasks_count')),
+        'executor': dict(CustomUser.objects.values_list(
+            'pk', 'executed_tasks_count')),
+    }
+
+
+def actual_counts():
+    return {
+        'status': dict(Status.objects.annotate(
+            n=Count('tasks')).values_list('pk', 'n')),
+        'label': dict(Label.objects.annotate(
+            n=Count('task')).values_list('pk', 'n')),
+        'author': dict(CustomUser.objects.annotate(
+            n=Count('authored_tasks')).values_list('pk', 'n')),
+        'executor': dict(CustomUser.objects.annotate(
+            n=Count('executed_tasks')).values_list('pk', 'n')),
+    }
+
+
+def assert_counters_match():
+    assert stored_counts() == actual_counts()
+
+
+@pytest.fixture
+def refs(task_data):
+    return task_data | {
+        'other_status': build_status('other'),
+        'other_user': build_user('other'),
+        'labels': [build_label(f'label{i}') for i in range(3)],
+    }
+
+
+def make_task(refs, name, **kwargs):
+    fields = {key: refs[key] for key in ('status', 'author', 'executor')}
+    return Task.objects.create(name=name, **fields | kwargs)
+
+
+@pytest.mark.django_db
+def test_counters_follow_task_lifecycle(refs):
+    task = make_task(refs, 'One')
+    make_task(refs, 'Two', executor=refs['other_user'])
+    assert Status.objects.get(pk=refs['status'].pk).tasks_count == 2
+    assert_counters_match()
+
+    task.status = refs['other_status']
+    task.author = refs['other_user']
+    task.save()
+    assert_counters_match()
+
+    task.delete()
+    assert_counters_match()
+
+
+@pytest.mark.django_db
+def test_counters_follow_label_changes(refs):
+    first, second, third = refs['labels']
+    task = make_task(refs, 'One')
+
+    task.labels.set([first, second])
+    assert_counters_match()
+    task.labels.add(second, third)
+    assert_counters_match()
+    task.labels.remove(first, first)
+    assert_counters_match()
+    task.labels.set([first])
+    assert_counters_match()
+    third.task_set.add(task, make_task(refs, 'Two'))
+    assert_counters_match()
+    third.task_set.remove(task)
+    assert_counters_match()
+    third.task_set.clear()
+    task.labels.clear()
+    assert_counters_match()
+
+    task.labels.set([first, second])
+    task.delete()
+    assert_counters_match()
+
+
+@pytest.mark.django_db
+def test_counters_follow_queryset_writes(refs):
+    Task.objects.bulk_create([
+        Task(name=f'Task {i}', status=refs['status'], author=refs['author'],
+             executor=refs['executor'])
+        for i in range(4)
+    ])
+    assert_counters_match()
+
+    Task.objects.filter(name__in=['Task 0', 'Task 1']).update(
+        status=refs['other_status'], executor_id=refs['other_user'].pk)
+    assert_counters_match()
+
+    for task in Task.objects.all():
+        task.labels.set(refs['labels'][:2])
+    Task.objects.filter(name__in=['Task 1', 'Task 2']).delete()
+    assert_counters_match()
+
+
+@pytest.mark.django_db
+def test_stale_instances_do_not_overwrite_counters(refs):
+    status = Status.objects.get(pk=refs['status'].pk)
+    user = CustomUser.objects.get(pk=refs['author'].pk)
+    make_task(refs, 'One')
+
+    status.name = 'renamed'
+    status.save()
+    user.first_name = 'Renamed'
+    user.save()
+
+    assert Status.objects.get(pk=status.pk).tasks_count == 1
+    assert CustomUser.objects.get(pk=user.pk).authored_tasks_count == 1
+
+
+@pytest.mark.django_db
+def test_counters_follow_views_and_commands(client, refs, tmp_path):
+    client.force_login(refs['author'])
+    client.post(reverse('tasks:create'), {
+        'name': 'Created', 'status': refs['status'].pk,
+        'executor': refs['executor'].pk,
+        'labels': [label.pk for label in refs['labels']],
+    })
+    task = Task.objects.get(name='Created')
+    client.post(reverse('tasks:update', args=[task.pk]), {
+        'name': 'Created', 'status': refs['other_status'].pk,
+        'executor': refs['other_user'].pk,
+        'labels': [refs['labels'][0].pk],
+    })
+    assert_counters_match()
+
+    path = tmp_path / 'tasks.csv'
+    path.write_text(
+        'name,status,author,executor,labels\n'
+        'Imported,other,author_user,other,"label1, label2"\n',
+        encoding='utf-8',
+    )
+    call_command('import_tasks', str(path))
+    call_command('seed_data', '--scale', '30', '--users', '2')
+    assert_counters_match()
+
+    tasks = list(Task.objects.values_list('pk', flat=True)[:20])
+    for action, data in [
+        ('set_status', {'status': refs['status'].pk}),
+        ('set_executor', {'executor': refs['executor'].pk}),
+        ('add_labels', {'labels': [label.pk for label in refs['labels']]}),
+        ('remove_labels', {'labels': [refs['labels'][1].pk]}),
+    ]:
+        client.post(reverse('tasks:bulk'),
+                    {'tasks': tasks, 'action': action, **data})
+        assert_counters_match()
+
+    own = list(Task.objects.filter(
+        author=refs['author']).values_list('pk', flat=True))
+    client.post(reverse('tasks:bulk'), {'tasks': own, 'action': 'delete'})
+    assert not Task.objects.filter(author=refs['author']).exists()
+    assert_counters_match()
+
+
+@pytest.mark.django_db
+def test_recount_tasks_repairs_counters(refs):
+    task = make_task(refs, 'One')
+    task.labels.set(refs['labels'])
+    Status.objects.update(tasks_count=42)
+    Label.objects.update(tasks_count=-1)
+    CustomUser.objects.update(authored_tasks_count=7, executed_tasks_count=0)
+
+    call_command('recount_tasks')
+
+    assert_counters_match()
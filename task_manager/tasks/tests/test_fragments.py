@@ -0,0 +1,162 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from task_manager.statuses.models import Status
+from task_manager.tasks import fragments
+from task_manager.tasks.models import Task
+from task_manager.tests.builders import build_status, build_task, build_user
+
+ROW_TEMPLATE = 'tasks/partials/row.html'
+
+
+def rendered_rows(response):
+    return sum(template.name == ROW_TEMPLATE
+               for template in response.templates)
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings):
+    settings.CACHE_SHARED = True
+
+
+@pytest.fixture
+def tasks(authenticated_client):
+    status = build_status('Open')
+    return [
+        build_task(name=f'Task {i}', status=status,
+                   author=authenticated_client.user,
+                   executor=authenticated_client.user)
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_rows_are_rendered_once(authenticated_client, tasks):
+    url = reverse('tasks:list')
+    first = authenticated_client.get(url)
+    second = authenticated_client.get(url)
+
+    assert rendered_rows(first) == 3
+    assert rendered_rows(second) == 0
+    assert list(second.context['task_rows']) == \
+        list(first.context['task_rows'])
+
+
+@pytest.mark.django_db
+def test_task_save_rerenders_its_row(
+        authenticated_client, tasks, django_capture_on_commit_callbacks):
+    url = reverse('tasks:list')
+    authenticated_client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        tasks[0].name = 'Renamed task'
+        tasks[0].save()
+
+    response = authenticated_client.get(url)
+
+    assert rendered_rows(response) == 1
+    assert 'Renamed task' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_status_and_user_changes_rerender_rows(
+        authenticated_client, tasks, django_capture_on_commit_callbacks):
+    url = reverse('tasks:list')
+    authenticated_client.get(url)
+
+    status = Status.objects.get(name='Open')
+    status.name = 'Reopened'
+    with django_capture_on_commit_callbacks(execute=True):
+        status.save()
+    response = authenticated_client.get(url)
+    assert rendered_rows(response) == 3
+    assert 'Reopened' in response.content.decode()
+
+    user = authenticated_client.user
+    user.first_name = 'Renamed'
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    response = authenticated_client.get(url)
+    assert rendered_rows(response) == 3
+    assert 'Renamed' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_queryset_update_rerenders_rows(
+        authenticated_client, tasks, django_capture_on_commit_callbacks):
+    url = reverse('tasks:list')
+    authenticated_client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        Task.objects.filter(pk=tasks[1].pk).update(name='Bulk renamed')
+
+    response = authenticated_client.get(url)
+
+    assert 'Bulk renamed' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_rows_read_before_a_write_stay_under_the_old_version(tasks):
+    stale = list(Task.objects.for_listing().order_by('pk'))
+
+    tasks[0].name = 'Renamed task'
+    tasks[0].save()
+    # A request that loaded the task before the write caches its row late
+    assert 'Renamed task' not in fragments.render_rows(stale)[0]
+
+    fresh = list(Task.objects.for_listing().order_by('pk'))
+    assert 'Renamed task' in fragments.render_rows(fresh)[0]
+
+
+@pytest.mark.django_db
+def test_rows_are_shared_by_time_zones(
+        tasks, django_capture_on_commit_callbacks):
+    with timezone.override('Asia/Tokyo'):
+        fragments.render_rows(tasks)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tasks[0].name = 'Renamed task'
+        tasks[0].save()
+
+    with timezone.override('Asia/Tokyo'):
+        assert 'Renamed task' in fragments.render_rows(tasks)[0]
+    assert fragments.render_rows(tasks, use_cache=False) == \
+        fragments.render_rows(tasks)
+
+
+@pytest.mark.django_db
+def test_rows_need_a_shared_cache(authenticated_client, tasks, settings):
+    settings.CACHE_SHARED = False
+    url = reverse('tasks:list')
+    authenticated_client.get(url)
+
+    assert rendered_rows(authenticated_client.get(url)) == 3
+
+
+@pytest.mark.django_db
+def test_rows_are_cached_per_language(tasks):
+    with translation.override('en'):
+        english = fragments.render_rows(tasks)
+    with translation.override('ru'):
+        russian = fragments.render_rows(tasks)
+
+    assert 'Edit' in english[0]
+    assert 'Edit' not in russian[0]
+
+
+@pytest.mark.django_db
+def test_search_results_bypass_cache(authenticated_client, tasks):
+    url = reverse('tasks:list')
+    authenticated_client.get(url)
+
+    response = authenticated_client.get(url, {'q': 'Task'})
+
+    assert rendered_rows(response) == 3
+
+
+@pytest.mark.django_db
+def test_new_user_invalidates_rows(tasks, django_capture_on_commit_callbacks):
+    fragments.render_rows(tasks)
+    generation = fragments._generation()
+    with django_capture_on_commit_callbacks(execute=True):
+        build_user('newcomer')
+    assert fragments._generation() != generation
@@ -4,6 +4,7 @@ from django.db.utils import IntegrityError
 
 from task_manager.labels.models import Label
 from task_manager.tasks.models import Task
+from task_manager.tests.builders import build_label, build_task
 
 
 @pytest.mark.django_db
@@ -68,3 +69,19 @@ def test_cannot_delete_user_if_task_exists(task_data, user_field):
     user = getattr(task, user_field)
     with pytest.raises(ProtectedError):
         user.delete()
+
+
+@pytest.mark.django_db
+def test_for_listing_loads_related_data_upfront(
+        task_data, django_assert_num_queries):
+    label = build_label()
+    build_task(**task_data, labels=[label])
+    build_task(**task_data | {'name': 'Other Task'}, labels=[label])
+
+    with django_assert_num_queries(2):
+        tasks = list(Task.objects.for_listing())
+        for task in tasks:
+            assert task.status.name == 'some status'
+            assert task.author.full_name == 'author_user'
+            assert task.executor.full_name == 'executor_user'
+            assert [lbl.name for lbl in task.labels.all()] == [label.name]
@@ -0,0 +1,134 @@
+import pytest
+from django.urls import reverse
+
+from task_manager.tasks.models import Task
+from task_manager.tasks.search import search_tasks
+from task_manager.tasks.templatetags.task_search import highlight
+from task_manager.tasks.views import TaskListView
+
+
+@pytest.fixture
+def make_task(task_data):
+    def make(name, description=''):
+        return Task.objects.create(
+            **task_data | {'name': name, 'description': description})
+    return make
+
+
+def found_names(query):
+    return {task.name for task in search_tasks(Task.objects.all(), query)}
+
+
+@pytest.mark.django_db
+def test_search_by_name_and_description_words(make_task):
+    make_task('Fix login form', 'Users cannot sign in')
+    make_task('Update docs', 'Describe the login flow')
+    make_task('Refactor models')
+
+    assert found_names('login') == {'Fix login form', 'Update docs'}
+    assert found_names('sign') == {'Fix login form'}
+    assert found_names('login docs') == {'Update docs'}
+    assert found_names('deploy') == set()
+
+
+@pytest.mark.django_db
+def test_search_matches_word_prefixes(make_task):
+    make_task('Refactoring of statuses')
+
+    assert found_names('refact stat') == {'Refactoring of statuses'}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['"', 'a AND', '*', 'NEAR(', '-:^'])
+def test_search_tolerates_query_syntax(make_task, query):
+    make_task('Task with AND inside')
+
+    search_tasks(Task.objects.all(), query).count()
+
+
+@pytest.mark.django_db
+def test_search_index_follows_updates_and_deletes(make_task):
+    task = make_task('Old title')
+    task.name = 'New title'
+    task.save()
+
+    assert found_names('old') == set()
+    assert found_names('new') == {'New title'}
+
+    task.delete()
+
+    assert found_names('new') == set()
+
+
+@pytest.mark.django_db
+def test_search_index_follows_bulk_operations(task_data):
+    Task.objects.bulk_create(
+        [Task(**task_data | {'name': f'Imported {i}'}) for i in range(3)])
+    Task.objects.filter(name='Imported 0').update(description='urgent')
+
+    assert found_names('imported') == {f'Imported {i}' for i in range(3)}
+    assert found_names('urgent') == {'Imported 0'}
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_matches_first(authenticated_client, make_task):
+    make_task('Unrelated', 'mentions the parser once')
+    make_task('Parser crash')
+
+    response = authenticated_client.get(reverse('tasks:list'), {'q': 'parser'})
+    names = [task.name for task in response.context['tasks']]
+
+    assert names == ['Parser crash', 'Unrelated']
+
+
+@pytest.mark.django_db
+def test_search_results_show_highlighted_snippets(
+        authenticated_client, make_task):
+    make_task('Escape <b>html</b>', 'Snippet about the search engine')
+
+    response = authenticated_client.get(reverse('tasks:list'), {'q': 'search'})
+    content = response.content.decode()
+
+    assert '<mark>search</mark>' in content
+    assert response.context['filter'].form['q'].value() == 'search'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['-', '*', '"'])
+def test_search_without_words_finds_nothing(
+        authenticated_client, make_task, query):
+    make_task('Task with - inside')
+
+    response = authenticated_client.get(reverse('tasks:list'), {'q': query})
+
+    assert response.status_code == 200
+    assert list(response.context['tasks']) == []
+
+
+def test_highlight_escapes_snippet_text():
+    assert highlight('<b>\x02bold\x03</b>') == \
+        '&lt;b&gt;<mark>bold</mark>&lt;/b&gt;'
+    assert highlight(None) == ''
+
+
+@pytest.mark.django_db
+def test_search_results_are_paginated_by_rank(
+        authenticated_client, make_task, monkeypatch):
+    monkeypatch.setattr(TaskListView, 'paginate_by', 2)
+    for i in range(3):
+        make_task(f'Report {i}')
+        make_task(f'Other {i}', 'weekly report')
+    url = reverse('tasks:list')
+
+    names = []
+    params = {'q': 'report'}
+    while True:
+        response = authenticated_client.get(url, params)
+        names += [task.name for task in response.context['tasks']]
+        page = response.context['page_obj']
+        if not page.has_next():
+            break
+        params['cursor'] = page.next_cursor
+
+    assert names == ['Report 2', 'Report 1', 'Report 0',
+                     'Other 2', 'Other 1', 'Other 0']
@@ -1,14 +1,26 @@
+import csv
+import io
+import json
+from urllib.parse import quote
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from task_manager.tasks.forms import TaskBulkActionForm
 from task_manager.tasks.models import Task
+from task_manager.tasks.views import TaskListView
 from task_manager.tests.builders import (
     build_label,
     build_status,
     build_task,
     build_user,
 )
-from task_manager.tests.utils import assert_redirected_with_message
+from task_manager.tests.utils import (
+    assert_redirected_with_message,
+    query_budget,
+)
 
 
 @pytest.fixture
@@ -180,6 +192,138 @@ def test_filter_by_multiple_fields(authenticated_client, sample_tasks):
     assert len(filtered_tasks) == 2
 
 
+@pytest.mark.django_db
+def test_tasks_list_query_count_does_not_depend_on_rows(authenticated_client):
+    """Rendering the list must not run per-row queries"""
+    status = build_status()
+    author = build_user(username='author_user')
+    executor = build_user(username='executor_user')
+    labels = [build_label(f'label{i}') for i in range(3)]
+
+    def add_tasks(start, count):
+        for i in range(start, start + count):
+            build_task(name=f'Task {i}', status=status, author=author,
+                       executor=executor, labels=labels)
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(reverse('tasks:list'))
+        assert response.status_code == 200
+        return len(queries)
+
+    add_tasks(0, 2)
+    count_queries()  # warm up the cached filter choices
+    few_rows_queries = count_queries()
+    add_tasks(2, 20)
+    many_rows_queries = count_queries()
+
+    assert many_rows_queries == few_rows_queries
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(TaskListView, 'paginate_by', 3)
+
+
+def collect_pages(client, url, cursor_attr='next_cursor', cursor=None):
+    pages = []
+    while True:
+        response = client.get(url, {'cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        page = response.context['page_obj']
+        pages.append([task.name for task in response.context['tasks']])
+        cursor = getattr(page, cursor_attr)
+        if cursor is None:
+            return pages, page
+
+
+@pytest.mark.django_db
+def test_tasks_list_keyset_pagination(
+        authenticated_client, small_pages, task_data):
+    names = [f'Task {i}' for i in range(8)]
+    for name in names:
+        Task.objects.create(**task_data | {'name': name})
+
+    pages, last_page = collect_pages(
+        authenticated_client, reverse('tasks:list'))
+
+    assert pages == [
+        ['Task 7', 'Task 6', 'Task 5'],
+        ['Task 4', 'Task 3', 'Task 2'],
+        ['Task 1', 'Task 0'],
+    ]
+    assert not last_page.has_next()
+
+    back_pages, first_page = collect_pages(
+        authenticated_client, reverse('tasks:list'),
+        cursor_attr='previous_cursor', cursor=last_page.previous_cursor)
+
+    assert back_pages == pages[-2::-1]
+    assert not first_page.has_previous()
+
+
+@pytest.mark.django_db
+def test_tasks_list_pagination_keeps_filters(
+        authenticated_client, small_pages, task_data):
+    other_status = build_status('other')
+    for i in range(5):
+        Task.objects.create(**task_data | {'name': f'Matching {i}'})
+        Task.objects.create(
+            **task_data | {'name': f'Other {i}', 'status': other_status})
+
+    url = reverse('tasks:list') + f'?status={task_data["status"].pk}'
+    response = authenticated_client.get(url)
+    content = response.content.decode()
+    page = response.context['page_obj']
+
+    assert f'status={task_data["status"].pk}' in content
+    assert f'cursor={quote(page.next_cursor)}' in content
+
+    response = authenticated_client.get(url + f'&cursor={page.next_cursor}')
+    names = [task.name for task in response.context['tasks']]
+
+    assert names == ['Matching 1', 'Matching 0']
+
+
+@pytest.mark.django_db
+def test_tasks_list_rejects_tampered_cursor(
+        authenticated_client, small_pages, task_data):
+    for i in range(4):
+        Task.objects.create(**task_data | {'name': f'Task {i}'})
+    response = authenticated_client.get(reverse('tasks:list'))
+    cursor = response.context['page_obj'].next_cursor
+
+    response = authenticated_client.get(
+        reverse('tasks:list'), {'cursor': cursor[:-1] + 'x'})
+
+    assert response.status_code == 404
+
+
+# ----- Detail view -----------------------------------------------
+@pytest.mark.django_db
+def test_task_detail_query_count_does_not_depend_on_labels(
+        authenticated_client):
+    """Labels are prefetched with a single query whatever their number"""
+    bare_task = build_task(name='No labels')
+    labelled_task = build_task(
+        name='Many labels',
+        status=bare_task.status,
+        author=bare_task.author,
+        executor=bare_task.executor,
+        labels=[build_label(f'label{i}') for i in range(5)],
+    )
+
+    def count_queries(task):
+        url = reverse('tasks:detail', args=[task.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(url)
+        assert response.status_code == 200
+        return len(queries)
+
+    count_queries(bare_task)  # caches the logged-in user
+    assert count_queries(labelled_task) == count_queries(bare_task)
+
+
 # ----- Create view -----------------------------------------------
 @pytest.mark.django_db
 @pytest.mark.parametrize('method', ['get', 'post'], ids=['GET', 'POST'])
@@ -407,3 +551,213 @@ def test_task_delete_authenticated_author(authenticated_client, task_data):
         'Задача успешно удалена'
     )
     assert not Task.objects.filter(id=task.id).exists()
+
+
+# ----- Export view -----------------------------------------------
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url_name', ['tasks:export_csv', 'tasks:export_ndjson'])
+def test_task_export_requires_auth(client, url_name):
+    response = client.get(reverse(url_name))
+
+    assert response.status_code == 302
+    assert reverse('login') in response.url
+
+
+@pytest.mark.django_db
+def test_task_export_csv(authenticated_client, sample_tasks):
+    response = authenticated_client.get(reverse('tasks:export_csv'))
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+    assert 'tasks.csv' in response['Content-Disposition']
+
+    rows = list(csv.DictReader(
+        io.StringIO(b''.join(response.streaming_content).decode())))
+
+    assert [row['name'] for row in rows] == \
+        [task.name for task in sample_tasks['tasks']]
+    assert rows[3]['status'] == 'Closed'
+    assert rows[3]['author'] == 'executor2'
+    assert rows[3]['labels'] == 'bug, feature'
+
+
+@pytest.mark.django_db
+def test_task_export_ndjson_applies_filters(authenticated_client, sample_tasks):
+    label = sample_tasks['labels'][1]  # label_feature
+    response = authenticated_client.get(
+        reverse('tasks:export_ndjson'), {'label': label.pk})
+
+    assert response['Content-Type'] == 'application/x-ndjson; charset=utf-8'
+
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert [row['name'] for row in rows] == [
+        'Feature by author/executor2', 'Feature by executor2']
+    assert rows[1]['labels'] == ['bug', 'feature']
+    assert rows[0]['executor'] == 'executor2'
+
+
+@pytest.mark.django_db
+def test_task_export_loads_related_data_in_bulk(
+        authenticated_client, sample_tasks, django_assert_max_num_queries):
+    with django_assert_max_num_queries(6):
+        response = authenticated_client.get(reverse('tasks:export_ndjson'))
+        content = b''.join(response.streaming_content)
+
+    assert content.count(b'\n') == len(sample_tasks['tasks'])
+
+
+# ----- Bulk actions -----------------------------------------------
+def post_bulk_action(client, tasks, action, **data):
+    return client.post(reverse('tasks:bulk'), {
+        'tasks': [task.pk for task in tasks],
+        'action': action,
+        **data,
+    }, follow=True)
+
+
+@pytest.mark.django_db
+def test_bulk_actions_require_auth(client, sample_tasks):
+    response = post_bulk_action(
+        client, sample_tasks['tasks'], 'delete')
+
+    assert reverse('login') in response.redirect_chain[-1][0]
+    assert Task.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_bulk_change_status_and_executor(authenticated_client, sample_tasks):
+    tasks = sample_tasks['tasks'][:3]
+    status_closed = sample_tasks['statuses'][1]
+    executor2 = sample_tasks['executors'][1]
+
+    with CaptureQueriesContext(connection) as queries:
+        post_bulk_action(authenticated_client, tasks, 'set_status',
+                         status=status_closed.pk)
+    updates = [q for q in queries
+               if q['sql'].startswith('UPDATE "tasks_task"')]
+    assert len(updates) == 1
+
+    response = post_bulk_action(authenticated_client, tasks, 'set_executor',
+                                executor=executor2.pk)
+
+    assert_redirected_with_message(
+        response, reverse('tasks:list'), 'Обновлено задач: 3')
+    for task in tasks:
+        task.refresh_from_db()
+        assert task.status == status_closed
+        assert task.executor == executor2
+    assert sample_tasks['tasks'][3].executor == executor2
+
+
+@pytest.mark.django_db
+def test_bulk_add_and_remove_labels(authenticated_client, sample_tasks):
+    label_bug, label_feature = sample_tasks['labels']
+    tasks = sample_tasks['tasks']
+
+    post_bulk_action(authenticated_client, tasks, 'add_labels',
+                     labels=[label_bug.pk, label_feature.pk])
+
+    for task in tasks:
+        assert set(task.labels.all()) == {label_bug, label_feature}
+
+    post_bulk_action(authenticated_client, tasks[:2], 'remove_labels',
+                     labels=[label_bug.pk])
+
+    assert set(tasks[0].labels.all()) == {label_feature}
+    assert set(tasks[2].labels.all()) == {label_bug, label_feature}
+
+
+@pytest.mark.django_db
+def test_bulk_action_requires_its_argument(authenticated_client, sample_tasks):
+    response = post_bulk_action(
+        authenticated_client, sample_tasks['tasks'], 'set_status')
+
+    assert_redirected_with_message(
+        response, reverse('tasks:list'), 'Обязательное поле.')
+    assert Task.objects.filter(status=sample_tasks['statuses'][0]).count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_delete_by_author(client, sample_tasks):
+    author = sample_tasks['author']
+    client.force_login(author)
+    own_tasks = sample_tasks['tasks'][:2]
+
+    response = post_bulk_action(client, own_tasks, 'delete')
+
+    assert_redirected_with_message(
+        response, reverse('tasks:list'), 'Удалено задач: 2')
+    assert set(Task.objects.all()) == set(sample_tasks['tasks'][2:])
+
+
+@pytest.mark.django_db
+def test_bulk_delete_rejects_foreign_tasks(client, sample_tasks):
+    client.force_login(sample_tasks['author'])
+
+    response = post_bulk_action(client, sample_tasks['tasks'], 'delete')
+
+    assert_redirected_with_message(
+        response, reverse('tasks:list'), 'Задачу может удалить только ее автор')
+    assert Task.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_bulk_delete_keeps_tasks_reassigned_after_the_check(sample_tasks):
+    author = sample_tasks['author']
+    tasks = sample_tasks['tasks'][:2]
+    form = TaskBulkActionForm(
+        {'tasks': [task.pk for task in tasks], 'action': 'delete'})
+    assert form.is_valid()
+    assert not form.selected_tasks.exclude(author=author).exists()
+
+    Task.objects.filter(pk=tasks[1].pk).update(
+        author=sample_tasks['executors'][0])
+
+    assert form.save(author) == 1
+    assert set(Task.objects.all()) == set(sample_tasks['tasks'][1:])
+
+
+@pytest.mark.django_db
+def test_bulk_action_returns_to_filtered_list(
+        authenticated_client, sample_tasks):
+    next_url = reverse('tasks:list') + '?self_tasks=on'
+    response = post_bulk_action(
+        authenticated_client, sample_tasks['tasks'][:1], 'set_status',
+        status=sample_tasks['statuses'][1].pk, next=next_url)
+    assert response.redirect_chain[-1][0] == next_url
+
+    response = post_bulk_action(
+        authenticated_client, sample_tasks['tasks'][:1], 'set_status',
+        status=sample_tasks['statuses'][1].pk, next='https://evil.example/')
+    assert response.redirect_chain[-1][0] == reverse('tasks:list')
+
+
+# ----- Query budgets -------------------------------------------------
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, max_queries', [
+    ('tasks:list', 5),
+    ('tasks:create', 2),
+    ('tasks:detail', 5),
+    # Selected executor and labels are loaded for the autocomplete widgets
+    ('tasks:update', 6),
+    ('tasks:delete', 4),
+])
+def test_task_views_query_budget(
+        authenticated_client, task_data, settings, url_name, max_queries):
+    # Budgets of a deployment with a shared cache
+    settings.CACHE_SHARED = True
+    task = Task.objects.create(
+        **task_data | {'author': authenticated_client.user})
+    task.labels.add(build_label())
+    url = reverse(url_name, args=[] if url_name.endswith(
+        ('list', 'create')) else [task.pk])
+    authenticated_client.get(url)  # warm up the cached choices
+
+    with query_budget(max_queries):
+        response = authenticated_client.get(url)
+
+    assert response.status_code == 200
@@ -1,13 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
 app_name = 'tasks'
 
+if settings.ASYNC_VIEWS:
+    list_view, detail_view = views.AsyncTaskListView, views.AsyncTaskDetailView
+else:
+    list_view, detail_view = views.TaskListView, views.TaskDetailView
+
 urlpatterns = [
-    path('', views.TaskListView.as_view(), name='list'),
+    path('', list_view.as_view(), name='list'),
     path('create/', views.TaskCreateView.as_view(), name='create'),
-    path('<int:pk>/', views.TaskDetailView.as_view(), name='detail'),
+    path('bulk/', views.TaskBulkActionView.as_view(), name='bulk'),
+    path('export.csv',
+         views.TaskExportView.as_view(export_format='csv'),
+         name='export_csv'),
+    path('export.ndjson',
+         views.TaskExportView.as_view(export_format='ndjson'),
+         name='export_ndjson'),
+    path('<int:pk>/', detail_view.as_view(), name='detail'),
     path('<int:pk>/update/', views.TaskUpdateView.as_view(), name='update'),
     path('<int:pk>/delete/', views.TaskDeleteView.as_view(), name='delete'),
 ]
@@ -1,28 +1,40 @@
 import logging
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import redirect
+from django.http import StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.utils.translation import gettext_lazy as _
+from django.views import View
 from django.views.generic import CreateView, DeleteView, DetailView, UpdateView
-from django_filters.views import FilterView
+from django_filters.views import FilterMixin, FilterView
 
-from task_manager.mixins import StrictLoginRequiredMessageMixin
-from task_manager.utils.request import format_ip_log
+from task_manager.labels.models import Label
+from task_manager.mixins import (
+    AsyncViewMixin,
+    ConditionalGetMixin,
+    StrictLoginRequiredMessageMixin,
+)
+from task_manager.statuses.models import Status
+from task_manager.users.models import CustomUser
+from task_manager.utils.log import log_context
 
+from . import fragments
+from .export import FORMATS
 from .filters import TaskFilter
-from .forms import TaskForm
+from .forms import TaskBulkActionForm, TaskForm
 from .models import Task
+from .pagination import KeysetPaginator
+from .search import RANK
 
 logger = logging.getLogger(__name__)
 
 
-class TaskListView(StrictLoginRequiredMessageMixin, FilterView):
-    model = Task
+class TaskFilterMixin(FilterMixin):
     filterset_class = TaskFilter
-    template_name = 'tasks/list.html'
-    context_object_name = 'tasks'
 
     def get_filterset(self, filterset_class):
         return filterset_class(
@@ -32,11 +44,150 @@ class TaskListView(StrictLoginRequiredMessageMixin, FilterView):
         )
 
 
-class TaskDetailView(LoginRequiredMixin, DetailView):
+# Task pages show status and user names, and the filter lists labels
+TASK_PAGE_MODELS = (Task, Status, Label, CustomUser)
+
+
+class TaskListView(StrictLoginRequiredMessageMixin, ConditionalGetMixin,
+                   TaskFilterMixin, FilterView):
     model = Task
+    conditional_models = TASK_PAGE_MODELS
+    template_name = 'tasks/list.html'
+    context_object_name = 'tasks'
+    paginate_by = 50
+    page_kwarg = 'cursor'
+
+    def get_queryset(self):
+        return Task.objects.for_listing()
+
+    def get_keyset_paginator(self, queryset):
+        keys = ('created_at', 'id')
+        if self.filterset.search_query:
+            keys = (RANK, *keys)
+        return KeysetPaginator(queryset, self.paginate_by, keys=keys)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_keyset_paginator(queryset)
+        page = paginator.page(self.request.GET.get(self.page_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['bulk_form'] = TaskBulkActionForm(
+            initial={'next': self.request.get_full_path()})
+        if 'task_rows' not in context:
+            # Search snippets depend on the query, so those rows aren't
+            # cached
+            context['task_rows'] = fragments.render_rows(
+                context['tasks'], use_cache=not self.filterset.search_query)
+        return context
+
+
+class AsyncTaskListView(AsyncViewMixin, TaskListView):
+    async def get(self, request, *args, **kwargs):
+        self.filterset = self.get_filterset(self.get_filterset_class())
+        # django-filter validates the choice fields with sync queries
+        is_valid = await sync_to_async(self.filterset.is_valid)()
+        if not self.filterset.is_bound or is_valid or not self.get_strict():
+            self.object_list = self.filterset.qs
+        else:
+            self.object_list = self.filterset.queryset.none()
+
+        self.paginator = self.get_keyset_paginator(self.object_list)
+        self.page = await self.paginator.apage(
+            request.GET.get(self.page_kwarg))
+        task_rows = await fragments.arender_rows(
+            self.page.object_list, use_cache=not self.filterset.search_query)
+        context = self.get_context_data(
+            filter=self.filterset, object_list=self.object_list,
+            task_rows=task_rows)
+        return self.render_to_response(context)
+
+    def paginate_queryset(self, queryset, page_size):
+        # Fetched by get() already
+        page = self.page
+        return self.paginator, page, page.object_list, page.has_other_pages()
+
+
+class TaskBulkActionView(StrictLoginRequiredMessageMixin, View):
+    success_url = reverse_lazy('tasks:list')
+
+    def post(self, request, *args, **kwargs):
+        form = TaskBulkActionForm(request.POST)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return redirect(self.get_success_url(form))
+
+        action = form.cleaned_data['action']
+        if action == TaskBulkActionForm.DELETE and \
+                form.selected_tasks.exclude(author=request.user).exists():
+            messages.error(request, _('Only the author can delete the task.'))
+            logger.warning(
+                '🚫 Attempt to bulk delete tasks with foreign authorization',
+                extra=log_context(request, 'tasks_bulk_delete_denied'))
+            return redirect(self.get_success_url(form))
+
+        count = form.save(request.user)
+        if action == TaskBulkActionForm.DELETE:
+            message = _('Tasks deleted: %(count)d')
+        else:
+            message = _('Tasks updated: %(count)d')
+        messages.success(request, message % {'count': count})
+        logger.info('📦 Bulk action %s applied to %d tasks', action, count,
+                    extra=log_context(request, 'tasks_bulk_action'))
+        return redirect(self.get_success_url(form))
+
+    def get_success_url(self, form):
+        next_url = form.data.get('next')
+        if next_url and url_has_allowed_host_and_scheme(
+                next_url, allowed_hosts={self.request.get_host()},
+                require_https=self.request.is_secure()):
+            return next_url
+        return self.success_url
+
+
+class TaskExportView(StrictLoginRequiredMessageMixin, TaskFilterMixin, View):
+    export_format = 'csv'
+
+    def get_queryset(self):
+        return Task.objects.for_export()
+
+    def get(self, request, *args, **kwargs):
+        filterset = self.get_filterset(self.get_filterset_class())
+        if filterset.is_valid() or not self.get_strict():
+            queryset = filterset.qs
+        else:
+            queryset = filterset.queryset.none()
+
+        stream, content_type = FORMATS[self.export_format]
+        response = StreamingHttpResponse(
+            stream(queryset), content_type=content_type)
+        response['Content-Disposition'] = \
+            f'attachment; filename="tasks.{self.export_format}"'
+        logger.info('📤 Tasks exported as %s', self.export_format,
+                    extra=log_context(request, 'tasks_exported'))
+        return response
+
+
+class TaskDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
+    model = Task
+    conditional_models = TASK_PAGE_MODELS
     template_name = 'tasks/show.html'
     context_object_name = 'task'
 
+    def get_queryset(self):
+        return Task.objects.with_related()
+
+
+class AsyncTaskDetailView(AsyncViewMixin, TaskDetailView):
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_object_or_404(
+            self.get_queryset(), pk=self.kwargs[self.pk_url_kwarg])
+        return self.render_to_response(
+            self.get_context_data(object=self.object))
+
 
 class TaskCreateView(LoginRequiredMixin, CreateView):
     model = Task
@@ -49,8 +200,8 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
         response = super().form_valid(form)
         task = form.instance
         messages.success(self.request, _('Task successfully created'))
-        logger.info(f'✅ New task created: {task} '
-                    f'{format_ip_log(self.request)}')
+        logger.info('✅ New task created: %s', task,
+                    extra=log_context(self.request, 'task_created', task.pk))
         return response
 
 
@@ -60,12 +211,15 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'tasks/update.html'
     success_url = reverse_lazy('tasks:list')
 
+    def get_queryset(self):
+        return Task.objects.with_related()
+
     def form_valid(self, form):
         response = super().form_valid(form)
         task = form.instance
         messages.success(self.request, _('Task successfully updated'))
-        logger.info(f'✏️ Task updated: {task} '
-                    f'{format_ip_log(self.request)}')
+        logger.info('✏️ Task updated: %s', task,
+                    extra=log_context(self.request, 'task_updated', task.pk))
         return response
 
 
@@ -75,6 +229,9 @@ class TaskDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy('tasks:list')
     context_object_name = 'task'
 
+    def get_queryset(self):
+        return Task.objects.with_related()
+
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
             return self.handle_no_permission()
@@ -82,14 +239,23 @@ class TaskDeleteView(LoginRequiredMixin, DeleteView):
         self.object = self.get_object()
         if self.object.author != request.user:
             messages.error(request, _('Only the author can delete the task.'))
-            message = (f'🚫 Attempt to delete task {self.object} '
-                       f'with foreign authorization {format_ip_log(request)}')
-            logger.warning(message)
+            logger.warning(
+                '🚫 Attempt to delete task %s with foreign authorization',
+                self.object,
+                extra=log_context(request, 'task_delete_denied',
+                                  self.object.pk))
             return redirect(self.success_url)
 
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        # Already loaded by dispatch() for the author check
+        if getattr(self, 'object', None) is not None:
+            return self.object
+        return super().get_object(queryset)
+
     def post(self, request, *args, **kwargs):
-        logger.info(f'🗑️ Task deleted: {self.object} {format_ip_log(request)}')
+        logger.info('🗑️ Task deleted: %s', self.object,
+                    extra=log_context(request, 'task_deleted', self.object.pk))
         messages.success(request, _('Task successfully deleted'))
         return super().post(request, *args, **kwargs)
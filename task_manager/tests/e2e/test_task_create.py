@@ -34,6 +34,15 @@ def test_create_task(page, base_url):
     page.select_option(
         'text="Статус"', label=DATA["tasks"]["first"]["status"]
     )
+    # Executors are fetched from the autocomplete endpoint while typing
+    page.fill(
+        '[data-autocomplete-for="id_executor"]',
+        DATA["tasks"]["first"]["executor"].split()[0],
+    )
+    page.wait_for_selector(
+        f'#id_executor option:text("{DATA["tasks"]["first"]["executor"]}")',
+        state='attached',
+    )
     page.select_option(
         'text="Исполнитель"', label=DATA["tasks"]["first"]["executor"]
     )
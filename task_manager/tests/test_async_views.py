@@ -0,0 +1,149 @@
+import importlib
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, Client
+from django.urls import clear_url_caches, resolve, reverse
+
+from task_manager.tasks.views import AsyncTaskListView
+from task_manager.tests.builders import (
+    build_label,
+    build_status,
+    build_task,
+    build_user,
+)
+
+URL_MODULES = (
+    'task_manager.statuses.urls',
+    'task_manager.labels.urls',
+    'task_manager.users.urls',
+    'task_manager.tasks.urls',
+    'task_manager.urls',
+)
+
+
+def reload_urls():
+    for module in URL_MODULES:
+        importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    reload_urls()
+
+
+@pytest.fixture
+def tasks(authenticated_client):
+    user = authenticated_client.user
+    status = build_status('Open')
+    label = build_label('bug')
+    return [
+        build_task(name=f'Task {i}', status=status, author=user,
+                   executor=build_user(f'executor{i}'), labels=[label])
+        for i in range(3)
+    ]
+
+
+def page_urls(task):
+    return [
+        reverse('tasks:list'),
+        reverse('tasks:detail', args=[task.pk]),
+        reverse('statuses:list'),
+        reverse('labels:list'),
+        reverse('users:list'),
+    ]
+
+
+@pytest.mark.django_db
+def test_async_views_render_like_sync_views(
+        authenticated_client, tasks, async_views):
+    for url in page_urls(tasks[0]):
+        assert iscoroutinefunction(resolve(url).func)
+        response = authenticated_client.get(url)
+        assert response.status_code == 200
+
+    content = authenticated_client.get(reverse('tasks:list')).content.decode()
+    assert all(task.name in content for task in tasks)
+    detail = authenticated_client.get(
+        reverse('tasks:detail', args=[tasks[0].pk])).content.decode()
+    assert 'bug' in detail
+    users = authenticated_client.get(reverse('users:list')).content.decode()
+    assert 'executor2' in users
+
+
+@pytest.mark.django_db
+def test_async_task_list_filters(authenticated_client, tasks, async_views):
+    url = reverse('tasks:list')
+    response = authenticated_client.get(
+        url, {'executor': tasks[1].executor_id})
+    assert [task.name for task in response.context['tasks']] == ['Task 1']
+
+    response = authenticated_client.get(url, {'q': 'Task'})
+    assert len(response.context['tasks']) == 3
+
+    response = authenticated_client.get(url, {'cursor': 'forged'})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_task_list_pages(authenticated_client, tasks, async_views,
+                               monkeypatch):
+    monkeypatch.setattr(AsyncTaskListView, 'paginate_by', 2)
+    url = reverse('tasks:list')
+    first = authenticated_client.get(url)
+    second = authenticated_client.get(
+        url, {'cursor': first.context['page_obj'].next_cursor})
+
+    names = [task.name for task in first.context['tasks']] + \
+        [task.name for task in second.context['tasks']]
+    assert names == ['Task 2', 'Task 1', 'Task 0']
+
+
+@pytest.mark.django_db
+def test_async_views_check_login_and_objects(tasks, async_views):
+    client = Client()
+    response = client.get(reverse('tasks:list'))
+    assert response.status_code == 302
+
+    client.force_login(tasks[0].author)
+    response = client.get(reverse('tasks:detail', args=[0]))
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_views_answer_not_modified(
+        authenticated_client, tasks, async_views):
+    for url in page_urls(tasks[0]):
+        response = authenticated_client.get(url)
+        cached = authenticated_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == 304
+
+
+@pytest.mark.django_db
+def test_async_views_under_asgi_handler(tasks, async_views):
+    client = AsyncClient()
+    client.force_login(tasks[0].author)
+
+    for url in page_urls(tasks[0]):
+        response = async_to_sync(client.get)(url)
+        assert response.status_code == 200
+
+
+def test_middleware_runs_async_under_asgi(settings, tmp_path, caplog):
+    settings.TRACING = {**settings.TRACING,
+                        'EXPORT': str(tmp_path / 'traces.jsonl')}
+    settings.PROFILING = {**settings.PROFILING, 'DIR': str(tmp_path)}
+
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        ASGIHandler()
+
+    # Sync-only middleware would run the whole chain in a thread
+    assert 'adapted' not in caplog.text
@@ -0,0 +1,112 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from task_manager.autocomplete import prefix_filter
+from task_manager.labels.views import LabelAutocompleteView
+from task_manager.tasks.forms import TaskForm
+from task_manager.tasks.tests.test_indexes import FULL_SCAN_PATTERNS
+from task_manager.tests.builders import build_label, build_status, build_user
+from task_manager.users.models import CustomUser
+from task_manager.users.views import UserAutocompleteView
+
+
+def results(response):
+    assert response.status_code == 200
+    return [item['text'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+def test_user_autocomplete_matches_name_prefixes(authenticated_client):
+    build_user('anna', 'Anna', 'Petrova')
+    build_user('boris', 'Boris', 'Annenkov')
+    build_user('clara', 'Clara', 'Joanna')
+    url = reverse('users:autocomplete')
+
+    assert results(authenticated_client.get(url, {'q': 'ANN'})) == [
+        'Anna Petrova', 'Boris Annenkov']
+    assert results(authenticated_client.get(url, {'q': 'cla'})) == [
+        'Clara Joanna']
+    assert results(authenticated_client.get(url, {'q': 'anna p'})) == [
+        'Anna Petrova']
+    assert results(authenticated_client.get(url, {'q': 'x'})) == []
+
+    item = authenticated_client.get(url, {'q': 'anna'}).json()['results'][0]
+    assert item['id'] == CustomUser.objects.get(username='anna').pk
+
+
+@pytest.mark.django_db
+def test_label_autocomplete_limits_results(authenticated_client, monkeypatch):
+    for name in ('bug', 'backend', 'build', 'api'):
+        build_label(name)
+    monkeypatch.setattr(LabelAutocompleteView, 'limit', 2)
+    url = reverse('labels:autocomplete')
+
+    assert results(authenticated_client.get(url, {'q': 'b'})) == [
+        'backend', 'bug']
+    assert results(authenticated_client.get(url)) == ['api', 'backend']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['users:autocomplete',
+                                      'labels:autocomplete'])
+def test_autocomplete_requires_login(url_name):
+    assert Client().get(reverse(url_name)).status_code == 403
+
+
+@pytest.mark.django_db
+def test_task_form_renders_only_selected_options():
+    users = [build_user(f'user{i}', 'User', str(i)) for i in range(3)]
+    labels = [build_label(f'label{i}') for i in range(3)]
+
+    form = TaskForm(initial={'executor': users[1].pk,
+                             'labels': [labels[0].pk, labels[2].pk]})
+    executor, labels_html = str(form['executor']), str(form['labels'])
+
+    assert 'User 1' in executor
+    assert 'User 0' not in executor and 'User 2' not in executor
+    assert reverse('users:autocomplete') in executor
+    assert 'label0' in labels_html and 'label2' in labels_html
+    assert 'label1' not in labels_html
+    assert 'User' not in str(TaskForm()['executor'])
+
+
+@pytest.mark.django_db
+def test_task_form_validates_submitted_ids(
+        django_assert_max_num_queries):
+    status = build_status()
+    user = build_user()
+    label = build_label()
+    for i in range(20):
+        build_user(f'user{i}')
+        build_label(f'label{i}')
+
+    data = {'name': 'Task', 'status': status.pk, 'executor': user.pk,
+            'labels': [label.pk]}
+    # Submitted ids are looked up one field at a time, plus the model's
+    # foreign key and unique name checks, whatever the table sizes
+    with django_assert_max_num_queries(6):
+        assert TaskForm(data).is_valid()
+
+    form = TaskForm(data | {'executor': 0, 'labels': ['nan']})
+    assert not form.is_valid()
+    assert set(form.errors) == {'executor', 'labels'}
+    assert 'nan' not in str(form['labels'])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('view', [UserAutocompleteView, LabelAutocompleteView])
+def test_autocomplete_search_uses_prefix_indexes(view):
+    pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        pytest.skip(f'No plan checks for {connection.vendor}')
+
+    queryset = view.model._default_manager.filter(
+        prefix_filter(view.search_fields, 'ab'))
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    plan = queryset.explain()
+
+    assert not pattern.findall(plan), plan
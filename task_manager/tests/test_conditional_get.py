@@ -0,0 +1,127 @@
+import pytest
+from django.contrib.messages import constants, get_messages
+from django.urls import reverse
+
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.tests.builders import build_label, build_task, build_user
+from task_manager.tests.utils import query_budget
+
+
+@pytest.fixture
+def task(authenticated_client):
+    user = authenticated_client.user
+    return build_task(author=user, executor=user, labels=[build_label()])
+
+
+def revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', [
+    'tasks:list', 'tasks:detail', 'statuses:list', 'labels:list',
+    'users:list',
+])
+def test_unchanged_pages_answer_not_modified(
+        authenticated_client, task, url_name):
+    args = [task.pk] if url_name == 'tasks:detail' else []
+    url = reverse(url_name, args=args)
+    response = authenticated_client.get(url)
+    assert response.has_header('Last-Modified')
+    assert 'private' in response['Cache-Control']
+
+    # Session, user and table versions; no rows and no templates
+    with query_budget(3):
+        cached = revalidate(authenticated_client, url, response)
+
+    assert cached.status_code == 304
+    assert cached['ETag'] == response['ETag']
+    assert not cached.templates
+
+
+@pytest.mark.django_db
+def test_if_modified_since_is_honoured(authenticated_client, task):
+    url = reverse('statuses:list')
+    response = authenticated_client.get(url)
+
+    cached = authenticated_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+    assert cached.status_code == 304
+
+
+@pytest.mark.django_db
+def test_task_changes_refresh_task_pages(authenticated_client, task):
+    list_url = reverse('tasks:list')
+    detail_url = reverse('tasks:detail', args=[task.pk])
+    pages = {url: authenticated_client.get(url)
+             for url in (list_url, detail_url)}
+
+    task.labels.add(build_label('other'))
+    for url, response in pages.items():
+        assert revalidate(authenticated_client, url, response).status_code \
+            == 200
+
+    pages = {url: authenticated_client.get(url)
+             for url in (list_url, detail_url)}
+    Status.objects.filter(pk=task.status_id).get().save()
+    for url, response in pages.items():
+        assert revalidate(authenticated_client, url, response).status_code \
+            == 200
+
+
+@pytest.mark.django_db
+def test_queryset_writes_refresh_pages(authenticated_client, task):
+    tasks_url = reverse('tasks:list')
+    statuses_url = reverse('statuses:list')
+    tasks_page = authenticated_client.get(tasks_url)
+    statuses_page = authenticated_client.get(statuses_url)
+
+    Task.objects.filter(pk=task.pk).update(description='Changed')
+    assert revalidate(
+        authenticated_client, tasks_url, tasks_page).status_code == 200
+    # The status list shows task counters, which have not changed
+    assert revalidate(
+        authenticated_client, statuses_url, statuses_page).status_code == 304
+
+    Task.objects.filter(pk=task.pk).delete()
+    assert revalidate(
+        authenticated_client, statuses_url, statuses_page).status_code == 200
+
+
+@pytest.mark.django_db
+def test_updated_at_tracks_changes(task):
+    created = task.updated_at
+    task.name = 'Renamed'
+    task.save()
+    assert task.updated_at > created
+
+    Task.objects.filter(pk=task.pk).update(name='Renamed again')
+    task.refresh_from_db()
+    assert task.updated_at > created
+
+
+@pytest.mark.django_db
+def test_etag_differs_between_users(authenticated_client, client, task):
+    url = reverse('users:list')
+    response = authenticated_client.get(url)
+    client.force_login(build_user('other'))
+
+    assert revalidate(client, url, response).status_code == 200
+
+
+@pytest.mark.django_db
+def test_pending_messages_are_rendered(authenticated_client, task):
+    url = reverse('labels:list')
+    response = authenticated_client.get(url)
+    # A refused delete redirects back without changing anything
+    authenticated_client.post(
+        reverse('labels:delete', args=[task.labels.get().pk]))
+
+    shown = revalidate(authenticated_client, url, response)
+
+    assert shown.status_code == 200
+    assert not shown.has_header('ETag')
+    assert [message.level for message in get_messages(shown.wsgi_request)] \
+        == [constants.ERROR]
@@ -0,0 +1,253 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from task_manager.env_config import _build_log_output_config
+from task_manager.utils.log import (
+    DedupFilter,
+    JSONFormatter,
+    QueueLogHandler,
+    TextFormatter,
+    log_context,
+)
+
+
+class BlockingStream(io.StringIO):
+    """Stream whose writes wait until ``release`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(timeout=5)
+        return super().write(text)
+
+
+@pytest.fixture
+def make_logger():
+    loggers = []
+
+    def make(handler):
+        logger = logging.getLogger(f'task_manager.tests.log{len(loggers)}')
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        loggers.append(logger)
+        return logger
+
+    yield make
+    for logger in loggers:
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers = []
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_records_carry_the_request_context():
+    request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='10.0.0.1')
+    request.user = type('User', (), {'pk': 7})()
+    record = logging.makeLogRecord({
+        'name': 'task_manager.tasks', 'levelname': 'INFO',
+        'msg': 'Task %s created', 'args': ('Fix',),
+        **log_context(request, 'task_created', 42),
+    })
+
+    data = json.loads(JSONFormatter().format(record))
+
+    assert data['message'] == 'Task Fix created'
+    assert {key: data[key] for key in ('event', 'user_id', 'ip', 'path',
+                                       'object_id', 'level', 'logger')} == {
+        'event': 'task_created', 'user_id': 7, 'ip': '10.0.0.1', 'path': '/',
+        'object_id': 42, 'level': 'INFO', 'logger': 'task_manager.tasks',
+    }
+
+
+def test_text_lines_end_with_the_client_ip():
+    formatter = TextFormatter('{levelname}: {message}', style='{')
+    request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.2')
+    record = logging.makeLogRecord({
+        'levelname': 'INFO', 'msg': 'Task %s created', 'args': ('Fix',),
+        **log_context(request, 'task_created', 42),
+    })
+    plain = logging.makeLogRecord({'levelname': 'INFO', 'msg': 'Started'})
+
+    assert formatter.format(record) == 'INFO: Task Fix created from IP=10.0.0.2'
+    assert formatter.format(plain) == 'INFO: Started'
+
+
+def test_disabled_debug_calls_skip_the_context(client, caplog, monkeypatch):
+    calls = []
+    monkeypatch.setattr('task_manager.views.log_context',
+                        lambda *args: calls.append(args) or {})
+
+    with caplog.at_level(logging.INFO, logger='task_manager'):
+        client.get(reverse('index'))
+    assert calls == []
+
+    with caplog.at_level(logging.DEBUG, logger='task_manager'):
+        client.get(reverse('index'))
+    assert len(calls) == 1
+
+
+def test_queue_handler_writes_from_a_background_thread(make_logger):
+    stream = io.StringIO()
+    handler = QueueLogHandler(stream=stream)
+    handler.setFormatter(JSONFormatter())
+    logger = make_logger(handler)
+    item = ['mutable']
+
+    logger.info('Got %s', item, extra={'event': 'test'})
+    item.append('changed')
+    handler.close()
+
+    [record] = lines(stream)
+    assert record['message'] == "Got ['mutable']"
+    assert record['event'] == 'test'
+
+
+def wait_until_taken(handler):
+    """Wait for the listener to take the queued records."""
+    for _attempt in range(500):
+        if handler.queue.empty():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError('Listener is stuck')
+
+
+def test_full_queue_drops_records_without_blocking(make_logger):
+    stream = BlockingStream()
+    handler = QueueLogHandler(maxsize=2, stream=stream)
+    handler.setFormatter(JSONFormatter())
+    logger = make_logger(handler)
+
+    logger.info('Record 0')
+    wait_until_taken(handler)  # and blocked writing it
+    for number in range(1, 10):
+        logger.info('Record %d', number)
+    assert handler.dropped == 7
+
+    stream.release.set()
+    wait_until_taken(handler)
+    logger.info('Record 10')
+    handler.close()
+
+    assert [record['message'] for record in lines(stream)] == [
+        'Record 0', 'Record 1', 'Record 2',
+        'Dropped 7 log records, queue full', 'Record 10',
+    ]
+    assert lines(stream)[3]['event'] == 'log_records_dropped'
+
+
+def warning(created, ip='10.0.0.1', path='/tasks/', level=logging.WARNING):
+    return logging.makeLogRecord({
+        'name': 'task_manager.mixins', 'levelno': level,
+        'msg': 'Unauthorized access attempt from %s', 'args': (ip,),
+        'created': created, 'event': 'login_required', 'ip': ip,
+        'path': path,
+    })
+
+
+def passed(dedup, records):
+    return [record for record in records if dedup.filter(record)]
+
+
+def test_dedup_collapses_repeats_into_periodic_summaries():
+    summaries = []
+    dedup = DedupFilter(window=60, emit=summaries.append)
+
+    records = passed(dedup, [warning(second) for second in range(0, 150, 5)])
+
+    assert [record.created for record in records] == [0, 60, 120]
+    assert [record.repeated for record in summaries] == [11, 11]
+    assert summaries[0].getMessage() == (
+        'Unauthorized access attempt from 10.0.0.1 '
+        '(repeated 11 more times in 55s)')
+    assert summaries[0].ip == '10.0.0.1'
+
+    # The last window, when the scan stopped
+    dedup.flush()
+    assert [record.repeated for record in summaries] == [11, 11, 5]
+
+
+def test_dedup_summaries_follow_ended_windows_of_other_keys():
+    summaries = []
+    dedup = DedupFilter(window=60, emit=summaries.append)
+
+    passed(dedup, [warning(0), warning(1), warning(61, ip='10.0.0.2')])
+
+    assert [(record.ip, record.repeated) for record in summaries] == [
+        ('10.0.0.1', 1)]
+
+
+def test_dedup_keys_on_client_and_path():
+    dedup = DedupFilter(window=60)
+
+    records = passed(dedup, [
+        warning(0), warning(1, ip='10.0.0.2'), warning(2, path='/labels/'),
+        warning(3), warning(4, level=logging.INFO),
+        logging.makeLogRecord({'levelno': logging.WARNING, 'msg': 'No ip'}),
+        logging.makeLogRecord({'levelno': logging.WARNING, 'msg': 'No ip'}),
+    ])
+
+    assert len(records) == 6
+
+
+def test_dedup_memory_is_bounded():
+    summaries = []
+    dedup = DedupFilter(window=60, max_keys=3, emit=summaries.append)
+
+    records = passed(dedup, [warning(0), warning(1)] + [
+        warning(second, ip=f'10.0.0.{second}') for second in range(2, 10)
+    ] + [warning(10)])
+
+    assert len(dedup._seen) == 3
+    # The first key was evicted with its count, so it logs again within
+    # its window
+    assert [record.repeated for record in summaries] == [1]
+    assert len(records) == 10
+
+
+@pytest.mark.django_db
+def test_dedup_limits_log_volume_of_a_scan(client, monkeypatch):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    dedup = DedupFilter()
+    handler.addFilter(dedup)
+    monkeypatch.setattr(logging.getLogger('task_manager.mixins'),
+                        'handlers', [handler])
+
+    for _attempt in range(20):
+        assert client.get(reverse('tasks:list')).status_code == 302
+    assert len(stream.getvalue().splitlines()) == 1
+
+    dedup.flush()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert '(repeated 19 more times in ' in lines[1]
+
+
+@pytest.mark.parametrize('env, expected', [
+    ({}, {'FORMAT': 'text', 'QUEUE': False, 'QUEUE_SIZE': 10000,
+          'DEDUP_WINDOW': 60, 'DEDUP_KEYS': 1024}),
+    ({'LOG_FORMAT': 'json', 'LOG_QUEUE': 'True', 'LOG_QUEUE_SIZE': '500',
+      'LOG_DEDUP_WINDOW': '0', 'LOG_DEDUP_KEYS': '10'},
+     {'FORMAT': 'json', 'QUEUE': True, 'QUEUE_SIZE': 500,
+      'DEDUP_WINDOW': 0, 'DEDUP_KEYS': 10}),
+])
+def test_log_output_from_env(monkeypatch, env, expected):
+    for name in ('LOG_FORMAT', 'LOG_QUEUE', 'LOG_QUEUE_SIZE',
+                 'LOG_DEDUP_WINDOW', 'LOG_DEDUP_KEYS'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    assert _build_log_output_config() == expected
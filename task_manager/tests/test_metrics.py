@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, Client
+from django.urls import reverse
+
+from task_manager import metrics
+from task_manager.middleware import MetricsMiddleware
+from task_manager.tests.builders import build_task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics._samples.reset()
+    yield
+    metrics._samples.reset()
+
+
+def scrape(client=None, **headers):
+    response = (client or Client()).get(reverse('metrics'), headers=headers)
+    assert response.status_code == 200
+    assert response['Content-Type'] == metrics.CONTENT_TYPE
+    return response.content.decode().splitlines()
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram('test_seconds', 'Test.', ('view',),
+                                  (0.1, 1))
+    for amount in (0.05, 0.1, 0.5, 3):
+        histogram.observe(amount, 'a "b"')
+
+    assert metrics.render([histogram]).splitlines() == [
+        '# HELP test_seconds Test.',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{view="a \\"b\\"",le="0.1"} 2',
+        'test_seconds_bucket{view="a \\"b\\"",le="1.0"} 3',
+        'test_seconds_bucket{view="a \\"b\\"",le="+Inf"} 4',
+        'test_seconds_sum{view="a \\"b\\""} 3.65',
+        'test_seconds_count{view="a \\"b\\""} 4',
+    ]
+
+
+def test_counts_from_all_threads_add_up():
+    counter = metrics.Counter('test_total', 'Test.')
+    threads = [threading.Thread(target=lambda: [counter.inc()
+                                                for _ in range(1000)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.render([counter]).splitlines()[-1] == 'test_total 4000'
+
+
+def test_requests_are_measured(authenticated_client, settings):
+    settings.CACHE_SHARED = True
+    build_task()
+    url = reverse('tasks:list')
+    authenticated_client.get(url)
+    authenticated_client.get(url)
+
+    lines = scrape()
+
+    assert 'http_requests_total{view="tasks:list",method="GET",status="200"}'\
+           ' 2' in lines
+    assert 'http_request_duration_seconds_count{view="tasks:list",'\
+           'method="GET"} 2' in lines
+    assert 'http_response_size_bytes_count{view="tasks:list"} 2' in lines
+    assert 'db_queries_per_request_bucket{view="tasks:list",le="0.0"} 0' \
+           in lines
+    assert 'db_query_duration_seconds_count{view="tasks:list"} 2' in lines
+    assert 'cache_hit_ratio{cache="task_rows"} 0.5' in lines
+    # The scrape itself is still in flight
+    assert 'http_requests_in_flight 1' in lines
+
+
+def test_async_requests_are_measured():
+    async def view(request):
+        return HttpResponse(b'async')
+
+    middleware = MetricsMiddleware(view)
+    assert iscoroutinefunction(middleware)
+    async_to_sync(middleware)(AsyncRequestFactory().get('/'))
+
+    lines = metrics.render().splitlines()
+    assert 'http_requests_total{view="unmatched",method="GET",status="200"}'\
+           ' 1' in lines
+    assert 'http_requests_in_flight 0' in lines
+
+
+def test_unknown_urls_share_one_series():
+    Client().get('/no/such/page/')
+    Client().get('/nor/this/')
+
+    assert 'http_requests_total{view="unmatched",method="GET",status="404"}'\
+           ' 2' in scrape()
+
+
+def test_metrics_token(settings):
+    settings.METRICS = {'DIR': '', 'TOKEN': 'secret'}
+
+    assert Client().get(reverse('metrics')).status_code == 403
+    assert scrape(Authorization='Bearer secret')
+
+
+def test_scrape_adds_up_worker_processes(settings, tmp_path):
+    settings.METRICS = {'DIR': str(tmp_path), 'TOKEN': ''}
+    samples = [['http_requests_in_flight', '', [], 1],
+               ['http_requests_total', '', ['metrics', 'GET', '200'], 1]]
+    finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+    finished.wait()
+    # A running and an exited worker
+    for pid in (os.getppid(), finished.pid):
+        (tmp_path / f'{pid}.json').write_text(json.dumps(samples))
+
+    lines = scrape()
+
+    assert 'http_requests_total{view="metrics",method="GET",status="200"} 2'\
+           in lines
+    # Exited workers no longer have requests in flight
+    assert 'http_requests_in_flight 2' in lines
+
+
+def test_worker_writes_its_totals(tmp_path):
+    metrics.REQUESTS.inc('tasks:list', 'GET', 200)
+
+    metrics.write_samples(tmp_path)
+
+    assert json.loads((tmp_path / f'{os.getpid()}.json').read_text()) == [
+        ['http_requests_total', '', ['tasks:list', 'GET', '200'], 1]]
@@ -0,0 +1,89 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory
+from django.urls import reverse
+
+from task_manager.middleware import QueryBudgetMiddleware, count_queries
+from task_manager.statuses.models import Status
+
+
+def run_middleware(queries=0, response=None):
+    def view(request):
+        for _ in range(queries):
+            Status.objects.exists()
+        return response or HttpResponse()
+
+    request = RequestFactory().get('/some/path/')
+    return QueryBudgetMiddleware(view)(request)
+
+
+@pytest.mark.django_db
+def test_count_queries():
+    with count_queries() as counter, \
+            count_queries(collect_sql=True) as collector:
+        Status.objects.exists()
+        Status.objects.count()
+
+    assert counter.count == collector.count == 2
+    assert counter.duration > 0
+    # Only kept when asked for
+    assert counter.queries == []
+    assert len(collector.queries) == len(collector.durations) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_requests_count_queries_of_their_threads(settings):
+    settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'HEADERS': True}
+
+    async def view(request):
+        await Status.objects.aexists()
+        await Status.objects.acount()
+        return HttpResponse()
+
+    middleware = QueryBudgetMiddleware(view)
+    assert iscoroutinefunction(middleware)
+    response = async_to_sync(middleware)(AsyncRequestFactory().get('/'))
+
+    assert response['X-DB-Queries'] == '2'
+
+
+@pytest.mark.django_db
+def test_query_headers_are_opt_in(settings):
+    settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'HEADERS': False}
+    assert not run_middleware(queries=1).has_header('X-DB-Queries')
+
+    settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'HEADERS': True}
+    existing = HttpResponse(headers={'Server-Timing': 'app;dur=1'})
+    response = run_middleware(queries=3, response=existing)
+
+    assert response['X-DB-Queries'] == '3'
+    assert response['Server-Timing'].startswith('app;dur=1, db;dur=')
+    assert response['Server-Timing'].endswith('desc="3 queries"')
+
+
+@pytest.mark.django_db
+def test_requests_over_budget_are_logged(settings, caplog):
+    settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'MAX_QUERIES': 2,
+                             'MAX_DURATION_MS': 10_000}
+
+    run_middleware(queries=2)
+    assert caplog.records == []
+
+    run_middleware(queries=3)
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    assert '/some/path/: 3 queries' in record.getMessage()
+
+
+@pytest.mark.django_db
+def test_caplog_names_the_view(authenticated_client, settings, caplog):
+    settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'MAX_QUERIES': 1,
+                             'HEADERS': True}
+
+    response = authenticated_client.get(reverse('statuses:list'))
+
+    assert int(response['X-DB-Queries']) > 1
+    assert 'exceeded by statuses:list' in caplog.text
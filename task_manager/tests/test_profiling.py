@@ -0,0 +1,163 @@
+import os
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, Client
+from django.urls import reverse
+
+from task_manager import profiling
+from task_manager.middleware import ProfilingMiddleware
+from task_manager.tests.builders import build_user
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILING = {'DIR': str(tmp_path), 'KEEP': 50,
+                          'SAMPLE_INTERVAL_MS': 0.1}
+    return tmp_path
+
+
+@pytest.fixture
+def staff_client(profile_dir):
+    user = build_user('admin')
+    user.is_staff = True
+    user.save()
+    client = Client()
+    client.force_login(user)
+    client.user = user
+    client.token = profiling.make_token(user)
+    return client
+
+
+def test_requests_without_a_token_are_not_profiled(staff_client, profile_dir):
+    response = staff_client.get(reverse('statuses:list'))
+
+    assert 'X-Profile-Id' not in response
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_profile_is_saved_with_queries_and_timings(staff_client):
+    response = staff_client.get(reverse('statuses:list'), {
+        'page': 2, '__profile': staff_client.token})
+
+    profile = profiling.load(response['X-Profile-Id'])
+    assert profile['path'] == '/ru/statuses/?page=2'
+    assert profile['user'] == 'admin'
+    assert profile['mode'] == 'cprofile'
+    assert profile['timings']['queries'] == len(profile['queries']) > 0
+    assert 'statuses_status' in profile['queries'][-1]['sql']
+    assert profile['timings']['total_ms'] >= profile['timings']['sql_ms']
+    assert 'cumulative' in profile['report']
+    assert profiling.file_path(profile).endswith('.prof')
+
+
+def test_stack_sampler_mode(staff_client):
+    response = staff_client.get(
+        reverse('statuses:list'),
+        headers={'X-Profile': staff_client.token,
+                 'X-Profile-Mode': 'sample'})
+
+    profile = profiling.load(response['X-Profile-Id'])
+    assert profile['mode'] == 'sample'
+    with open(profiling.file_path(profile)) as file:
+        stacks = file.read().splitlines()
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in stacks)
+
+
+def test_async_requests_are_profiled(staff_client):
+    async def view(request):
+        return HttpResponse()
+
+    middleware = ProfilingMiddleware(view)
+    assert iscoroutinefunction(middleware)
+    request = AsyncRequestFactory().get(
+        '/', {'__profile': staff_client.token})
+    request.user = staff_client.user
+    response = async_to_sync(middleware)(request)
+
+    profile = profiling.load(response['X-Profile-Id'])
+    assert profile['user'] == 'admin'
+    assert profile['mode'] == 'cprofile'
+
+
+def test_concurrent_cprofile_requests_are_sampled(staff_client):
+    # cProfile is process-wide, only one request runs under it at a time
+    with profiling._cprofile_lock:
+        response = staff_client.get(reverse('statuses:list'), {
+            '__profile': staff_client.token})
+
+    assert profiling.load(response['X-Profile-Id'])['mode'] == 'sample'
+    assert not profiling._cprofile_lock.locked()
+
+
+@pytest.mark.parametrize('token', ['own', 'staff', 'forged'])
+def test_only_staff_with_their_own_token_can_profile(
+        staff_client, profile_dir, token):
+    user = build_user()
+    client = Client()
+    client.force_login(user)
+    tokens = {'own': profiling.make_token(user),
+              'staff': staff_client.token,
+              'forged': f'{staff_client.token}x'}
+
+    response = client.get(reverse('statuses:list'),
+                          {'__profile': tokens[token]})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response
+
+    response = staff_client.get(reverse('statuses:list'),
+                                {'__profile': tokens['forged']})
+    assert 'X-Profile-Id' not in response
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_old_profiles_are_removed(staff_client, settings, profile_dir):
+    settings.PROFILING['KEEP'] = 2
+
+    ids = [staff_client.get(reverse('index'), {
+        '__profile': staff_client.token})['X-Profile-Id'] for _ in range(3)]
+
+    assert [profile['id'] for profile in profiling.recent()] == sorted(
+        ids, reverse=True)[:2]
+    assert len(list(profile_dir.iterdir())) == 4
+
+
+def test_profiling_can_be_turned_off(settings):
+    settings.PROFILING = {'DIR': ''}
+    with pytest.raises(MiddlewareNotUsed):
+        ProfilingMiddleware(lambda request: None)
+
+
+def test_staff_can_browse_profiles(staff_client):
+    profile_id = staff_client.get(reverse('statuses:list'), {
+        '__profile': staff_client.token})['X-Profile-Id']
+
+    response = staff_client.get(reverse('profiles'))
+    assert response.status_code == 200
+    assert staff_client.token in response.content.decode()
+    assert reverse('profile', args=[profile_id]) in response.content.decode()
+
+    url = reverse('profile', args=[profile_id])
+    response = staff_client.get(url)
+    assert response.status_code == 200
+    assert 'statuses_status' in response.content.decode()
+
+    response = staff_client.get(url, {'download': ''})
+    assert response['Content-Disposition'] == (
+        f'attachment; filename="{profile_id}.prof"')
+
+    os.remove(profiling.file_path(profiling.load(profile_id)))
+    assert staff_client.get(url, {'download': ''}).status_code == 404
+
+    for missing in ('20250101-000000-00000000', '..'):
+        assert staff_client.get(
+            reverse('profile', args=[missing])).status_code == 404
+
+
+def test_profiles_are_staff_only(authenticated_client, profile_dir):
+    assert authenticated_client.get(reverse('profiles')).status_code == 403
+    assert Client().get(reverse('profiles')).status_code == 302
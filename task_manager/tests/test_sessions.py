@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.sessions.models import Session
+from django.test import Client
+from django.urls import reverse
+
+from task_manager.env_config import _build_session_engine
+
+
+@pytest.mark.parametrize('value, engine', [
+    (None, 'django.contrib.sessions.backends.db'),
+    ('cached_db', 'django.contrib.sessions.backends.cached_db'),
+    ('signed_cookies', 'django.contrib.sessions.backends.signed_cookies'),
+    ('myapp.sessions', 'myapp.sessions'),
+])
+def test_session_engine_from_env(monkeypatch, value, engine):
+    if value is None:
+        monkeypatch.delenv('SESSION_ENGINE', raising=False)
+    else:
+        monkeypatch.setenv('SESSION_ENGINE', value)
+
+    assert _build_session_engine() == engine
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('engine', [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+])
+@pytest.mark.parametrize('url_name', ['tasks:list', 'statuses:list'])
+def test_anonymous_redirects_create_no_sessions(settings, engine, url_name):
+    settings.SESSION_ENGINE = engine
+    client = Client()
+
+    response = client.get(reverse(url_name), follow=True)
+
+    assert response.redirect_chain[-1][0] == reverse('login')
+    assert 'Вы не авторизованы! Пожалуйста, выполните вход.' in [
+        str(message) for message in response.context['messages']]
+    assert settings.SESSION_COOKIE_NAME not in client.cookies
+    assert not Session.objects.exists()
+
+
+@pytest.mark.django_db
+def test_signed_cookie_sessions_keep_users_logged_in(
+        settings, django_user_model):
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+    django_user_model.objects.create_user('tom', password='pass123')
+    client = Client()
+
+    client.post(reverse('login'), {'username': 'tom', 'password': 'pass123'})
+    response = client.get(reverse('tasks:list'))
+
+    assert response.status_code == 200
+    assert not Session.objects.exists()
@@ -0,0 +1,249 @@
+import http.client
+import io
+import json
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from crispy_forms.templatetags import crispy_forms_filters, crispy_forms_tags
+from crispy_forms.utils import default_field_template
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import AsyncClient
+from django.urls import reverse
+
+from task_manager import tracing
+from task_manager.middleware import TracingMiddleware, TracingViewMiddleware
+from task_manager.tasks.management.commands.trace_collector import make_server
+from task_manager.tests.builders import build_task
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+@pytest.fixture
+def export_to(settings):
+    def configure(target, sample_rate=1.0):
+        settings.TRACING = {'EXPORT': str(target), 'SAMPLE_RATE': sample_rate,
+                            'SERVICE_NAME': 'task_manager'}
+        settings.TEMPLATES = [{**settings.TEMPLATES[0],
+                               'BACKEND': 'task_manager.tracing.'
+                                          'TracedDjangoTemplates'}]
+        settings.CACHES = {'default': {
+            **settings.CACHES['default'],
+            'BACKEND': 'task_manager.tracing.TracedCache',
+            'TRACED_BACKEND': settings.CACHES['default']['BACKEND'],
+        }}
+        clear_crispy_templates()
+        return str(target)
+    yield configure
+    clear_crispy_templates()
+
+
+def clear_crispy_templates():
+    # crispy keeps its templates once loaded, from the backend of the time
+    for loader in (crispy_forms_filters.uni_form_template,
+                   crispy_forms_filters.uni_formset_template,
+                   crispy_forms_tags.whole_uni_form_template,
+                   crispy_forms_tags.whole_uni_formset_template,
+                   default_field_template):
+        loader.cache_clear()
+
+
+@pytest.fixture
+def trace_file(export_to, tmp_path):
+    return export_to(tmp_path / 'traces.jsonl')
+
+
+def exported_spans(target):
+    tracing.get_exporter(target).flush()
+    try:
+        with open(target) as file:
+            lines = file.read().splitlines()
+    except FileNotFoundError:
+        return []
+    return [span for line in lines
+            for resource in json.loads(line)['resourceSpans']
+            for scope in resource['scopeSpans']
+            for span in scope['spans']]
+
+
+def attributes(span):
+    return {item['key']: next(iter(item['value'].values()))
+            for item in span['attributes']}
+
+
+@pytest.mark.parametrize('header, expected', [
+    (f'00-{TRACE_ID}-{PARENT_ID}-01', (TRACE_ID, PARENT_ID, True)),
+    (f'00-{TRACE_ID}-{PARENT_ID}-00', (TRACE_ID, PARENT_ID, False)),
+    (f'01-{TRACE_ID}-{PARENT_ID}-01-future', (TRACE_ID, PARENT_ID, True)),
+    (f'00-{TRACE_ID}-{PARENT_ID}-01-extra', None),
+    (f'ff-{TRACE_ID}-{PARENT_ID}-01', None),
+    (f'00-{"0" * 32}-{PARENT_ID}-01', None),
+    (f'00-{TRACE_ID.upper()}-{PARENT_ID}-01', None),
+    ('garbage', None),
+    (None, None),
+])
+def test_parse_traceparent(header, expected):
+    assert tracing.parse_traceparent(header) == expected
+
+
+@pytest.mark.django_db
+def test_request_trace_covers_the_layers(
+        authenticated_client, trace_file, settings):
+    settings.CACHE_SHARED = True
+    build_task()
+    authenticated_client.get(reverse('tasks:list'), {'status': ''})
+
+    spans = exported_spans(trace_file)
+    by_name = {span['name']: span for span in spans}
+    root = by_name['GET tasks:list']
+    view = by_name['view tasks:list']
+    assert root['kind'] == tracing.SERVER and 'parentSpanId' not in root
+    assert attributes(root)['http.response.status_code'] == '200'
+    assert view['parentSpanId'] == root['spanId']
+    assert by_name['TaskFilter.qs']['parentSpanId'] == view['spanId']
+    assert by_name['template tasks/list.html']['parentSpanId'] == \
+        view['spanId']
+    # crispy forms
+    assert 'template bootstrap5/uni_form.html' in by_name
+    assert 'cache get_many' in by_name
+    queries = [span for span in spans if span['name'] == 'SELECT']
+    assert queries and all(span['kind'] == tracing.CLIENT for span in queries)
+    assert any('tasks_task' in attributes(span)['db.statement']
+               for span in queries)
+    assert {span['traceId'] for span in spans} == {root['traceId']}
+    assert int(root['startTimeUnixNano']) <= int(view['startTimeUnixNano'])
+    assert int(view['endTimeUnixNano']) <= int(root['endTimeUnixNano'])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_requests_are_traced(trace_file):
+    client = AsyncClient()
+    client.force_login(build_task().author)
+    response = async_to_sync(client.get)(reverse('statuses:list'))
+
+    spans = exported_spans(trace_file)
+    by_name = {span['name']: span for span in spans}
+    root = by_name['GET statuses:list']
+    assert response['traceresponse'] == f'00-{root["traceId"]}-' \
+                                        f'{root["spanId"]}-01'
+    assert by_name['view statuses:list']['parentSpanId'] == root['spanId']
+    # Run in sync_to_async() threads
+    assert any(span['name'] == 'SELECT' for span in spans)
+
+
+@pytest.mark.django_db
+def test_caller_trace_is_continued(client, trace_file):
+    response = client.get(reverse('index'), headers={
+        'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-01'})
+
+    [root] = [span for span in exported_spans(trace_file)
+              if span['name'] == 'GET index']
+    assert root['traceId'] == TRACE_ID
+    assert root['parentSpanId'] == PARENT_ID
+    assert response['traceresponse'] == f'00-{TRACE_ID}-{root["spanId"]}-01'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('headers, sample_rate', [
+    ({'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-00'}, 1.0),
+    ({}, 0.0),
+])
+def test_unsampled_requests_are_not_traced(
+        client, export_to, tmp_path, headers, sample_rate):
+    target = export_to(tmp_path / 'traces.jsonl', sample_rate)
+
+    response = client.get(reverse('index'), headers=headers)
+
+    assert 'traceresponse' not in response
+    assert exported_spans(target) == []
+
+
+def test_tracing_can_be_turned_off(settings):
+    settings.TRACING = {'EXPORT': ''}
+    for middleware in (TracingMiddleware, TracingViewMiddleware):
+        with pytest.raises(MiddlewareNotUsed):
+            middleware(lambda request: None)
+
+
+def test_spans_nest_across_threads_and_record_errors(trace_file):
+    def sync_work():
+        with tracing.span('sync'):
+            pass
+
+    async def async_work():
+        with tracing.span('async'):
+            await sync_to_async(sync_work)()
+
+    with pytest.raises(ValueError):
+        with tracing.trace('job'):
+            async_to_sync(async_work)()
+            with tracing.span('failing'):
+                raise ValueError('broken')
+
+    spans = {span['name']: span for span in exported_spans(trace_file)}
+    assert spans['sync']['parentSpanId'] == spans['async']['spanId']
+    assert spans['async']['parentSpanId'] == spans['job']['spanId']
+    assert spans['failing']['status'] == {
+        'code': tracing.STATUS_ERROR, 'message': 'ValueError: broken'}
+    assert spans['job']['status']['code'] == tracing.STATUS_ERROR
+
+
+def test_long_traces_keep_their_root(trace_file):
+    with tracing.trace('job'):
+        for _ in range(tracing.MAX_SPANS + 1):
+            with tracing.span('step'):
+                pass
+
+    spans = exported_spans(trace_file)
+    [root] = [span for span in spans if span['name'] == 'job']
+    assert len(spans) == tracing.MAX_SPANS
+    assert attributes(root)['trace.dropped_spans'] == '2'
+
+
+def test_exporter_survives_write_errors(tmp_path, monkeypatch):
+    exporter = tracing.Exporter(str(tmp_path / 'traces.jsonl'))
+    write = exporter._write
+    errors = [http.client.BadStatusLine('garbage')]
+
+    def flaky_write(spans):
+        if errors:
+            raise errors.pop()
+        write(spans)
+
+    monkeypatch.setattr(exporter, '_write', flaky_write)
+    exporter.export([{'name': 'lost'}])
+    exporter.flush()
+    exporter.export([])
+    exporter.flush()
+
+    assert not errors
+    assert (tmp_path / 'traces.jsonl').read_text().count('\n') == 1
+
+
+def test_spans_outside_traces_do_nothing():
+    with tracing.span('orphan') as span:
+        span.set_attribute('key', 'value')
+    assert span is tracing.NOOP_SPAN
+    assert tracing.current_span() is None
+
+
+@pytest.mark.django_db
+def test_traces_can_go_to_the_collector(client, export_to, tmp_path):
+    output, stdout = tmp_path / 'collected.jsonl', io.StringIO()
+    server = make_server(0, output, stdout)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        export_to(f'http://127.0.0.1:{server.server_port}/v1/traces')
+        client.get(reverse('index'))
+        tracing.get_exporter(
+            f'http://127.0.0.1:{server.server_port}/v1/traces').flush()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    [export] = [json.loads(line) for line in output.read_text().splitlines()]
+    resource = export['resourceSpans'][0]['resource']
+    assert {'key': 'service.name',
+            'value': {'stringValue': 'task_manager'}} in resource['attributes']
+    assert ' GET index ' in stdout.getvalue()
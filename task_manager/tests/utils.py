@@ -1,7 +1,10 @@
 import random
+from contextlib import contextmanager
 
 from django.contrib.messages import get_messages
 
+from task_manager.middleware import count_queries
+
 
 def get_random_record(model):
     return random.choice(model.objects.all())
@@ -19,3 +22,15 @@ def assert_redirected_with_message(response, expected_url, message):
     messages = extract_messages(response)
     assert any(message in m for m in messages),\
         f'Message "{message}" not found in {messages}'
+
+
+@contextmanager
+def query_budget(max_queries):
+    """Fail if the block, or the decorated test, runs more than
+    ``max_queries`` SQL queries."""
+    with count_queries(collect_sql=True) as counter:
+        yield counter
+    assert counter.count <= max_queries, (
+        f'{counter.count} queries over the budget of {max_queries}:\n'
+        + '\n'.join(counter.queries)
+    )
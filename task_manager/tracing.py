@@ -0,0 +1,414 @@
+"""In-process request tracing.
+
+``TracingMiddleware`` starts a trace per sampled request, continuing the
+W3C ``traceparent`` of the caller, and keeps the current span in a
+context variable, so spans nest across ``sync_to_async`` and back. The
+request, the view, ``TaskFilter``, SQL queries, templates (crispy forms
+included) and cache operations get spans of their own; ``span()`` adds
+more. Finished traces are written by a background thread as OTLP JSON:
+one ``ExportTraceServiceRequest`` per line to a file, or POSTed to an
+OTLP/HTTP endpoint such as ``manage.py trace_collector``.
+
+Without ``TRACING['EXPORT']`` nothing is instrumented.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from random import random
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_ERROR = 2
+MAX_SPANS = 1000
+MAX_STATEMENT_LENGTH = 2000
+BATCH_SIZE = 50
+TRACEPARENT = re.compile(
+    r'(?P<version>[0-9a-f]{2})-(?P<trace_id>[0-9a-f]{32})-'
+    r'(?P<parent_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})(-.*)?')
+
+_current = ContextVar('task_manager_span', default=None)
+
+
+def _new_id(size):
+    return os.urandom(size).hex()
+
+
+def parse_traceparent(header):
+    """(trace id, parent span id, sampled) of a ``traceparent`` header,
+    or None when it is missing or invalid."""
+    match = TRACEPARENT.fullmatch((header or '').strip())
+    if match is None or match['version'] == 'ff' or \
+            (match['version'] == '00' and match.group(5)):
+        return None
+    trace_id, parent_id = match['trace_id'], match['parent_id']
+    if not int(trace_id, 16) or not int(parent_id, 16):
+        return None
+    return trace_id, parent_id, bool(int(match['flags'], 16) & 1)
+
+
+class Trace:
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.root = None
+        self.spans = []
+        self.dropped = 0
+
+    def add(self, span):
+        if span is self.root:
+            # Ends last, and is kept with the number of dropped spans
+            if self.dropped:
+                span.set_attribute('trace.dropped_spans', self.dropped)
+            self.spans.append(span)
+        elif len(self.spans) < MAX_SPANS - 1:
+            # Bounded, so a request running thousands of queries stays
+            # cheap
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+class Span:
+    def __init__(self, trace, name, parent_id=None, kind=INTERNAL,
+                 attributes=None):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.status = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter_ns()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_error(self, error):
+        self.status = f'{type(error).__name__}: {error}'
+
+    def end(self):
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+        self.trace.add(self)
+
+    def traceparent(self):
+        return f'00-{self.trace.trace_id}-{self.span_id}-01'
+
+    def to_otlp(self):
+        data = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': _otlp_attributes(self.attributes),
+            'status': {},
+        }
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        if self.status:
+            data['status'] = {'code': STATUS_ERROR, 'message': self.status}
+        return data
+
+
+class _NoopSpan:
+    """Stands in for a span outside of sampled requests."""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, error):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span():
+    return _current.get()
+
+
+@contextmanager
+def _activate(span):
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as error:
+        span.record_error(error)
+        raise
+    finally:
+        _current.reset(token)
+        span.end()
+
+
+@contextmanager
+def span(name, kind=INTERNAL, **attributes):
+    """A child of the current span, or ``NOOP_SPAN`` when not tracing."""
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    with _activate(Span(parent.trace, name, parent.span_id, kind,
+                        attributes)) as child:
+        yield child
+
+
+def should_sample(parent):
+    if parent is not None:
+        return parent[2]
+    return random() < settings.TRACING['SAMPLE_RATE']
+
+
+@contextmanager
+def trace(name, parent=None, kind=SERVER, **attributes):
+    """Root span of a new trace, exported when it ends. ``parent`` is the
+    result of ``parse_traceparent()``."""
+    trace_id, parent_id = parent[:2] if parent else (_new_id(16), None)
+    root = Span(Trace(trace_id), name, parent_id, kind, attributes)
+    root.trace.root = root
+    try:
+        with _activate(root):
+            yield root
+    finally:
+        get_exporter(settings.TRACING['EXPORT']).export(root.trace.spans)
+
+
+# SQL queries
+
+def _trace_query(execute, sql, params, many, context):
+    if _current.get() is None:
+        return execute(sql, params, many, context)
+    operation = sql.split(None, 1)[0].upper() if sql.strip() else 'QUERY'
+    with span(operation, CLIENT, **{
+        'db.system': context['connection'].vendor,
+        'db.operation': operation,
+        'db.statement': sql[:MAX_STATEMENT_LENGTH],
+        'db.executemany': many,
+    }):
+        return execute(sql, params, many, context)
+
+
+def instrument_connection(connection, **kwargs):
+    # First in the list: execute_wrapper() blocks pop the last one
+    if _trace_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _trace_query)
+
+
+def instrument_connections(connections):
+    """Trace the queries of open and future database connections."""
+    connection_created.connect(
+        instrument_connection, dispatch_uid='task_manager.tracing')
+    for connection in connections.all(initialized_only=True):
+        instrument_connection(connection)
+
+
+# Templates
+
+class TracedTemplate(Template):
+    def render(self, context=None, request=None):
+        if _current.get() is None:
+            return super().render(context, request)
+        name = self.template.origin.template_name or '<string>'
+        with span(f'template {name}', **{'template.name': name}):
+            return super().render(context, request)
+
+
+class TracedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose templates trace their rendering."""
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TracedTemplate(template.template, self)
+
+    def from_string(self, template_code):
+        return TracedTemplate(self.engine.from_string(template_code), self)
+
+
+# Cache
+
+class TracedCacheMixin:
+    """Spans for the operations of a cache backend."""
+
+    def _span(self, operation, **attributes):
+        return span(f'cache {operation}', CLIENT, **{
+            'cache.backend': type(self).__mro__[2].__name__, **attributes})
+
+    def get(self, key, default=None, version=None):
+        with self._span('get') as current:
+            value = super().get(key, default, version)
+            current.set_attribute('cache.hit', value is not default)
+            return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        with self._span('get_many', **{'cache.keys': len(keys)}) as current:
+            values = super().get_many(keys, version)
+            current.set_attribute('cache.hits', len(values))
+            return values
+
+    def set(self, *args, **kwargs):
+        with self._span('set'):
+            return super().set(*args, **kwargs)
+
+    def set_many(self, data, *args, **kwargs):
+        with self._span('set_many', **{'cache.keys': len(data)}):
+            return super().set_many(data, *args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        with self._span('add'):
+            return super().add(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with self._span('delete'):
+            return super().delete(*args, **kwargs)
+
+    def delete_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        with self._span('delete_many', **{'cache.keys': len(keys)}):
+            return super().delete_many(keys, *args, **kwargs)
+
+
+@functools.cache
+def _traced_backend(path):
+    backend = import_string(path)
+    return type(f'Traced{backend.__name__}', (TracedCacheMixin, backend), {})
+
+
+class TracedCache:
+    """``CACHES`` backend that creates the backend named by its
+    ``TRACED_BACKEND`` entry, with ``TracedCacheMixin``. Settings name it
+    by path, so they don't import this module."""
+
+    def __new__(cls, location, params):
+        params = dict(params)
+        backend = _traced_backend(params.pop('TRACED_BACKEND'))
+        return backend(location, params)
+
+
+# Export
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)}
+            for key, value in attributes.items() if value is not None]
+
+
+def otlp_request(spans):
+    """An OTLP ``ExportTraceServiceRequest`` in its JSON mapping."""
+    return {'resourceSpans': [{
+        'resource': {'attributes': _otlp_attributes({
+            'service.name': settings.TRACING['SERVICE_NAME'],
+            'process.pid': os.getpid(),
+        })},
+        'scopeSpans': [{
+            'scope': {'name': __name__},
+            'spans': [span.to_otlp() for span in spans],
+        }],
+    }]}
+
+
+class Exporter:
+    """Writes traces to ``target``, a file or an ``http(s)://`` OTLP
+    endpoint, from a background thread. Traces that don't fit in the
+    queue are dropped and counted."""
+
+    def __init__(self, target, maxsize=1000):
+        self.target = target
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def export(self, spans):
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Wait until the queued traces are written."""
+        if self.queue.unfinished_tasks:
+            self._ensure_thread()
+            self.queue.join()
+
+    def _ensure_thread(self):
+        # Threads don't survive fork(), so a forked worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                threading.Thread(target=self._run, daemon=True,
+                                 name='trace-exporter').start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write([span for spans in batch for span in spans])
+            except Exception as error:
+                # Also HTTPException and the like: the thread has to live
+                # on, or flush() would wait for the queue forever
+                logger.warning('Writing %d traces to %s failed: %s',
+                               len(batch), self.target, error)
+            finally:
+                for _spans in batch:
+                    self.queue.task_done()
+
+    def _write(self, spans):
+        body = json.dumps(otlp_request(spans))
+        if self.target.startswith(('http://', 'https://')):
+            request = urllib.request.Request(
+                self.target, data=body.encode(),
+                headers={'Content-Type': 'application/json'})
+            urllib.request.urlopen(request, timeout=5).close()
+        else:
+            with open(self.target, 'a') as file:
+                file.write(body + '\n')
+
+
+_exporters = {}
+_exporters_lock = threading.Lock()
+
+
+def get_exporter(target):
+    exporter = _exporters.get(target)
+    if exporter is None:
+        with _exporters_lock:
+            if target not in _exporters:
+                _exporters[target] = Exporter(target)
+                atexit.register(_exporters[target].flush)
+            exporter = _exporters[target]
+    return exporter
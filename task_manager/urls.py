@@ -4,11 +4,20 @@ from django.urls import include, path
 from django.views.i18n import set_language
 
 from task_manager import views
-from task_manager.debug_view import DebugInfoView
+from task_manager.debug_view import (
+    DebugInfoView,
+    MetricsView,
+    ProfileDetailView,
+    ProfileListView,
+)
 
 urlpatterns = [
     path('set-language/', set_language, name='set_language'),
-    path('__debug__/info/', DebugInfoView.as_view(), name='debug-env')
+    path('__debug__/info/', DebugInfoView.as_view(), name='debug-env'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('__debug__/profiles/', ProfileListView.as_view(), name='profiles'),
+    path('__debug__/profiles/<str:profile_id>/', ProfileDetailView.as_view(),
+         name='profile'),
 ]
 
 urlpatterns += i18n_patterns(
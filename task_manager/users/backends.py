@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from task_manager import metrics
+
+CACHE_TIMEOUT = 60 * 5
+
+
+def _cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+# What every request needs, the navbar flags included. The password hash,
+# e-mail, dates and counters stay out of the cache and load on access like
+# other deferred fields; the session hash derived from the password is
+# cached instead.
+SNAPSHOT_FIELDS = {'id', 'username', 'first_name', 'last_name', 'full_name',
+                   'is_active', 'is_staff', 'is_superuser'}
+
+
+def _snapshot_fields(user_model):
+    # In model order, as from_db() expects
+    return [field.attname for field in user_model._meta.concrete_fields
+            if field.name in SNAPSHOT_FIELDS]
+
+
+def _snapshot(user):
+    return (
+        [getattr(user, name) for name in _snapshot_fields(type(user))],
+        user.get_session_auth_hash(),
+    )
+
+
+def _from_snapshot(user_model, snapshot):
+    values, session_auth_hash = snapshot
+    user = user_model.from_db(
+        'default', _snapshot_fields(user_model), values)
+    user._session_auth_hash = session_auth_hash
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose ``get_user()``, run on every authenticated
+    request, reads a snapshot of the user from the cache.
+
+    Entries are dropped when the user is saved, deleted or logs out
+    (see ``signals``). That only reaches every worker through a shared
+    cache, so without ``AUTH_USER_CACHE``, off by default for per-process
+    caches, users are loaded from the database like ``ModelBackend``.
+    """
+
+    def get_user(self, user_id):
+        if not settings.AUTH_USER_CACHE:
+            return super().get_user(user_id)
+        user_model = get_user_model()
+        snapshot = cache.get(_cache_key(user_id))
+        if snapshot is None:
+            metrics.cache_lookup('auth_user', misses=1)
+            try:
+                user = user_model._default_manager.get(pk=user_id)
+            except user_model.DoesNotExist:
+                return None
+            cache.set(_cache_key(user_id), _snapshot(user), CACHE_TIMEOUT)
+        else:
+            metrics.cache_lookup('auth_user', hits=1)
+            user = _from_snapshot(user_model, snapshot)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        if not settings.AUTH_USER_CACHE:
+            return await super().aget_user(user_id)
+        user_model = get_user_model()
+        snapshot = await cache.aget(_cache_key(user_id))
+        if snapshot is None:
+            metrics.cache_lookup('auth_user', misses=1)
+            try:
+                user = await user_model._default_manager.aget(pk=user_id)
+            except user_model.DoesNotExist:
+                return None
+            await cache.aset(
+                _cache_key(user_id), _snapshot(user), CACHE_TIMEOUT)
+        else:
+            metrics.cache_lookup('auth_user', hits=1)
+            user = _from_snapshot(user_model, snapshot)
+        return user if self.user_can_authenticate(user) else None
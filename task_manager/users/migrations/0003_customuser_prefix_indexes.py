@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from task_manager.autocomplete import (
+    create_prefix_indexes,
+    drop_prefix_indexes,
+)
+
+SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def create_indexes(apps, schema_editor):
+    create_prefix_indexes(
+        schema_editor, apps.get_model('users', 'CustomUser'), SEARCH_FIELDS)
+
+
+def drop_indexes(apps, schema_editor):
+    drop_prefix_indexes(
+        schema_editor, apps.get_model('users', 'CustomUser'), SEARCH_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser_task_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
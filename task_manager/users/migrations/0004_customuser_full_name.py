@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:39
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from task_manager.autocomplete import (
+    create_prefix_indexes,
+    drop_prefix_indexes,
+)
+
+OLD_SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+SEARCH_FIELDS = ('username', 'full_name', 'last_name')
+
+
+def create_indexes(apps, schema_editor):
+    # Adding the column rebuilds the table on SQLite, dropping the raw
+    # prefix indexes of 0003
+    user_model = apps.get_model('users', 'CustomUser')
+    drop_prefix_indexes(schema_editor, user_model, ('first_name',))
+    create_prefix_indexes(schema_editor, user_model, SEARCH_FIELDS)
+
+
+def drop_indexes(apps, schema_editor):
+    drop_prefix_indexes(
+        schema_editor, apps.get_model('users', 'CustomUser'), ('full_name',))
+
+
+def restore_old_indexes(apps, schema_editor):
+    create_prefix_indexes(
+        schema_editor, apps.get_model('users', 'CustomUser'),
+        OLD_SEARCH_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_customuser_prefix_indexes'),
+    ]
+
+    operations = [
+        # Unapplied last, after removing the column has rebuilt the table
+        migrations.RunPython(migrations.RunPython.noop, restore_old_indexes),
+        migrations.AddField(
+            model_name='customuser',
+            name='full_name',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.comparison.Coalesce(django.db.models.functions.comparison.NullIf(django.db.models.functions.text.Trim(django.db.models.functions.text.Concat('first_name', models.Value(' '), 'last_name')), models.Value('')), 'username'), output_field=models.CharField(max_length=301)),
+        ),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,11 +1,67 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
 
+from task_manager.utils.models import CounterFieldsMixin
 
-class CustomUser(AbstractUser):
-    @property
-    def full_name(self):
-        fn = f'{self.first_name} {self.last_name}'.strip()
-        return fn if fn else self.username
+NAME_FIELDS = ('first_name', 'last_name', 'username')
+
+
+class CustomUser(CounterFieldsMixin, AbstractUser):
+    # Maintained by task_manager.tasks.counters
+    authored_tasks_count = models.IntegerField(default=0, editable=False)
+    executed_tasks_count = models.IntegerField(default=0, editable=False)
+    # "First Last", or the username when both names are blank; computed by
+    # the database so lists can sort and search by it
+    full_name = models.GeneratedField(
+        expression=Coalesce(
+            NullIf(Trim(Concat('first_name', Value(' '), 'last_name')),
+                   Value('')),
+            'username',
+        ),
+        output_field=models.CharField(max_length=301),
+        db_persist=True,
+        db_index=True,
+    )
+
+    counter_fields = ('authored_tasks_count', 'executed_tasks_count')
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined', 'id'],
+                         name='user_date_joined_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        # Inserts return full_name; updates of the names leave the loaded
+        # value stale
+        update_fields = kwargs.get('update_fields')
+        computed = self._compute_full_name()
+        if not adding and (update_fields is None
+                           or set(update_fields) & set(NAME_FIELDS)) \
+                and self.__dict__.get('full_name', computed) != computed:
+            self.refresh_from_db(fields=['full_name'])
+
+    def get_session_auth_hash(self):
+        # Users read from the cache come with it, see users.backends
+        session_auth_hash = self.__dict__.get('_session_auth_hash')
+        if session_auth_hash is not None:
+            return session_auth_hash
+        return super().get_session_auth_hash()
+
+    def set_password(self, raw_password):
+        self.__dict__.pop('_session_auth_hash', None)
+        super().set_password(raw_password)
+
+    def _compute_full_name(self):
+        """``full_name`` as the database computes it."""
+        return f'{self.first_name} {self.last_name}'.strip() or self.username
 
     def __str__(self):
+        # Generated fields can't be read before the first save
+        if self._state.adding or 'full_name' in self.get_deferred_fields():
+            return self._compute_full_name()
         return self.full_name
@@ -0,0 +1,18 @@
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import backends
+from .models import CustomUser
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Covers profile and password changes as well as last_login updates
+    backends.invalidate(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        backends.invalidate(user.pk)
@@ -0,0 +1,138 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager.tests.builders import build_user
+from task_manager.users.backends import CachedModelBackend
+from task_manager.users.models import CustomUser
+
+
+def user_queries(queries):
+    return [query['sql'] for query in queries
+            if 'FROM "users_customuser"' in query['sql']]
+
+
+@pytest.fixture(autouse=True)
+def user_cache(settings):
+    settings.AUTH_USER_CACHE = True
+
+
+@pytest.fixture
+def logged_in_client(db):
+    user = build_user()
+    client = Client()
+    client.force_login(user)
+    client.user = user
+    return client
+
+
+def test_requests_read_the_user_from_the_cache(logged_in_client):
+    url = reverse('statuses:list')
+    logged_in_client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = logged_in_client.get(url)
+
+    assert response.status_code == 200
+    assert response.wsgi_request.user == logged_in_client.user
+    assert user_queries(queries) == []
+
+
+def test_cached_user_follows_profile_changes(logged_in_client):
+    url = reverse('statuses:list')
+    logged_in_client.get(url)
+
+    user = CustomUser.objects.get(pk=logged_in_client.user.pk)
+    user.first_name = 'Thomas'
+    user.save()
+    response = logged_in_client.get(url)
+
+    assert str(response.wsgi_request.user) == 'Thomas Dickson'
+
+
+@pytest.mark.parametrize('change', ['password', 'deactivate'])
+def test_cached_user_follows_credential_changes(logged_in_client, change):
+    url = reverse('statuses:list')
+    logged_in_client.get(url)
+
+    user = CustomUser.objects.get(pk=logged_in_client.user.pk)
+    if change == 'password':
+        user.set_password('new-pass')
+    else:
+        user.is_active = False
+    user.save()
+    response = logged_in_client.get(url)
+
+    assert response.status_code == 302
+    assert not response.wsgi_request.user.is_authenticated
+
+
+def test_users_are_not_cached_without_a_shared_cache(
+        logged_in_client, settings):
+    settings.AUTH_USER_CACHE = False
+    url = reverse('statuses:list')
+    logged_in_client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        logged_in_client.get(url)
+
+    assert len(user_queries(queries)) == 1
+
+
+def test_sessions_of_model_backend_stay_valid(db):
+    user = build_user()
+    client = Client()
+    client.force_login(user, 'django.contrib.auth.backends.ModelBackend')
+
+    response = client.get(reverse('statuses:list'))
+
+    assert response.status_code == 200
+    assert response.wsgi_request.user == user
+
+
+def test_logout_drops_the_cached_user(logged_in_client):
+    backend = CachedModelBackend()
+    pk = logged_in_client.user.pk
+    logged_in_client.get(reverse('statuses:list'))
+
+    logged_in_client.post(reverse('users:logout'))
+
+    with CaptureQueriesContext(connection) as queries:
+        assert backend.get_user(pk) == logged_in_client.user
+    assert len(user_queries(queries)) == 1
+
+
+def test_cache_holds_no_password_hash(logged_in_client):
+    backend = CachedModelBackend()
+    user = logged_in_client.user
+    backend.get_user(user.pk)
+
+    cached = backend.get_user(user.pk)
+
+    assert user.password not in str(cache.get(f'auth_user:{user.pk}'))
+    assert {'password', 'email', 'last_login', 'authored_tasks_count'} <= \
+        cached.get_deferred_fields()
+    assert cached.get_session_auth_hash() == user.get_session_auth_hash()
+    assert cached.check_password('pass123')
+    assert cached.executed_tasks_count == 0
+
+    cached.set_password('new-pass')
+    assert cached.get_session_auth_hash() != user.get_session_auth_hash()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_lookup_uses_the_cache():
+    pk = build_user().pk
+    backend = CachedModelBackend()
+    assert async_to_sync(backend.aget_user)(pk).username == 'tom'
+
+    with CaptureQueriesContext(connection) as queries:
+        user = async_to_sync(backend.aget_user)(pk)
+
+    assert user.username == 'tom'
+    assert user_queries(queries) == []
+    assert async_to_sync(backend.aget_user)(0) is None
@@ -34,3 +34,68 @@ def test_custom_user_name_unique(user_data):
 def test_custom_user_str(load_users, pk, expected):
     user = CustomUser.objects.get(pk=pk)
     assert str(user) == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('first_name, last_name, expected', [
+    ('Dick', 'Johnson', 'Dick Johnson'),
+    ('Dick', '', 'Dick'),
+    ('', 'Johnson', 'Johnson'),
+    ('', '', 'dick'),
+    ('  ', ' ', 'dick'),
+])
+def test_full_name_column(user_data, first_name, last_name, expected):
+    user = CustomUser.objects.create_user(
+        **user_data | {'first_name': first_name, 'last_name': last_name})
+
+    assert user.full_name == expected
+    assert CustomUser.objects.filter(full_name=expected).get() == user
+
+
+@pytest.mark.django_db
+def test_full_name_follows_saved_names(user_data):
+    user = CustomUser.objects.create_user(**user_data)
+    user.first_name = 'Richard'
+    user.save()
+    assert str(user) == 'Richard Johnson'
+
+    CustomUser.objects.filter(pk=user.pk).update(first_name='', last_name='')
+    user.refresh_from_db()
+    assert str(user) == 'dick'
+
+
+@pytest.mark.parametrize('first_name, last_name, expected', [
+    ('Dick', 'Johnson', 'Dick Johnson'),
+    ('', '', 'dick'),
+])
+def test_unsaved_user_str(first_name, last_name, expected):
+    user = CustomUser(username='dick', first_name=first_name,
+                      last_name=last_name)
+    assert str(user) == expected
+
+
+@pytest.mark.django_db
+def test_saves_refresh_full_name_only_after_name_changes(
+        user_data, django_assert_num_queries):
+    user = CustomUser.objects.create_user(**user_data)
+
+    # The update and the table version bump
+    user.email = 'dick@example.com'
+    with django_assert_num_queries(2):
+        user.save()
+
+    user.last_name = 'Jones'
+    with django_assert_num_queries(3):
+        user.save()
+    assert str(user) == 'Dick Jones'
+
+
+@pytest.mark.django_db
+def test_users_sort_by_full_name(user_data):
+    for username, first_name in [('c', 'Bob'), ('a', 'Cid'), ('zed', '')]:
+        CustomUser.objects.create_user(
+            **user_data | {'username': username, 'first_name': first_name,
+                           'last_name': ''})
+
+    assert list(CustomUser.objects.order_by('full_name').values_list(
+        'username', flat=True)) == ['c', 'a', 'zed']
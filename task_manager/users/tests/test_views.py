@@ -1,8 +1,18 @@
+import re
+
 import pytest
+from django.db import connection
+from django.test import RequestFactory
 from django.urls import reverse
 
-from task_manager.tests.builders import build_task
-from task_manager.tests.utils import assert_redirected_with_message
+from task_manager.tasks.pagination import FORWARD
+from task_manager.tasks.tests.test_indexes import FULL_SCAN_PATTERNS
+from task_manager.tests.builders import build_task, build_user
+from task_manager.tests.utils import (
+    assert_redirected_with_message,
+    query_budget,
+)
+from task_manager.users.views import SORT_KEYS, UserListView
 
 
 @pytest.fixture
@@ -44,6 +54,106 @@ def test_users_list_view(load_users, client, django_user_model):
     assert len(response.context['users']) == django_user_model.objects.count()
 
 
+@pytest.fixture
+def many_users(db):
+    names = ['Zoe', 'Adam', 'Mia', 'Bob', 'Eve', 'Ivan', 'Kate']
+    return [build_user(f'user{i}', first_name=name, last_name='Doe')
+            for i, name in enumerate(names)]
+
+
+def list_pages(client, params):
+    """Usernames on every page of the user list, following next links."""
+    pages, cursor = [], None
+    while True:
+        response = client.get(reverse('users:list'),
+                              params | ({'cursor': cursor} if cursor else {}))
+        assert response.status_code == 200
+        page = response.context['page_obj']
+        pages.append([user.username for user in page])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort, ordering', [
+    ('id', ['id']),
+    ('-username', ['-username']),
+    ('full_name', ['full_name', 'id']),
+    ('-date_joined', ['-date_joined', '-id']),
+])
+def test_users_list_sorts_and_paginates(
+        client, django_user_model, many_users, sort, ordering):
+    expected = list(django_user_model.objects.order_by(
+        *ordering).values_list('username', flat=True))
+
+    pages = list_pages(client, {'sort': sort, 'per_page': 3})
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == expected
+
+
+@pytest.mark.django_db
+def test_users_list_pages_backwards(client, many_users):
+    response = client.get(reverse('users:list'),
+                          {'sort': 'full_name', 'per_page': 3})
+    cursor = response.context['page_obj'].next_cursor
+    response = client.get(reverse('users:list'), {
+        'sort': 'full_name', 'per_page': 3, 'cursor': cursor})
+    cursor = response.context['page_obj'].previous_cursor
+
+    response = client.get(reverse('users:list'), {
+        'sort': 'full_name', 'per_page': 3, 'cursor': cursor})
+
+    assert [str(user) for user in response.context['users']] == [
+        'Adam Doe', 'Bob Doe', 'Eve Doe']
+    assert not response.context['page_obj'].has_previous()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params, per_page', [
+    ({}, 50),
+    ({'per_page': '2'}, 2),
+    ({'per_page': '100000'}, 100),
+    ({'per_page': '0'}, 1),
+    ({'per_page': 'all'}, 50),
+])
+def test_users_list_bounds_page_size(client, params, per_page):
+    request = RequestFactory().get('/users/', params)
+    view = UserListView(request=request)
+
+    assert view.get_paginate_by(None) == per_page
+
+
+@pytest.mark.django_db
+def test_users_list_ignores_unknown_sort(client, many_users):
+    response = client.get(reverse('users:list'), {'sort': 'password'})
+
+    assert response.context['sort'] == 'id'
+    assert 'sort=-id' in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('descending', [False, True], ids=['asc', 'desc'])
+@pytest.mark.parametrize('column', SORT_KEYS)
+def test_users_list_sorting_uses_indexes(many_users, column, descending):
+    pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        pytest.skip(f'No plan checks for {connection.vendor}')
+    sort = f'-{column}' if descending else column
+    request = RequestFactory().get('/users/', {'sort': sort})
+    view = UserListView(request=request)
+    paginator = view.get_keyset_paginator(view.get_queryset())
+    queryset = paginator._page_queryset(
+        FORWARD, [getattr(many_users[3], key) for key in SORT_KEYS[column]])
+
+    plan = queryset.explain()
+
+    assert not pattern.findall(plan), plan
+    if connection.vendor == 'sqlite':
+        assert not re.search(r'TEMP B-TREE', plan), plan
+
+
 # ----- Delete view ----------------------------------------------------
 @pytest.mark.django_db
 @pytest.mark.parametrize('method', ['get', 'post'], ids=['GET', 'POST'])
@@ -268,3 +378,22 @@ def test_create_user_with_existing_username(
                for e in form.errors['username'])
     assert django_user_model.objects.filter(
         username=user_data['username']).count() == 1
+
+
+# ----- Query budgets -------------------------------------------------
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, max_queries', [
+    ('users:list', 4),
+    ('users:create', 2),
+    ('users:update', 3),
+    ('users:delete', 2),
+])
+def test_user_views_query_budget(
+        authenticated_client, url_name, max_queries):
+    user = authenticated_client.user
+    args = [] if url_name.endswith(('list', 'create')) else [user.pk]
+
+    with query_budget(max_queries):
+        response = authenticated_client.get(reverse(url_name, args=args))
+
+    assert response.status_code == 200
@@ -1,11 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
 app_name = 'users'
 
+list_view = views.AsyncUserListView if settings.ASYNC_VIEWS \
+    else views.UserListView
+
 urlpatterns = [
-    path('', views.UserListView.as_view(), name='list'),
+    path('', list_view.as_view(), name='list'),
+    path('autocomplete/', views.UserAutocompleteView.as_view(),
+         name='autocomplete'),
     path('create/', views.UserRegisterView.as_view(), name='create'),
     path('logout/', views.UserLogoutView.as_view(), name='logout'),
     path('<int:pk>/update/', views.UserUpdateView.as_view(), name='update'),
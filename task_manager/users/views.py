@@ -11,7 +11,10 @@ from django.utils.translation import gettext_lazy as _
 from django.views import View
 from django.views.generic import CreateView, ListView, UpdateView
 
-from task_manager.utils.request import format_ip_log
+from task_manager.autocomplete import AutocompleteView
+from task_manager.mixins import AsyncViewMixin, ConditionalGetMixin
+from task_manager.tasks.pagination import KeysetPaginator
+from task_manager.utils.log import log_context
 
 from .forms import CustomUserForm, CustomUserUpdateForm
 from .mixins import UserAccessMixin
@@ -19,17 +22,99 @@ from .models import CustomUser
 
 logger = logging.getLogger(__name__)
 
+# ?sort= column -> keyset pagination keys, each ending with a unique column
+# and served by an index
+SORT_KEYS = {
+    'id': ('id',),
+    'username': ('username',),
+    'full_name': ('full_name', 'id'),
+    'date_joined': ('date_joined', 'id'),
+}
+DEFAULT_SORT = 'id'
 
-class UserListView(ListView):
+
+class UserListView(ConditionalGetMixin, ListView):
     model = CustomUser
+    conditional_models = (CustomUser,)
     context_object_name = 'users'
     template_name = 'users/list.html'
+    paginate_by = 50
+    max_paginate_by = 100
+    page_kwarg = 'cursor'
 
     def get(self, request, *args, **kwargs):
-        logger.info(f'👥 User list viewed by {self.request.user} '
-                     f'{format_ip_log(self.request)}')
+        self.log_view()
         return super().get(request, *args, **kwargs)
 
+    def log_view(self):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                '👥 User list viewed by %s', self.request.user,
+                extra=log_context(self.request, 'user_list_viewed'))
+
+    def get_queryset(self):
+        return CustomUser.objects.only(
+            'id', 'username', 'full_name', 'date_joined',
+            'authored_tasks_count', 'executed_tasks_count',
+        )
+
+    def get_sort(self):
+        sort = self.request.GET.get('sort', DEFAULT_SORT)
+        if sort.removeprefix('-') not in SORT_KEYS:
+            return DEFAULT_SORT
+        return sort
+
+    def get_paginate_by(self, queryset):
+        try:
+            per_page = int(self.request.GET.get('per_page', self.paginate_by))
+        except ValueError:
+            return self.paginate_by
+        return min(max(per_page, 1), self.max_paginate_by)
+
+    def get_keyset_paginator(self, queryset):
+        sort = self.get_sort()
+        return KeysetPaginator(
+            queryset, self.get_paginate_by(queryset),
+            keys=SORT_KEYS[sort.removeprefix('-')],
+            descending=sort.startswith('-'),
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_keyset_paginator(queryset)
+        page = paginator.page(self.request.GET.get(self.page_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        sort = self.get_sort()
+        # Header links sort by their column, or reverse the current order
+        context['sort'] = sort
+        context['sort_links'] = {
+            column: f'-{column}' if sort == column else column
+            for column in SORT_KEYS
+        }
+        return context
+
+
+class AsyncUserListView(AsyncViewMixin, UserListView):
+    async def get(self, request, *args, **kwargs):
+        self.log_view()
+        self.object_list = self.get_queryset()
+        self.paginator = self.get_keyset_paginator(self.object_list)
+        self.page = await self.paginator.apage(
+            request.GET.get(self.page_kwarg))
+        return self.render_to_response(self.get_context_data())
+
+    def paginate_queryset(self, queryset, page_size):
+        # Fetched by get() already
+        page = self.page
+        return self.paginator, page, page.object_list, page.has_other_pages()
+
+
+class UserAutocompleteView(AutocompleteView):
+    model = CustomUser
+    search_fields = ('full_name', 'username', 'last_name')
+
 
 class UserRegisterView(CreateView):
     form_class = CustomUserForm
@@ -40,8 +125,8 @@ class UserRegisterView(CreateView):
         response = super().form_valid(form)
         user = form.instance
         messages.success(self.request, _('User successfully registered'))
-        logger.info(f'🆕👤 New user registered: {user} '
-                    f'{format_ip_log(self.request)}')
+        logger.info('🆕👤 New user registered: %s', user,
+                    extra=log_context(self.request, 'user_registered', user.pk))
         return response
 
 
@@ -50,8 +135,8 @@ class UserLogoutView(LogoutView):
     
     def post(self, request, *args, **kwargs):
         user = request.user
-        logger.info(
-            f'🚪 {user} logged out {format_ip_log(self.request)}')
+        logger.info('🚪 %s logged out', user,
+                    extra=log_context(request, 'user_logged_out'))
         messages.info(
             request, _('You have successfully logged out of the system'))
         return super().post(request, *args, **kwargs)
@@ -69,9 +154,8 @@ class UserUpdateView(
 
     def form_valid(self, form):
         user = form.instance
-        logger.info(
-            f'✅ User {user} was successfully updated '
-            f'{format_ip_log(self.request)}')
+        logger.info('✅ User %s was successfully updated', user,
+                    extra=log_context(self.request, 'user_updated', user.pk))
         messages.success(
             self.request,
             _('User successfully updated'))
@@ -99,13 +183,12 @@ class UserDeleteView(View):
             return redirect(self.redirect_url)
 
         try:
-            logger.info(f'📄 Current user: {user} '
-                        f'{format_ip_log(self.request)}')
+            context = log_context(request, 'user_deleted', pk)
+            logger.info('📄 Current user: %s', user, extra=context)
             user.delete()
             logout(request)
             messages.success(request, _('User was successfully deleted.'))
-            logger.info(f'🗑️ Deleting user: {user} '
-                        f'{format_ip_log(self.request)}')
+            logger.info('🗑️ Deleting user: %s', user, extra=context)
         except ProtectedError:
             messages.error(
                 request,
@@ -113,8 +196,8 @@ class UserDeleteView(View):
                   'it is in use by one or more tasks.')
             )
             logger.warning(
-                f'⚠️ Attempted to delete user in use: '
-                f'{user} {format_ip_log(request)}'
+                '⚠️ Attempted to delete user in use: %s', user,
+                extra=log_context(request, 'user_delete_protected', pk),
             )
 
         return redirect(self.redirect_url)
@@ -0,0 +1,245 @@
+"""Structured, non-blocking logging.
+
+``QueueLogHandler`` only puts records on a bounded queue; a background
+thread formats and writes them, so a slow stdout never stalls request
+threads. When the queue is full, records are dropped and counted
+instead of blocking. ``JSONFormatter`` renders the ``log_context()``
+fields of a record as one JSON object per line; ``TextFormatter`` adds
+the client IP to text lines. ``DedupFilter`` collapses bursts of
+identical warnings from one client into periodic summaries.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from task_manager.utils.request import get_client_ip
+
+# Record attributes set through ``extra=log_context(...)``
+CONTEXT_FIELDS = ('event', 'user_id', 'ip', 'path', 'object_id', 'repeated')
+
+
+def log_context(request, event, object_id=None):
+    """``extra`` for a log call about ``request``."""
+    user = getattr(request, 'user', None)
+    return {
+        'event': event,
+        'user_id': getattr(user, 'pk', None),
+        'ip': get_client_ip(request),
+        'path': request.path,
+        'object_id': object_id,
+    }
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, UTC).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Appends the client IP of ``log_context()`` records to the
+    message, which no longer carries it."""
+
+    def formatMessage(self, record):
+        message = super().formatMessage(record)
+        ip = getattr(record, 'ip', None)
+        return message if ip is None else f'{message} from IP={ip}'
+
+
+class DedupFilter(logging.Filter):
+    """Lets through the first of identical records (same logger, event,
+    client IP, path and object) within ``window`` seconds and counts the
+    rest. Once the window is over, a summary record carrying the count
+    in ``repeated`` and its message follows, so a scan logs two lines per
+    key and window. Windows are checked as records come in; keys evicted
+    beyond ``max_keys`` and those still open at exit are summarised
+    right away. Only records of ``level`` and above with an ``ip`` are
+    collapsed. Summaries go through the logger of the record, or to
+    ``emit``.
+    """
+
+    def __init__(self, window=60, max_keys=1024, level=logging.WARNING,
+                 emit=None):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self.level = logging._checkLevel(level)
+        self.emit = emit or _log_summary
+        # key -> [window start, suppressed, last seen, first record],
+        # oldest window first
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        _dedup_filters.add(self)
+
+    def filter(self, record):
+        if getattr(record, 'repeated', None) is not None:
+            return True  # one of our summaries
+        with self._lock:
+            ended = self._pop_ended(record.created)
+            passed = self._count(record, ended)
+        self._summarise(ended)
+        return passed
+
+    def _count(self, record, ended):
+        if record.levelno < self.level or getattr(record, 'ip', None) is None:
+            return True
+        key = (
+            record.name, getattr(record, 'event', None) or record.msg,
+            record.ip, getattr(record, 'path', None),
+            getattr(record, 'object_id', None),
+        )
+        entry = self._seen.get(key)
+        if entry is not None:
+            entry[1] += 1
+            entry[2] = record.created
+            return False
+        self._seen[key] = [record.created, 0, record.created, _frozen(record)]
+        while len(self._seen) > self.max_keys:
+            ended.append(self._seen.popitem(last=False)[1])
+        return True
+
+    def flush(self):
+        """Summarise the open windows now."""
+        with self._lock:
+            ended = list(self._seen.values())
+            self._seen.clear()
+        self._summarise(ended)
+
+    def _pop_ended(self, now):
+        ended = []
+        while self._seen:
+            key, entry = next(iter(self._seen.items()))
+            if now - entry[0] < self.window:
+                break
+            ended.append(self._seen.pop(key))
+        return ended
+
+    def _summarise(self, entries):
+        # Outside the lock: the summary passes this filter again
+        for started, suppressed, last_seen, first in entries:
+            if suppressed:
+                self.emit(logging.makeLogRecord(first.__dict__ | {
+                    'msg': f'{first.msg} (repeated {suppressed} more times '
+                           f'in {round(last_seen - started)}s)',
+                    'created': last_seen,
+                    'repeated': suppressed,
+                }))
+
+
+def _frozen(record):
+    # The message as logged; arguments may change or hold large objects
+    return logging.makeLogRecord(record.__dict__ | {
+        'msg': record.getMessage(), 'args': None,
+        'exc_info': None, 'exc_text': None,
+    })
+
+
+def _log_summary(record):
+    logger = logging.getLogger(record.name)
+    if logger.isEnabledFor(record.levelno):
+        logger.handle(record)
+
+
+_dedup_filters = weakref.WeakSet()
+
+
+@atexit.register
+def flush_dedup_filters():
+    """Summarise the open windows of every ``DedupFilter``. Runs at exit,
+    before ``logging.shutdown()`` closes the handlers."""
+    for dedup in list(_dedup_filters):
+        dedup.flush()
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room instead of failing on a full queue
+        self.queue.put(self._sentinel)
+
+
+class QueueLogHandler(QueueHandler):
+    """Hands records to a background thread that writes them to
+    ``stream`` (stderr by default) with this handler's formatter."""
+
+    def __init__(self, maxsize=10000, stream=None):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self._reported = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Render the message now: arguments may change or need the
+        # database later. Serializing and writing happen in the listener.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self._closed:
+            return
+        self._ensure_listener()
+        if self.dropped > self._reported:
+            self._report_drops()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _report_drops(self):
+        dropped = self.dropped
+        try:
+            self.queue.put_nowait(logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING,
+                'levelname': 'WARNING', 'event': 'log_records_dropped',
+                'msg': f'Dropped {dropped - self._reported} log records, '
+                       f'queue full',
+            }))
+        except queue.Full:
+            return
+        self._reported = dropped
+
+    def _ensure_listener(self):
+        # Threads don't survive fork(), so a forked worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._listener = _Listener(self.queue, self.target)
+                self._listener.start()
+                self._pid = os.getpid()
+
+    def close(self):
+        self._closed = True
+        if self._listener is not None and self._pid == os.getpid():
+            # Writes the records still queued
+            self._listener.stop()
+            self._listener = self._pid = None
+        self.target.close()
+        super().close()
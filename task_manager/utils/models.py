@@ -0,0 +1,16 @@
+class CounterFieldsMixin:
+    """Leave denormalized counters out of ordinary model saves.
+
+    Counters only change through ``F()`` updates, so saving an instance
+    loaded earlier must not write its stale counter values back.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
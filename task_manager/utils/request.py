@@ -4,7 +4,3 @@ def get_client_ip(request):
         return x_forwarded_for.split(",")[0].strip()
     return request.META.get('REMOTE_ADDR', 'unknown')
 
-
-def format_ip_log(request, label='from IP', sep='='):
-    ip = get_client_ip(request)
-    return f'{label}{sep}{ip}'
@@ -0,0 +1,46 @@
+"""Per-table change versions for conditional GET.
+
+Every write to a tracked table bumps its ``TableVersion`` row in the
+same transaction, so a view can tell whether anything it renders has
+changed with one primary key lookup instead of reading the rows.
+Writes that bypass model signals (queryset updates, bulk inserts,
+counter updates) call ``bump()`` themselves.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from task_manager.models import TableVersion
+
+
+def table_of(model):
+    return model._meta.label_lower
+
+
+def bump(*models):
+    tables = {table_of(model) for model in models}
+    changed_at = timezone.now()
+    updated = TableVersion.objects.filter(table__in=tables).update(
+        version=F('version') + 1, changed_at=changed_at)
+    if updated < len(tables):
+        # No migration seeds the rows: a table gets its row on first write
+        TableVersion.objects.bulk_create([
+            TableVersion(table=table, version=1, changed_at=changed_at)
+            for table in tables
+        ], ignore_conflicts=True)
+
+
+def _versions_query(models):
+    return TableVersion.objects.filter(
+        table__in=[table_of(model) for model in models],
+    ).values_list('table', 'version', 'changed_at')
+
+
+def get_versions(models):
+    """{table: (version, changed_at)} for ``models``, in one query."""
+    return {table: (version, changed_at)
+            for table, version, changed_at in _versions_query(models)}
+
+
+async def aget_versions(models):
+    return {table: (version, changed_at)
+            async for table, version, changed_at in _versions_query(models)}
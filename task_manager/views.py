@@ -7,14 +7,16 @@ from django.utils.translation import gettext_lazy as _
 from django.views import View
 
 from task_manager.forms import LoginForm
+from task_manager.utils.log import log_context
 
 logger = logging.getLogger(__name__)
 
 
 class IndexView(View):
     def get(self, request, *args, **kwargs):
-        user = request.user
-        logger.debug(f'👁 Index page viewed by {user}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('👁 Index page viewed by %s', request.user,
+                         extra=log_context(request, 'index_viewed'))
         return render(request, 'index.html')
 
 
@@ -25,7 +27,7 @@ class LoginUserView(LoginView):
     def form_valid(self, form):
         response = super().form_valid(form)
         user = self.request.user
-        ip = self.request.META.get('REMOTE_ADDR', 'unknown')
         messages.success(self.request, _('You are logged in.'))
-        logger.info(f'🔐 {user} successfully logged in from IP={ip}')
+        logger.info('🔐 %s successfully logged in', user,
+                    extra=log_context(self.request, 'user_logged_in'))
         return response